@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self):
+        from turo_clone.instrumentation import install_query_counter
+        from turo_clone.sqlite import apply_pragmas
+        connection_created.connect(apply_pragmas, dispatch_uid='turo_clone.sqlite.apply_pragmas')
+        connection_created.connect(install_query_counter, dispatch_uid='turo_clone.instrumentation.install_query_counter')
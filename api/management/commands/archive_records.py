@@ -0,0 +1,31 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from bookings.archive import archive_bookings
+from support.archive import archive_ticket_replies
+
+
+class Command(BaseCommand):
+    help = ("Move closed bookings and replies on closed tickets older than ARCHIVE_AFTER_DAYS "
+            "into the archive tables, in batches.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="Archive horizon (default: ARCHIVE_AFTER_DAYS)")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--limit', type=int, help="Stop after this many rows per table")
+        parser.add_argument('--only', choices=['bookings', 'replies'])
+
+    def handle(self, *args, **options):
+        days = options['days'] or getattr(settings, 'ARCHIVE_AFTER_DAYS', 365)
+        tasks = {'bookings': archive_bookings, 'replies': archive_ticket_replies}
+        if options['only']:
+            tasks = {options['only']: tasks[options['only']]}
+
+        for name, archive in tasks.items():
+            started = time.perf_counter()
+            moved = archive(days, batch_size=options['batch_size'], limit=options['limit'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Archived {moved} {name} older than {days} days in {time.perf_counter() - started:.1f}s"
+            ))
@@ -0,0 +1,93 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+
+from api.routes import iter_api_routes
+from api.seeding import SCALES, parse_scale, seed_dataset
+from turo_clone.instrumentation import collect_queries
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Time GET requests against every api.urls route. With --scales, each scale is seeded into a "
+        "fresh test database; otherwise the configured database is used as is."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', nargs='*', help=f"Any of {', '.join(SCALES)} or booking counts.")
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--username', help="User to authenticate as (defaults to the first superuser).")
+        parser.add_argument('--output', help="Write results as JSON to this file.")
+        parser.add_argument('--baseline', help="JSON results of an earlier run to compare against.")
+
+    def handle(self, *args, **options):
+        results = {}
+        if options['scales']:
+            for scale in options['scales']:
+                results[scale] = self.run_scale(scale, options)
+        else:
+            results['current'] = self.run_routes(options)
+
+        baseline = {}
+        if options['baseline']:
+            with open(options['baseline']) as fh:
+                baseline = json.load(fh)
+        for scale, rows in results.items():
+            self.report(scale, rows, baseline.get(scale, {}))
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+
+    def run_scale(self, scale, options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.stdout.write(f"Seeding {scale}...")
+            seed_dataset(parse_scale(scale))
+            User.objects.create_superuser('benchmark-admin', 'benchmark@example.com', 'password')
+            return self.run_routes(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run_routes(self, options):
+        if options['username']:
+            user = User.objects.get(username=options['username'])
+        else:
+            user = User.objects.filter(is_superuser=True).order_by('id').first()
+        client = Client(SERVER_NAME='localhost')
+        if user:
+            client.force_login(user)
+
+        rows = {}
+        for path, name, callback in iter_api_routes():
+            url = '/api/' + path
+            timings = []
+            for _ in range(options['repeat']):
+                with collect_queries() as collector:
+                    start = time.perf_counter()
+                    status = client.get(url).status_code
+                    timings.append((time.perf_counter() - start) * 1000)
+            if status == 405:
+                continue
+            rows[url] = {
+                'status': status,
+                'queries': collector.count,
+                'median_ms': statistics.median(timings),
+                'max_ms': max(timings),
+            }
+        return rows
+
+    def report(self, scale, rows, baseline):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Scale: {scale}"))
+        for url, row in rows.items():
+            line = f"{url:<45} {row['status']:>4} {row['queries']:>5} q {row['median_ms']:>9.1f} ms"
+            before = baseline.get(url)
+            if before:
+                line += f"  (baseline {before['median_ms']:.1f} ms, {before['queries']} q)"
+            self.stdout.write(line)
@@ -0,0 +1,77 @@
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+TARGETS = {
+    'wsgi': 'import turo_clone.wsgi',
+    'asgi': 'import turo_clone.asgi',
+    # What the first request pays on top of boot: loading the root URLconf
+    'urlconf': 'import turo_clone.wsgi; from django.urls import get_resolver; get_resolver().url_patterns',
+}
+
+
+def parse_importtime(stderr):
+    """Return [(module, self_us, cumulative_us, depth)] from ``python -X importtime`` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            # Header line
+            continue
+        name = parts[2][1:]
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        rows.append((name.strip(), int(parts[0]), int(parts[1]), depth))
+    return rows
+
+
+def measure(code, env_name):
+    env = dict(os.environ, DJANGO_ENV=env_name)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'turo_clone.settings')
+    # Production settings refuse to load without it; imports never serve a request
+    env.setdefault('ALLOWED_HOSTS', 'localhost')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=str(settings.BASE_DIR), env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        lines = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+        return None, lines[-1] if lines else f'exit code {result.returncode}'
+    return parse_importtime(result.stderr), None
+
+
+class Command(BaseCommand):
+    help = "Measure cold import time of the WSGI/ASGI entry points per settings profile (python -X importtime)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--targets', nargs='+', default=list(TARGETS), choices=list(TARGETS))
+        parser.add_argument('--envs', nargs='+', default=['development', 'production'])
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--top', type=int, default=10, help="Slowest modules to list per target")
+
+    def handle(self, *args, **options):
+        for env_name in options['envs']:
+            for target in options['targets']:
+                totals = []
+                rows, error = None, None
+                for _ in range(options['repeat']):
+                    rows, error = measure(TARGETS[target], env_name)
+                    if error:
+                        break
+                    totals.append(sum(cumulative for _, _, cumulative, depth in rows if depth == 0))
+                if error:
+                    self.stdout.write(self.style.ERROR(f"{env_name:<12} {target:<8} failed: {error}"))
+                    continue
+
+                self.stdout.write(
+                    f"{env_name:<12} {target:<8} median={statistics.median(totals) / 1000:>8.1f}ms  "
+                    f"min={min(totals) / 1000:>8.1f}ms  modules={len(rows)}"
+                )
+                slowest = sorted(rows, key=lambda row: row[2], reverse=True)[:options['top']]
+                for name, self_us, cumulative, depth in slowest:
+                    self.stdout.write(f"    {cumulative / 1000:>8.1f}ms  (self {self_us / 1000:>6.1f}ms)  {name}")
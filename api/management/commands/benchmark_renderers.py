@@ -0,0 +1,124 @@
+import io
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import Resolver404, resolve
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.seeding import parse_scale, seed_dataset
+from turo_clone import renderers
+from turo_clone.renderers import FastJSONParser, FastJSONRenderer
+from users.models import User
+
+# The list endpoints with the largest bodies
+DEFAULT_PATHS = [
+    '/api/available-cars/',
+    '/api/cars/',
+    '/api/bookings/',
+    '/api/admin/bookings/',
+    '/api/admin/cars/',
+    '/api/admin/users/',
+    '/api/dashboard/',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF's JSONRenderer/JSONParser with the orjson-backed FastJSONRenderer/FastJSONParser "
+        "on the response data of real endpoints, and check both produce the same JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help="API paths to take payloads from (defaults to the big lists).")
+        parser.add_argument('--scale', help="Seed this many bookings (or 10k/100k/1m) into a fresh test database first.")
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--username', help="User to request as (defaults to the first superuser).")
+        parser.add_argument('--output', help="Write results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            raise CommandError("orjson is not installed; the fast classes would only time JSONRenderer against itself.")
+
+        if options['scale']:
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                self.stdout.write(f"Seeding {options['scale']}...")
+                seed_dataset(parse_scale(options['scale']))
+                User.objects.create_superuser('benchmark-admin', 'benchmark@example.com', 'password')
+                results = self.run_paths(options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+        else:
+            results = self.run_paths(options)
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+
+    def payload(self, path, user):
+        """The unrendered ``response.data`` the view builds for GET ``path``."""
+        try:
+            match = resolve(path)
+        except Resolver404:
+            raise CommandError(f"No route for {path}")
+        request = APIRequestFactory().get(path, SERVER_NAME='localhost')
+        if user:
+            force_authenticate(request, user=user)
+        response = match.func(request, *match.args, **match.kwargs)
+        if not isinstance(response, Response):
+            return None, 'not a DRF response'
+        if response.status_code != 200:
+            return None, f'status {response.status_code}'
+        return response.data, None
+
+    def run_paths(self, options):
+        if options['username']:
+            user = User.objects.get(username=options['username'])
+        else:
+            user = User.objects.filter(is_superuser=True).order_by('id').first()
+
+        results = {}
+        header = f"{'path':<28} {'KB':>8} {'render':>10} {'fast':>10} {'x':>6} {'parse':>10} {'fast':>10} {'x':>6}  same"
+        self.stdout.write(self.style.MIGRATE_HEADING(header))
+        for path in options['paths'] or DEFAULT_PATHS:
+            data, skipped = self.payload(path, user)
+            if skipped:
+                self.stdout.write(f"{path:<28} skipped ({skipped})")
+                continue
+
+            body = JSONRenderer().render(data)
+            fast_body = FastJSONRenderer().render(data)
+            row = {
+                'bytes': len(body),
+                'render_ms': self.time(lambda: JSONRenderer().render(data), options['repeat']),
+                'fast_render_ms': self.time(lambda: FastJSONRenderer().render(data), options['repeat']),
+                'parse_ms': self.time(lambda: JSONParser().parse(io.BytesIO(body)), options['repeat']),
+                'fast_parse_ms': self.time(lambda: FastJSONParser().parse(io.BytesIO(body)), options['repeat']),
+                # Float formatting can differ byte-wise; the decoded values must agree
+                'same': json.loads(body) == json.loads(fast_body),
+            }
+            results[path] = row
+            line = (
+                f"{path:<28} {row['bytes'] / 1024:>8.1f} "
+                f"{row['render_ms']:>8.2f}ms {row['fast_render_ms']:>8.2f}ms "
+                f"{row['render_ms'] / max(row['fast_render_ms'], 1e-6):>5.1f}x "
+                f"{row['parse_ms']:>8.2f}ms {row['fast_parse_ms']:>8.2f}ms "
+                f"{row['parse_ms'] / max(row['fast_parse_ms'], 1e-6):>5.1f}x  "
+            )
+            self.stdout.write(line + ('yes' if row['same'] else self.style.ERROR('NO')))
+        return results
+
+    def time(self, func, repeat):
+        timings = []
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
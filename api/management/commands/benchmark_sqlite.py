@@ -0,0 +1,151 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from api.seeding import seed_dataset
+from bookings.models import Booking
+from support.models import Ticket
+from turo_clone.sqlite import TUNED_PRAGMAS
+from users.models import User
+
+PROFILES = {
+    # What the shipped settings get: rollback journal, python's 5s driver timeout
+    'default': ({}, {}),
+    # SQLITE_PROFILE=tuned
+    'tuned': (TUNED_PRAGMAS, {'timeout': 20}),
+}
+
+
+class _RetryCounter(logging.Handler):
+    """Counts the "Database locked, retrying" warnings of turo_clone.sqlite.retry_atomic."""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrent read/write benchmark of the default vs tuned SQLite profiles. Each profile gets a "
+        "seeded scratch copy of the schema and runs through Django: connections get SQLITE_PRAGMAS via "
+        "apply_pragmas, readers run the booking overlap query, writers post ticket replies through "
+        "the retry_atomic write path."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--bookings', type=int, default=5000, help="Bookings to seed per profile.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stderr.write("The default database is not SQLite; nothing to compare.")
+            return
+        for name, (pragmas, driver_options) in PROFILES.items():
+            result = self.run_profile(pragmas, driver_options, options)
+            self.stdout.write(
+                f"{name:<8} reads/s={result['reads'] / options['seconds']:>9.0f}  "
+                f"writes/s={result['writes'] / options['seconds']:>7.0f}  "
+                f"retries={result['retries']}  failed writes={result['failed']}  "
+                f"p99 read ms={result['p99_read_ms']:.2f}"
+            )
+
+    def run_profile(self, pragmas, driver_options, options):
+        settings_dict = connection.settings_dict
+        old_name, old_options = settings_dict['NAME'], settings_dict.get('OPTIONS', {})
+        old_test_name = settings_dict['TEST'].get('NAME')
+        with tempfile.TemporaryDirectory() as tmp, override_settings(SQLITE_PRAGMAS=pragmas):
+            # A file, not the in-memory test database, so journal mode and locking are real
+            settings_dict['TEST']['NAME'] = os.path.join(tmp, 'bench.sqlite3')
+            settings_dict['OPTIONS'] = dict(old_options, **driver_options)
+            connection.close()
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+            try:
+                seed_dataset(options['bookings'])
+                return self.run_load(options)
+            finally:
+                connections.close_all()
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                settings_dict['TEST']['NAME'] = old_test_name
+                settings_dict['OPTIONS'] = old_options
+
+    def run_load(self, options):
+        car_ids = list(Booking.objects.values_list('car_id', flat=True).distinct()[:1000])
+        author = User.objects.order_by('id').first()
+        tickets = [
+            Ticket.objects.create(user=author, subject=f"Benchmark {i}", message="Benchmark")
+            for i in range(options['writers'])
+        ]
+        connection.close()
+
+        counts = {'reads': 0, 'writes': 0, 'failed': 0}
+        read_latencies = []
+        lock = threading.Lock()
+        stop = time.perf_counter() + options['seconds']
+
+        def reader(n):
+            reads, latencies = 0, []
+            try:
+                while time.perf_counter() < stop:
+                    start = time.perf_counter()
+                    Booking.objects.filter(
+                        car_id=car_ids[n % len(car_ids)], status__in=['pending', 'approved'],
+                        start_date__lte=date(2030, 1, 3), end_date__gte=date(2030, 1, 2),
+                    ).exists()
+                    reads += 1
+                    latencies.append(time.perf_counter() - start)
+                    n += 7
+            finally:
+                connections.close_all()
+            with lock:
+                counts['reads'] += reads
+                read_latencies.extend(latencies)
+
+        def writer(ticket):
+            client = APIClient(SERVER_NAME='localhost')
+            client.force_authenticate(author)
+            writes = failed = 0
+            try:
+                while time.perf_counter() < stop:
+                    try:
+                        response = client.post(f'/api/tickets/{ticket.id}/reply/', {'message': 'benchmark'})
+                        ok = response.status_code == 201
+                    except OperationalError:
+                        # Still locked after every retry
+                        ok = False
+                    writes += ok
+                    failed += not ok
+            finally:
+                connections.close_all()
+            with lock:
+                counts['writes'] += writes
+                counts['failed'] += failed
+
+        retries = _RetryCounter()
+        logger = logging.getLogger('turo_clone.sqlite')
+        logger.addHandler(retries)
+        try:
+            threads = [threading.Thread(target=reader, args=(i,)) for i in range(options['readers'])]
+            threads += [threading.Thread(target=writer, args=(ticket,)) for ticket in tickets]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            logger.removeHandler(retries)
+
+        read_latencies.sort()
+        p99 = read_latencies[int(len(read_latencies) * 0.99)] * 1000 if read_latencies else 0.0
+        return dict(counts, retries=retries.count, p99_read_ms=p99)
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+
+from api.routes import iter_api_routes
+from api.seeding import parse_scale, seed_dataset
+from turo_clone.instrumentation import QueryBudgetExceeded, collect_queries, get_query_budget
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "GET every api.urls route against a freshly seeded test database and compare its query count "
+        "with the declared query budget. Routes without a budget fail the check."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', default='500', help="Bookings to seed (or 10k/100k/1m).")
+        parser.add_argument('--id', type=int, default=1, help="Value substituted for URL parameters.")
+        parser.add_argument('--prefix', default='/api/')
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            seed_dataset(parse_scale(options['scale']))
+            user = User.objects.create_superuser('budget-admin', 'budget@example.com', 'password', user_type='admin')
+            failures = self.run_routes(user, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if failures:
+            raise CommandError(f"Query budget failures: {', '.join(failures)}")
+
+    def run_routes(self, user, options):
+        client = Client(SERVER_NAME='localhost')
+        client.force_login(user)
+
+        failures = []
+        for path, name, callback in iter_api_routes(sample_id=options['id']):
+            url = options['prefix'] + path
+            budget = get_query_budget(callback)
+            with collect_queries() as collector:
+                try:
+                    status = client.get(url).status_code
+                except QueryBudgetExceeded:
+                    status = 500
+            if status == 405:
+                continue
+
+            if budget is None:
+                verdict = 'NO BUDGET'
+                failures.append(url)
+            elif collector.count > budget:
+                verdict = 'OVER BUDGET'
+                failures.append(url)
+            else:
+                verdict = 'ok'
+            self.stdout.write(f"{url:<45} {status:>4} {collector.count:>4} queries  budget={budget}  {verdict}")
+        return failures
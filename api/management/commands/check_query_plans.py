@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.query_plans import HOT_QUERIES, check_plans
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot-path queries and fail if any of them falls back to a full table scan."
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help=f"Subset of: {', '.join(HOT_QUERIES)}")
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        results = check_plans(using=options['database'], names=options['names'])
+        regressions = []
+        for name, (plan, scanned) in results.items():
+            if scanned:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(f"{name}: full scan of {', '.join(scanned)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{name}: ok"))
+            if scanned or options['verbosity'] > 1:
+                self.stdout.write(plan)
+
+        if regressions:
+            raise CommandError(f"Query plan regressions: {', '.join(regressions)}")
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from turo_clone.profiling import make_profile_token
+
+
+class Command(BaseCommand):
+    help = "Print a signed header value that makes SamplingProfilerMiddleware profile a request."
+
+    def handle(self, *args, **options):
+        header = getattr(settings, 'PROFILING_HEADER', 'X-Profile')
+        max_age = getattr(settings, 'PROFILING_TOKEN_MAX_AGE', 3600)
+        self.stdout.write(f"{header}: {make_profile_token()}")
+        self.stderr.write(f"Valid for {max_age} seconds.")
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from api.seeding import SCALES, parse_scale, seed_dataset
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic dataset (users, cars, bookings, reviews, tickets) for benchmarking."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', default='10k', help=f"{', '.join(SCALES)} or a booking count.")
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        log = self.stdout.write if options['verbosity'] > 1 else (lambda message: None)
+        counts = seed_dataset(
+            parse_scale(options['scale']), batch_size=options['batch_size'], seed=options['seed'], log=log,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Seeded {counts['bookings']} bookings across {counts['cars']} cars."))
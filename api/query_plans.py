@@ -0,0 +1,55 @@
+import re
+from datetime import date
+
+from django.db import connections, transaction
+
+from bookings.models import Booking
+from cars.models import Car
+from support.models import Ticket, TicketReply
+
+# Hot queries whose plans must stay on an index; ids and dates are placeholders.
+HOT_QUERIES = {
+    'available_cars': lambda: Car.objects.filter(status='available').order_by('-created_at'),
+    'pending_cars': lambda: Car.objects.filter(status='pending_approval').order_by('created_at'),
+    'booking_overlap': lambda: Booking.objects.filter(
+        car_id=1, status__in=['pending', 'approved'],
+        start_date__lte=date(2030, 1, 10), end_date__gte=date(2030, 1, 1),
+    ),
+    'my_bookings': lambda: Booking.objects.filter(user_id=1).order_by('-created_at'),
+    'owner_bookings': lambda: Booking.objects.filter(car__owner_id=1, status='pending'),
+    'my_tickets': lambda: Ticket.objects.filter(user_id=1).order_by('-created_at'),
+    'ticket_replies': lambda: TicketReply.objects.filter(ticket_id=1).order_by('created_at'),
+}
+
+# SQLite: "SCAN <table>" without an index is a full scan, "SEARCH"/"USING ... INDEX" is not
+_SQLITE_FULL_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(?!.*\bINDEX\b)')
+_POSTGRESQL_FULL_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def explain(queryset, using='default'):
+    connection = connections[using]
+    queryset = queryset.using(using)
+    if connection.vendor == 'postgresql':
+        # Tiny CI tables make sequential scans the cheapest plan, so rule them out to see the index choice
+        with transaction.atomic(using=using):
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            return queryset.explain()
+    return queryset.explain()
+
+
+def full_scans(plan, vendor):
+    pattern = _POSTGRESQL_FULL_SCAN if vendor == 'postgresql' else _SQLITE_FULL_SCAN
+    return sorted({match.group(1) for line in plan.splitlines() for match in [pattern.search(line)] if match})
+
+
+def check_plans(using='default', names=None):
+    """Return {name: (plan, [fully scanned tables])} for the hot queries."""
+    vendor = connections[using].vendor
+    results = {}
+    for name, build in HOT_QUERIES.items():
+        if names and name not in names:
+            continue
+        plan = explain(build(), using=using)
+        results[name] = (plan, full_scans(plan, vendor))
+    return results
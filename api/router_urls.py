@@ -0,0 +1,20 @@
+from rest_framework.routers import APIRootView, DefaultRouter
+
+from turo_clone.instrumentation import query_budget
+from .views import UserViewSet, CarViewSet, BookingViewSet, ReviewViewSet
+
+
+@query_budget(2)
+class RouterRootView(APIRootView):
+    pass
+
+
+# Prefixes must stay in sync with ROUTER_PREFIXES in api/urls.py
+router = DefaultRouter()
+router.APIRootView = RouterRootView
+router.register(r'users', UserViewSet)
+router.register(r'cars', CarViewSet)
+router.register(r'bookings', BookingViewSet)
+router.register(r'reviews', ReviewViewSet)
+
+urlpatterns = router.urls
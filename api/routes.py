@@ -0,0 +1,47 @@
+import re
+
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.urls.resolvers import RoutePattern
+
+from turo_clone.lazy import LazyURLResolver
+
+_ROUTE_PARAM = re.compile(r'<(?:(\w+):)?(\w+)>')
+_REGEX_GROUP = re.compile(r'\(\?P<(\w+)>[^)]*\)')
+# Regex syntax left after filling the groups means the pattern is not a plain path
+_REGEX_SYNTAX = re.compile(r'[()\[\]{}?*+|\\^$]')
+
+
+def _to_path(pattern, sample_id):
+    text = str(pattern)
+    if isinstance(pattern, RoutePattern):
+        return _ROUTE_PARAM.sub(str(sample_id), text)
+    path = _REGEX_GROUP.sub(str(sample_id), text.lstrip('^').rstrip('$'))
+    if _REGEX_SYNTAX.search(path):
+        raise ValueError(f"Cannot turn URL pattern {text!r} into a path")
+    return path
+
+
+def iter_api_routes(urlconf='api.urls', sample_id=1):
+    """Yield (path, name, callback) for every concrete route, with parameters filled by ``sample_id``.
+
+    A path is yielded once, for the route that resolves it; later routes it shadows are skipped.
+    """
+    seen = set()
+
+    def walk(patterns, prefix):
+        for entry in patterns:
+            # Skip DRF's ".json" format-suffix duplicates
+            if '(?P<format>' in str(entry.pattern):
+                continue
+            if isinstance(entry, LazyURLResolver):
+                # Matches without consuming: the included patterns hold the full path
+                yield from walk(entry.url_patterns, prefix)
+                continue
+            path = prefix + _to_path(entry.pattern, sample_id)
+            if isinstance(entry, URLResolver):
+                yield from walk(entry.url_patterns, path)
+            elif isinstance(entry, URLPattern) and path not in seen:
+                seen.add(path)
+                yield path, entry.name, entry.callback
+
+    yield from walk(get_resolver(urlconf).url_patterns, '')
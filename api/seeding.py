@@ -0,0 +1,127 @@
+import random
+
+import factory.random
+from django.db import transaction
+from django.db.models import Max
+
+from bookings.factories import BookingFactory, ReviewFactory
+from bookings.models import Booking, Review
+from cars.factories import CarAvailabilityFactory, CarFactory, CarFeatureFactory, CarImageFactory, FEATURES
+from cars.models import Car, CarAvailability, CarFeature, CarImage
+from support.factories import TicketFactory, TicketReplyFactory
+from support.models import Ticket, TicketReply
+from users.factories import UserFactory
+from users.models import User
+
+# Scale names are the number of bookings; every other table is sized from it
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+
+def parse_scale(value):
+    value = str(value).lower()
+    if value in SCALES:
+        return SCALES[value]
+    return int(value)
+
+
+def plan_counts(bookings):
+    users = max(bookings // 10, 10)
+    cars = max(bookings // 20, 5)
+    tickets = max(bookings // 50, 1)
+    return {
+        'users': users,
+        'owners': max(users // 10, 1),
+        'cars': cars,
+        'images_per_car': 3,
+        'features_per_car': 3,
+        'availability_per_car': 2,
+        'bookings': bookings,
+        'review_ratio': 0.3,
+        'tickets': tickets,
+        'replies_per_ticket': 3,
+    }
+
+
+def _max_id(model):
+    return model.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+
+
+def _insert(model, build, total, batch_size, log):
+    """bulk_create ``total`` objects from ``build(i)`` and return a queryset of the new rows."""
+    before = _max_id(model)
+    for start in range(0, total, batch_size):
+        with transaction.atomic():
+            model.objects.bulk_create(
+                [build(i) for i in range(start, min(start + batch_size, total))],
+                batch_size=batch_size,
+            )
+        log(f"  {model.__name__}: {min(start + batch_size, total)}/{total}")
+    return model.objects.filter(id__gt=before).order_by('id')
+
+
+def seed_dataset(bookings, batch_size=2000, seed=42, log=lambda message: None):
+    factory.random.reseed_random(seed)
+    rng = random.Random(seed)
+    counts = plan_counts(bookings)
+    run = _max_id(User) + 1
+
+    log(f"Seeding {counts}")
+
+    new_users = _insert(
+        User,
+        lambda i: UserFactory.build(
+            username=f'seed{run}-{i}',
+            user_type='owner' if i < counts['owners'] else 'regular',
+        ),
+        counts['users'], batch_size, log,
+    )
+    user_ids = list(new_users.values_list('id', flat=True))
+    owners = [User(id=pk) for pk in user_ids[:counts['owners']]]
+    renters = [User(id=pk) for pk in user_ids[counts['owners']:]] or owners
+
+    new_cars = _insert(
+        Car, lambda i: CarFactory.build(owner=rng.choice(owners)), counts['cars'], batch_size, log,
+    )
+    cars = list(new_cars.only('id', 'daily_rate'))
+
+    per_car = counts['images_per_car']
+    _insert(
+        CarImage,
+        lambda i: CarImageFactory.build(car=cars[i // per_car], is_primary=(i % per_car == 0)),
+        len(cars) * per_car, batch_size, log,
+    )
+    per_car = counts['features_per_car']
+    _insert(
+        CarFeature,
+        lambda i: CarFeatureFactory.build(car=cars[i // per_car], name=FEATURES[(i + i // per_car) % len(FEATURES)]),
+        len(cars) * per_car, batch_size, log,
+    )
+    per_car = counts['availability_per_car']
+    _insert(
+        CarAvailability,
+        lambda i: CarAvailabilityFactory.build(car=cars[i // per_car]),
+        len(cars) * per_car, batch_size, log,
+    )
+
+    new_bookings = _insert(
+        Booking,
+        lambda i: BookingFactory.build(user=rng.choice(renters), car=rng.choice(cars)),
+        counts['bookings'], batch_size, log,
+    )
+    completed = list(new_bookings.filter(status='completed').values_list('id', flat=True))
+    reviewed = rng.sample(completed, int(len(completed) * counts['review_ratio']))
+    _insert(
+        Review, lambda i: ReviewFactory.build(booking=Booking(id=reviewed[i])), len(reviewed), batch_size, log,
+    )
+
+    new_tickets = _insert(
+        Ticket, lambda i: TicketFactory.build(user=rng.choice(renters)), counts['tickets'], batch_size, log,
+    )
+    tickets = list(new_tickets.select_related('user'))
+    per_ticket = counts['replies_per_ticket']
+    _insert(
+        TicketReply,
+        lambda i: TicketReplyFactory.build(ticket=tickets[i // per_ticket]),
+        len(tickets) * per_ticket, batch_size, log,
+    )
+    return counts
@@ -3,6 +3,7 @@ from django.contrib.auth.password_validation import validate_password
 from users.models import User
 from cars.models import Car, CarImage, CarFeature, CarAvailability
 from bookings.models import Booking, Review
+from cars.pricing import InvalidStay, check_stay
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -69,6 +70,15 @@ class BookingSerializer(serializers.ModelSerializer):
                   'status', 'created_at', 'updated_at']
         read_only_fields = ['user', 'total_cost', 'platform_fee', 'owner_payout', 'status']
 
+    def validate(self, attrs):
+        # New bookings are priced from the car's calendar, which only covers bookable ranges
+        if self.instance is None:
+            try:
+                check_stay(attrs['start_date'], attrs['end_date'])
+            except InvalidStay as exc:
+                raise serializers.ValidationError(str(exc))
+        return attrs
+
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True, validators=[validate_password])
     password2 = serializers.CharField(write_only=True, required=True)
@@ -1,3 +1,69 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+import pytest
+from django.urls import resolve
+from django.urls.resolvers import RegexPattern
+
+from django.utils import timezone
+
+from api.routes import _to_path, iter_api_routes
+from api.serializers import BookingSerializer
+from bookings.factories import BookingFactory
+from cars.factories import CarFactory
+from api.query_plans import HOT_QUERIES, check_plans, explain, full_scans
+from bookings.models import Booking
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_plan_uses_an_index(name):
+    plan, scanned = check_plans(names=[name])[name]
+    assert not scanned, f"{name} fell back to a full scan of {', '.join(scanned)}:\n{plan}"
+
+
+@pytest.mark.django_db
+def test_unindexed_filter_is_reported_as_full_scan():
+    from django.db import connection
+    plan = explain(Booking.objects.filter(total_cost=100))
+    assert full_scans(plan, connection.vendor) == [Booking._meta.db_table]
+
+
+def test_full_scan_patterns():
+    assert full_scans('SCAN bookings_booking', 'sqlite') == ['bookings_booking']
+    assert full_scans('SCAN TABLE bookings_booking', 'sqlite') == ['bookings_booking']
+    assert full_scans('SCAN bookings_booking USING INDEX booking_user_created_idx', 'sqlite') == []
+    assert full_scans('SEARCH cars_car USING INDEX car_status_created_idx (status=?)', 'sqlite') == []
+    assert full_scans('Seq Scan on cars_car  (cost=0.00..1.01 rows=1 width=8)', 'postgresql') == ['cars_car']
+    assert full_scans('Index Scan using car_status_created_idx on cars_car', 'postgresql') == []
+
+
+def test_every_api_route_resolves_to_the_view_it_reports():
+    routes = list(iter_api_routes())
+    paths = [path for path, _, _ in routes]
+    # The router's routes sit behind lazy_include's lookahead pattern
+    assert {'cars/', 'cars/1/', 'bookings/', 'users/', 'reviews/'} <= set(paths)
+    for path, name, callback in routes:
+        match = resolve('/api/' + path)
+        assert match.func is callback or match.url_name == name, path
+
+
+def test_unconvertible_pattern_fails_loudly():
+    with pytest.raises(ValueError):
+        _to_path(RegexPattern(r'^(?=cars/)'), 1)
+
+
+@pytest.mark.django_db
+def test_booking_viewset_serializer_bounds_new_stays_only():
+    car = CarFactory()
+    today = timezone.localdate()
+    data = {'car': car.id, 'start_date': today.isoformat(), 'end_date': '9999-12-31'}
+    serializer = BookingSerializer(data=data)
+    assert not serializer.is_valid()
+    assert 'non_field_errors' in serializer.errors
+
+    data['end_date'] = (today + timedelta(days=3)).isoformat()
+    assert BookingSerializer(data=data).is_valid()
+
+    # Editing a past booking is not a new stay
+    past = BookingFactory(car=car, start_date=today - timedelta(days=30), end_date=today - timedelta(days=28))
+    assert BookingSerializer(past, data={'start_date': past.start_date, 'end_date': past.end_date}, partial=True).is_valid()
@@ -1,92 +1,96 @@
-from django.urls import path, include
-from rest_framework.routers import DefaultRouter
-from .views import (
-    UserViewSet, CarViewSet, BookingViewSet, ReviewViewSet,
-    RegisterView, LoginView, LogoutView, ProfileView,
-    BecomeOwnerView, DashboardView,
-    CarManagementView
-)
-from cars.views import (CarCreateAPIView,OwnerCarListAPIView
-                        ,AvailableCarsAPIView,AdminCarListAPIView,
-                        AdminCarUpdateAPIView,AdminCarDeleteAPIView,
-                        )
-from bookings.views import(OwnerBookingsAPIView,ReportCreateAPIView,
-                           BookingApprovalAPIView,BookingCreateAPIView,
-                           MyBookingsAPIView,AdminBookingListAPIView,
-                           AdminBookingUpdateAPIView,AdminReportListAPIView,
-                           AdminReportUpdateAPIView,complete_booking
-                           )
-from users.views import (AdminUserListAPIView,AdminUserDetailAPIView,AdminRevenueReportAPIView,
-AdminOfferListCreateAPIView,AdminOfferUpdateDeleteAPIView,redeem_offer,CreateSupportUserView)
-
-from support.views import (CreateTicketView,MyTicketsView,AllTicketsAdminSupportView,
-                           ReplyToTicketView,UpdateTicketStatusView,TicketRepliesView)
-
-router = DefaultRouter()
-router.register(r'users', UserViewSet)
-router.register(r'cars', CarViewSet)
-router.register(r'bookings', BookingViewSet)
-router.register(r'reviews', ReviewViewSet)
+from django.urls import path
+
+from turo_clone.lazy import lazy_include, lazy_view
+
+# View modules are imported on the first request that reaches them, not when
+# the URLconf loads, which keeps worker boot and autoreload cheap.
+ROUTER_PREFIXES = ['users', 'cars', 'bookings', 'reviews']
 
 urlpatterns = [
-    path('', include(router.urls)),
+    # Ahead of the router, whose cars/<pk>/ route would otherwise claim it
+    path('cars/autocomplete/', lazy_view('cars.views.CarAutocompleteAPIView'), name='car-autocomplete'),
+    # The router (api.views and its serializers) is only imported for its own prefixes
+    lazy_include('api.router_urls', prefixes=ROUTER_PREFIXES),
     # Remove or replace this line:
     # path('auth/', include('rest_framework.authtoken.urls')),
     
     # Authentication endpoints
-    path('register/', RegisterView.as_view(), name='register'),
-    path('login/', LoginView.as_view(), name='login'),
-    path('logout/', LogoutView.as_view(), name='logout'),
-    path('profile/', ProfileView.as_view(), name='profile'),
+    path('register/', lazy_view('api.views.RegisterView'), name='register'),
+    path('login/', lazy_view('api.views.LoginView'), name='login'),
+    path('logout/', lazy_view('api.views.LogoutView'), name='logout'),
+    path('profile/', lazy_view('api.views.ProfileView'), name='profile'),
     
-    path('become-owner/', BecomeOwnerView.as_view(), name='become-owner'),
+    path('become-owner/', lazy_view('api.views.BecomeOwnerView'), name='become-owner'),
     # Car-related endpoints
     
-    path('dashboard/', DashboardView.as_view(), name='dashboard'),
-    path('create/', CarCreateAPIView.as_view(), name='create-car'),
-    path('owner-cars/', OwnerCarListAPIView.as_view(), name='owner-cars'),
-
-    path('owner-bookings/', OwnerBookingsAPIView.as_view(), name='owner-bookings'),
-    path('booking-approval/<int:booking_id>/', BookingApprovalAPIView.as_view(), name='booking-approval'),
-    path('reports/', ReportCreateAPIView.as_view(), name='create-report'),
-    path('bookings/', BookingCreateAPIView.as_view(), name='booking-create'),
-    path('available-cars/', AvailableCarsAPIView.as_view(), name='available-cars'),
-    path('my-bookings/', MyBookingsAPIView.as_view(), name='my-bookings'),
-
-    path('admin/users/', AdminUserListAPIView.as_view(), name='admin-user-list'),
-    path('admin/users/<int:user_id>/', AdminUserDetailAPIView.as_view(), name='admin-user-detail'),
-
-    path('admin/cars/', AdminCarListAPIView.as_view()),
-    path('admin/cars/<int:car_id>/', AdminCarUpdateAPIView.as_view(), name='admin-car-update'),
-
-    #path('admin/cars/<int:id>/', AdminCarUpdateAPIView.as_view()),
+    path('dashboard/', lazy_view('api.views.DashboardView'), name='dashboard'),
+    path('create/', lazy_view('cars.views.CarCreateAPIView'), name='create-car'),
+    path('owner-cars/', lazy_view('cars.views.OwnerCarListAPIView'), name='owner-cars'),
+
+    path('owner-bookings/', lazy_view('bookings.views.OwnerBookingsAPIView'), name='owner-bookings'),
+    path('booking-approval/<int:booking_id>/', lazy_view('bookings.views.BookingApprovalAPIView'), name='booking-approval'),
+    path('reports/', lazy_view('bookings.views.ReportCreateAPIView'), name='create-report'),
+    path('bookings/', lazy_view('bookings.views.BookingCreateAPIView'), name='booking-create'),
+    path('available-cars/', lazy_view('cars.views.AvailableCarsAPIView'), name='available-cars'),
+    path('cars/<int:car_id>/calendar/', lazy_view('cars.views.CarCalendarAPIView'), name='car-calendar'),
+    path('cars/<int:car_id>/similar/', lazy_view('cars.views.SimilarCarsAPIView'), name='similar-cars'),
+    path('cars/<int:car_id>/quote/', lazy_view('cars.views.CarQuoteAPIView'), name='car-quote'),
+    path('cars/<int:car_id>/availability/', lazy_view('cars.views.CarAvailabilityBulkAPIView'), name='car-availability'),
+    path('cars/<int:car_id>/pricing-rules/', lazy_view('cars.views.CarPricingRuleListCreateAPIView'), name='car-pricing-rules'),
+    path('pricing-rules/<int:rule_id>/', lazy_view('cars.views.CarPricingRuleDetailAPIView'), name='pricing-rule-detail'),
+    path('my-bookings/', lazy_view('bookings.views.MyBookingsAPIView'), name='my-bookings'),
+
+    # Async variants of the public car reads, for ASGI deployments
+    path('async/available-cars/', lazy_view('cars.async_views.available_cars', asynchronous=True), name='async-available-cars'),
+    path('async/cars/<int:car_id>/', lazy_view('cars.async_views.car_detail', asynchronous=True), name='async-car-detail'),
+
+    path('admin/users/', lazy_view('users.views.AdminUserListAPIView'), name='admin-user-list'),
+    path('admin/users/bulk/', lazy_view('users.views.AdminUserBulkUpdateAPIView'), name='admin-user-bulk'),
+    path('admin/users/search/', lazy_view('users.views.AdminUserSearchAPIView'), name='admin-user-search'),
+    path('admin/users/<int:user_id>/', lazy_view('users.views.AdminUserDetailAPIView'), name='admin-user-detail'),
+
+    path('admin/cars/', lazy_view('cars.views.AdminCarListAPIView')),
+    path('admin/cars/pending/', lazy_view('cars.views.AdminPendingCarListAPIView'), name='admin-pending-cars'),
+    path('admin/cars/pending/decide/', lazy_view('cars.views.AdminCarDecisionAPIView'), name='admin-car-decisions'),
+    path('admin/cars/<int:car_id>/', lazy_view('cars.views.AdminCarUpdateAPIView'), name='admin-car-update'),
+
+    #path('admin/cars/<int:id>/', lazy_view('cars.views.AdminCarUpdateAPIView')),
 
     # Booking admin
-    path('admin/bookings/', AdminBookingListAPIView.as_view()),
-    path('admin/bookings/<int:id>/', AdminBookingUpdateAPIView.as_view()),
+    path('admin/bookings/', lazy_view('bookings.views.AdminBookingListAPIView')),
+    path('admin/bookings/<int:id>/', lazy_view('bookings.views.AdminBookingUpdateAPIView')),
+
+    # Streaming finance exports, e.g. admin/exports/bookings.csv or payouts.parquet
+    path('admin/exports/<str:dataset>.<str:file_format>', lazy_view('bookings.views.AdminExportAPIView'), name='admin-export'),
 
     # Reports admin
-    path('admin/reports/', AdminReportListAPIView.as_view()),
-    path('admin/reports/<int:report_id>/', AdminReportUpdateAPIView.as_view()),
+    path('admin/reports/', lazy_view('bookings.views.AdminReportListAPIView')),
+    path('admin/reports/<int:report_id>/', lazy_view('bookings.views.AdminReportUpdateAPIView')),
+    path('admin/moderation/reports/', lazy_view('bookings.views.ModerationQueueAPIView'), name='moderation-queue'),
+    path('admin/moderation/reports/resolve/', lazy_view('bookings.views.ModerationBulkResolveAPIView'), name='moderation-resolve'),
 
     # Revenue
-    path('admin/revenue-report/', AdminRevenueReportAPIView.as_view()),
+    path('admin/revenue-report/', lazy_view('users.views.AdminRevenueReportAPIView')),
+
+    path('admin/jobs/<int:job_id>/', lazy_view('jobs.views.JobDetailAPIView'), name='admin-job-detail'),
+    path('admin/query-stats/', lazy_view('api.views.QueryStatsAPIView'), name='query-stats'),
 
 
-    path('bookings/<int:booking_id>/complete/', complete_booking, name='complete-booking'),
-    path('admin/offers/', AdminOfferListCreateAPIView.as_view(), name='admin-offers'),
-    path('admin/offers/<int:id>/', AdminOfferUpdateDeleteAPIView.as_view(), name='admin-offer-detail'),
-    path('offers/<int:offer_id>/redeem/', redeem_offer, name='redeem-offer'),
+    path('bookings/<int:booking_id>/complete/', lazy_view('bookings.views.complete_booking'), name='complete-booking'),
+    path('admin/offers/', lazy_view('users.views.AdminOfferListCreateAPIView'), name='admin-offers'),
+    path('admin/offers/<int:id>/', lazy_view('users.views.AdminOfferUpdateDeleteAPIView'), name='admin-offer-detail'),
+    path('offers/<int:offer_id>/redeem/', lazy_view('users.views.redeem_offer'), name='redeem-offer'),
+    path('points/history/', lazy_view('users.views.PointsHistoryAPIView'), name='points-history'),
 
-    path("admin/create-support-user/", CreateSupportUserView.as_view(), name="create-support-user"),
+    path("admin/create-support-user/", lazy_view('users.views.CreateSupportUserView'), name="create-support-user"),
 
     # Tickets
-    path("tickets/", CreateTicketView.as_view(), name="create-ticket"),
-    path("tickets/user/", MyTicketsView.as_view(), name="my-tickets"),
-    path("admin/tickets/", AllTicketsAdminSupportView.as_view(), name="all-tickets"),
-    path("tickets/<int:ticket_id>/reply/", ReplyToTicketView.as_view(), name="reply-ticket"),
-    path("tickets/<int:pk>/", UpdateTicketStatusView.as_view(), name="update-ticket-status"),
+    path("tickets/", lazy_view('support.views.CreateTicketView'), name="create-ticket"),
+    path("tickets/user/", lazy_view('support.views.MyTicketsView'), name="my-tickets"),
+    path("admin/tickets/", lazy_view('support.views.AllTicketsAdminSupportView'), name="all-tickets"),
+    path("tickets/<int:ticket_id>/reply/", lazy_view('support.views.ReplyToTicketView'), name="reply-ticket"),
+    path("tickets/<int:pk>/", lazy_view('support.views.UpdateTicketStatusView'), name="update-ticket-status"),
 
-    path('tickets/<int:ticket_id>/replies/', TicketRepliesView.as_view(), name='ticket-replies'),
+    path('tickets/<int:ticket_id>/replies/', lazy_view('support.views.TicketRepliesView'), name='ticket-replies'),
 
    ]
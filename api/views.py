@@ -18,6 +18,13 @@ from .serializers import (
 )
 from rest_framework.permissions import IsAuthenticated
 from django.db import transaction
+from turo_clone.instrumentation import query_budget, set_request_query_budget, view_stats
+from turo_clone.db_routers import replica_reads
+from bookings.tasks import send_booking_request_email
+from cars.pricing import quote
+from cars.availability import add_availability, replace_availability
+from cars.serializers import AvailabilityWindowSerializer
+from cars.facets import apply_selection, cached_facets, parse_selection
 import json
 
 class CarCreateAPIView(APIView):
@@ -43,16 +50,40 @@ class BecomeCarOwnerView(APIView):
         user.save()
 
         return Response({'detail': 'You have become a car owner successfully.'}, status=status.HTTP_200_OK)
+
+def with_car_graph(queryset, prefix=''):
+    """Load what CarSerializer reads for the car at ``prefix``: owner, images, features, availability."""
+    return queryset.select_related(prefix + 'owner').prefetch_related(
+        prefix + 'images', prefix + 'features', prefix + 'availability',
+    )
+
+
+def with_booking_graph(queryset):
+    """Load what BookingSerializer reads: the user and the car graph."""
+    return with_car_graph(queryset.select_related('user'), 'car__')
+
+
+@query_budget(3)
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAdminUser]
 
+# Session, user, cars and the images, features and availability prefetches; ?facets
+# has its own budget, see FACETS_QUERY_BUDGET
+@replica_reads
+@query_budget(7)
 class CarViewSet(viewsets.ModelViewSet):
     queryset = Car.objects.all()
     serializer_class = CarSerializer
+    # The listing, the cache lookup and on a miss the aggregate; a miss on a
+    # database-backed cache also spends up to five statements storing the counts
+    FACETS_QUERY_BUDGET = 13
+
+    def location_filter(self):
+        return (self.request.query_params.get('location') or '').strip()
     
-    def get_queryset(self):
+    def get_base_queryset(self):
         queryset = Car.objects.all()
         
         # Filter by status for non-admin users
@@ -65,15 +96,42 @@ class CarViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(owner_id=owner_id)
         
         # Filter by location
-        location = self.request.query_params.get('location', None)
+        location = self.location_filter()
         if location:
             queryset = queryset.filter(location__icontains=location)
         
         return queryset
+
+    def get_queryset(self):
+        queryset = self.get_base_queryset()
+        if self.action == 'list':
+            # Facet filters: ?make=Toyota,Honda&seats=5&price_band=50-100
+            queryset = apply_selection(queryset, parse_selection(self.request.query_params))
+        return with_car_graph(queryset)
+
+    def list(self, request, *args, **kwargs):
+        mode = request.query_params.get('facets')
+        if not mode:
+            return super().list(request, *args, **kwargs)
+
+        set_request_query_budget(request, self.FACETS_QUERY_BUDGET)
+        selection = parse_selection(request.query_params)
+        scope = {
+            'staff': request.user.is_staff,
+            'owner': request.query_params.get('owner') or '',
+            # Exactly what get_base_queryset filters on
+            'location': self.location_filter(),
+        }
+        data = cached_facets(self.get_base_queryset(), selection, scope)
+        if mode != 'only':
+            queryset = self.filter_queryset(self.get_queryset())
+            data = dict(data, results=self.get_serializer(queryset, many=True).data)
+        return Response(data)
     
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
+@query_budget(6)
 class BookingViewSet(viewsets.ModelViewSet):
     queryset = Booking.objects.all()
     serializer_class = BookingSerializer
@@ -83,14 +141,14 @@ class BookingViewSet(viewsets.ModelViewSet):
         
         # Admin can see all bookings
         if user.is_staff:
-            return Booking.objects.all()
+            return with_booking_graph(Booking.objects.all())
         
         # Car owners can see bookings for their cars
         if user.user_type == 'owner':
-            return Booking.objects.filter(car__owner=user)
+            return with_booking_graph(Booking.objects.filter(car__owner=user))
         
         # Regular users can see their own bookings
-        return Booking.objects.filter(user=user)
+        return with_booking_graph(Booking.objects.filter(user=user))
     
     def perform_create(self, serializer):
         car_id = self.request.data.get('car')
@@ -103,26 +161,28 @@ class BookingViewSet(viewsets.ModelViewSet):
         from datetime import datetime
         start = datetime.strptime(start_date, '%Y-%m-%d').date()
         end = datetime.strptime(end_date, '%Y-%m-%d').date()
-        days = (end - start).days + 1
         
-        # Calculate costs
-        total_cost = car.daily_rate * Decimal(days)
+        # Calculate costs from the car's price calendar
+        total_cost = quote(car, start, end).total
         platform_fee = total_cost * Decimal('0.10')  # 10% platform fee
         owner_payout = total_cost - platform_fee
         
         # Set status based on auto-approve setting
         status = 'approved' if car.auto_approve_bookings else 'pending'
         
-        serializer.save(
-            user=self.request.user,
-            total_cost=total_cost,
-            platform_fee=platform_fee,
-            owner_payout=owner_payout,
-            status=status
-        )
-
+        with transaction.atomic():
+            booking = serializer.save(
+                user=self.request.user,
+                total_cost=total_cost,
+                platform_fee=platform_fee,
+                owner_payout=owner_payout,
+                status=status
+            )
+            send_booking_request_email.enqueue(booking_id=booking.id)
+
+@query_budget(3)
 class ReviewViewSet(viewsets.ModelViewSet):
-    queryset = Review.objects.all()
+    queryset = Review.objects.select_related('booking__user', 'booking__car')
     serializer_class = ReviewSerializer
     
     def perform_create(self, serializer):
@@ -176,6 +236,7 @@ class LogoutView(APIView):
         request.user.auth_token.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+@query_budget(2)
 class ProfileView(APIView):
     def get(self, request):
         serializer = UserSerializer(request.user)
@@ -240,10 +301,12 @@ class CarManagementView(APIView):
                 return Response({'error': 'Car not found.'}, status=status.HTTP_404_NOT_FOUND)
             if car.owner != request.user:
                 return Response({'error': 'You can only add availability to your own cars.'}, status=status.HTTP_403_FORBIDDEN)
-            serializer = CarAvailabilitySerializer(data=request.data)
+            serializer = AvailabilityWindowSerializer(data=request.data)
             if serializer.is_valid():
-                serializer.save()
-                return Response({'message': 'Availability added.', 'availability': serializer.data}, status=status.HTTP_201_CREATED)
+                # Merged into any overlapping or adjacent window rather than appended
+                window = add_availability(car.id, serializer.validated_data['start_date'],
+                                          serializer.validated_data['end_date'])
+                return Response({'message': 'Availability added.', 'availability': CarAvailabilitySerializer(window).data}, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         else:
@@ -265,6 +328,10 @@ class BecomeOwnerView(APIView):
                         status=status.HTTP_200_OK)
 
 
+# Staff: session, user, six counts and sums, the recent users, and the recent cars
+# and bookings with their prefetches
+@replica_reads
+@query_budget(17)
 class DashboardView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -296,8 +363,8 @@ class DashboardView(APIView):
             
             # Recent activity
             recent_users = User.objects.order_by('-date_joined')[:5]
-            recent_cars = Car.objects.order_by('-created_at')[:5]
-            recent_bookings = Booking.objects.order_by('-created_at')[:5]
+            recent_cars = with_car_graph(Car.objects.order_by('-created_at'))[:5]
+            recent_bookings = with_booking_graph(Booking.objects.order_by('-created_at'))[:5]
             
             # Pending approvals
             pending_cars = Car.objects.filter(status='pending_approval').count()
@@ -344,9 +411,9 @@ class DashboardView(APIView):
             ).aggregate(Sum('owner_payout'))['owner_payout__sum'] or 0
             
             # Recent bookings
-            recent_bookings = Booking.objects.filter(
+            recent_bookings = with_booking_graph(Booking.objects.filter(
                 car__owner=user
-            ).order_by('-created_at')[:5]
+            ).order_by('-created_at'))[:5]
             
             return Response({
                 'total_cars': total_cars,
@@ -376,9 +443,9 @@ class DashboardView(APIView):
             ).count()
             
             # Recent bookings
-            recent_bookings = Booking.objects.filter(
+            recent_bookings = with_booking_graph(Booking.objects.filter(
                 user=user
-            ).order_by('-created_at')[:5]
+            ).order_by('-created_at'))[:5]
             
             return Response({
                 'upcoming_bookings': upcoming_bookings,
@@ -387,6 +454,17 @@ class DashboardView(APIView):
                 'recent_bookings': BookingSerializer(recent_bookings, many=True).data,
             })
 
+@query_budget(2)
+class QueryStatsAPIView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(view_stats.snapshot())
+
+    def delete(self, request):
+        view_stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 class CarFullCreateAPIView(APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
@@ -441,20 +519,14 @@ class CarFullCreateAPIView(APIView):
                 transaction.set_rollback(True)
                 return Response({'errors': feat_serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Save availability
-        avail_objs = []
-        for avail in availability:
-            avail_data = {
-                'car': car.id,
-                'start_date': avail.get('start_date'),
-                'end_date': avail.get('end_date')
-            }
-            avail_serializer = CarAvailabilitySerializer(data=avail_data)
-            if avail_serializer.is_valid():
-                avail_objs.append(avail_serializer.save())
-            else:
-                transaction.set_rollback(True)
-                return Response({'errors': avail_serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        # Save availability, coalesced into non-overlapping windows
+        avail_serializer = AvailabilityWindowSerializer(data=availability, many=True)
+        if not avail_serializer.is_valid():
+            transaction.set_rollback(True)
+            return Response({'errors': avail_serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        avail_objs, _, _ = replace_availability(car.id, [
+            (window['start_date'], window['end_date']) for window in avail_serializer.validated_data
+        ])
 
         return Response({
             'message': 'Car and related data created successfully.',
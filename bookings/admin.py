@@ -1,5 +1,14 @@
 from django.contrib import admin
 from .models import Booking, Review
+from cars.availability import invalidate_car_calendar
+
+
+def _update_status(queryset, status):
+    # queryset.update() skips the post_save signal that refreshes car calendars
+    car_ids = set(queryset.values_list('car_id', flat=True))
+    queryset.update(status=status)
+    for car_id in car_ids:
+        invalidate_car_calendar(car_id)
 
 class ReviewInline(admin.TabularInline):
     model = Review
@@ -14,13 +23,13 @@ class BookingAdmin(admin.ModelAdmin):
     actions = ['approve_bookings', 'reject_bookings', 'mark_as_completed']
     
     def approve_bookings(self, request, queryset):
-        queryset.update(status='approved')
+        _update_status(queryset, 'approved')
     approve_bookings.short_description = "Approve selected bookings"
     
     def reject_bookings(self, request, queryset):
-        queryset.update(status='rejected')
+        _update_status(queryset, 'rejected')
     reject_bookings.short_description = "Reject selected bookings"
     
     def mark_as_completed(self, request, queryset):
-        queryset.update(status='completed')
+        _update_status(queryset, 'completed')
     mark_as_completed.short_description = "Mark selected bookings as completed"
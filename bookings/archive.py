@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from cars.availability import invalidate_car_calendar
+from turo_clone.archive import move_batch
+from .models import ArchivedBooking, ArchivedReview, Booking, Review
+
+CLOSED_STATUSES = ['completed', 'cancelled', 'rejected']
+
+
+def archivable_bookings(horizon_days=None):
+    """Closed bookings that ended more than ``horizon_days`` (ARCHIVE_AFTER_DAYS) ago."""
+    horizon_days = horizon_days or getattr(settings, 'ARCHIVE_AFTER_DAYS', 365)
+    cutoff = timezone.localdate() - timedelta(days=horizon_days)
+    return Booking.objects.filter(status__in=CLOSED_STATUSES, end_date__lt=cutoff)
+
+
+def archive_bookings(horizon_days=None, batch_size=1000, limit=None):
+    moved = 0
+    queryset = archivable_bookings(horizon_days)
+    while limit is None or moved < limit:
+        with transaction.atomic(using=queryset.db):
+            rows = move_batch(queryset, ArchivedBooking, batch_size if limit is None else min(batch_size, limit - moved))
+            if not rows:
+                break
+            # Reviews go with their booking; the foreign key is only checked at commit
+            reviews = Review.objects.using(queryset.db).filter(booking_id__in=[row['id'] for row in rows])
+            move_batch(reviews, ArchivedReview, len(rows))
+        moved += len(rows)
+        # Past completed trips still show as booked days in cached calendars
+        for car_id in {row['car_id'] for row in rows}:
+            invalidate_car_calendar(car_id)
+    return moved
+
+
+def with_car_graph(queryset):
+    """Load what the nested CarSerializer reads: the car, its features and its availability windows."""
+    return queryset.select_related('car').prefetch_related('car__features', 'car__availability')
+
+
+def filter_bookings(queryset, params):
+    """Admin booking filters, shared by the hot and archived tables."""
+    if params.get("status"):
+        queryset = queryset.filter(status=params["status"])
+    if params.get("user_id"):
+        queryset = queryset.filter(user_id=params["user_id"])
+    if params.get("car_id"):
+        queryset = queryset.filter(car_id=params["car_id"])
+    if params.get("start_date"):
+        queryset = queryset.filter(start_date__gte=params["start_date"])
+    if params.get("end_date"):
+        queryset = queryset.filter(end_date__lte=params["end_date"])
+    return queryset
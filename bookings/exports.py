@@ -0,0 +1,203 @@
+import csv
+from decimal import Decimal
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncMonth
+
+from turo_clone.db_routers import replica_alias
+from .models import Booking
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional: only the columnar formats need it
+    pa = pq = None
+
+CHUNK_SIZE = 5000
+CENT = Decimal('0.01')
+FORMATS = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+COLUMNAR_FORMATS = ('parquet', 'arrow')
+
+# Column kinds -> Arrow types; money is 2-place decimal with room for revenue sums
+ARROW_TYPES = {
+    'int': lambda: pa.int64(),
+    'str': lambda: pa.string(),
+    'date': lambda: pa.date32(),
+    'datetime': lambda: pa.timestamp('us', tz='UTC'),
+    'money': lambda: pa.decimal128(18, 2),
+}
+
+
+class Dataset:
+    """Flat columns (name, ORM lookup, kind) plus the queryset they are read from."""
+
+    def __init__(self, columns, build, aggregated=False):
+        self.columns = columns
+        self.build = build
+        self.aggregated = aggregated
+
+    def rows(self, params):
+        queryset = self.build(params).using(replica_alias() or 'default')
+        lookups = [lookup for _, lookup, _ in self.columns]
+        # iterator() reads through a server-side cursor on PostgreSQL
+        rows = queryset.values_list(*lookups).iterator(chunk_size=CHUNK_SIZE)
+        if not self.aggregated:
+            return rows
+        # Sums come back with arbitrary scale on some backends
+        money = {index for index, (_, _, kind) in enumerate(self.columns) if kind == 'money'}
+        return (
+            tuple(value.quantize(CENT) if index in money and value is not None else value
+                  for index, value in enumerate(row))
+            for row in rows
+        )
+
+
+def _filtered_bookings(params):
+    bookings = Booking.objects.order_by('id')
+    if params.get('status'):
+        bookings = bookings.filter(status=params['status'])
+    if params.get('start_date'):
+        bookings = bookings.filter(start_date__gte=params['start_date'])
+    if params.get('end_date'):
+        bookings = bookings.filter(end_date__lte=params['end_date'])
+    if params.get('car_id'):
+        bookings = bookings.filter(car_id=params['car_id'])
+    if params.get('owner_id'):
+        bookings = bookings.filter(car__owner_id=params['owner_id'])
+    return bookings
+
+
+def _payouts(params):
+    # Owners are paid for completed trips
+    return _filtered_bookings(dict(params, status='completed'))
+
+
+def _revenue(params):
+    trunc = TruncDay if params.get('period') == 'day' else TruncMonth
+    return (
+        _filtered_bookings(dict(params, status='completed'))
+        .annotate(period=trunc('end_date'))
+        .values('period')
+        .annotate(bookings=Count('id'), gross=Sum('total_cost'),
+                  revenue=Sum('platform_fee'), payouts=Sum('owner_payout'))
+        .order_by('period')
+    )
+
+
+DATASETS = {
+    'bookings': Dataset([
+        ('id', 'id', 'int'),
+        ('status', 'status', 'str'),
+        ('start_date', 'start_date', 'date'),
+        ('end_date', 'end_date', 'date'),
+        ('created_at', 'created_at', 'datetime'),
+        ('user_id', 'user_id', 'int'),
+        ('username', 'user__username', 'str'),
+        ('car_id', 'car_id', 'int'),
+        ('car_make', 'car__make', 'str'),
+        ('car_model', 'car__model', 'str'),
+        ('owner_id', 'car__owner_id', 'int'),
+        ('total_cost', 'total_cost', 'money'),
+        ('platform_fee', 'platform_fee', 'money'),
+        ('owner_payout', 'owner_payout', 'money'),
+    ], _filtered_bookings),
+    'payouts': Dataset([
+        ('booking_id', 'id', 'int'),
+        ('owner_id', 'car__owner_id', 'int'),
+        ('owner_username', 'car__owner__username', 'str'),
+        ('owner_email', 'car__owner__email', 'str'),
+        ('car_id', 'car_id', 'int'),
+        ('trip_end', 'end_date', 'date'),
+        ('owner_payout', 'owner_payout', 'money'),
+    ], _payouts),
+    'revenue': Dataset([
+        ('period', 'period', 'date'),
+        ('bookings', 'bookings', 'int'),
+        ('gross', 'gross', 'money'),
+        ('platform_fee', 'revenue', 'money'),
+        ('owner_payout', 'payouts', 'money'),
+    ], _revenue, aggregated=True),
+}
+
+
+class _Sink:
+    """Write-only file object whose contents are taken out as each chunk is yielded."""
+
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _chunks(rows, size=CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class _Echo:
+    """csv.writer target that hands each formatted line back instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(dataset, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _, _ in dataset.columns]).encode()
+    for chunk in _chunks(rows):
+        yield ''.join(writer.writerow(row) for row in chunk).encode()
+
+
+def _record_batch(schema, chunk):
+    arrays = [
+        pa.array(values, type=field.type)
+        for field, values in zip(schema, zip(*chunk))
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def stream_columnar(dataset, rows, file_format):
+    schema = pa.schema([(name, ARROW_TYPES[kind]()) for name, _, kind in dataset.columns])
+    sink = _Sink()
+    if file_format == 'parquet':
+        writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema)
+    else:
+        writer = pa.ipc.new_stream(pa.PythonFile(sink, mode='w'), schema)
+    # One row group / record batch per chunk keeps memory flat
+    for chunk in _chunks(rows):
+        writer.write_batch(_record_batch(schema, chunk))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def stream_export(name, file_format, params):
+    """Iterator of the encoded export; rows are fetched lazily as it is consumed."""
+    dataset = DATASETS[name]
+    rows = dataset.rows(params)
+    if file_format == 'csv':
+        return stream_csv(dataset, rows)
+    return stream_columnar(dataset, rows, file_format)
@@ -0,0 +1,37 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import factory
+
+from bookings.models import Booking, Review
+from cars.factories import CarFactory
+from users.factories import UserFactory
+
+
+class BookingFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Booking
+
+    class Params:
+        days = factory.Faker('random_int', min=1, max=14)
+
+    user = factory.SubFactory(UserFactory)
+    car = factory.SubFactory(CarFactory)
+    start_date = factory.Faker('date_between', start_date='-2y', end_date='+90d')
+    end_date = factory.LazyAttribute(lambda o: o.start_date + timedelta(days=o.days - 1))
+    total_cost = factory.LazyAttribute(lambda o: o.car.daily_rate * Decimal(o.days))
+    platform_fee = factory.LazyAttribute(lambda o: o.total_cost * Decimal('0.10'))
+    owner_payout = factory.LazyAttribute(lambda o: o.total_cost - o.platform_fee)
+    status = factory.Faker(
+        'random_element',
+        elements=['completed'] * 5 + ['approved'] * 2 + ['pending', 'cancelled', 'rejected'],
+    )
+
+
+class ReviewFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Review
+
+    booking = factory.SubFactory(BookingFactory, status='completed')
+    rating = factory.Faker('random_int', min=1, max=5)
+    comment = factory.Faker('sentence', nb_words=10)
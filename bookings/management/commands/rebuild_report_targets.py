@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from bookings.moderation import rebuild_targets
+
+
+class Command(BaseCommand):
+    help = "Recount the moderation queue (ReportTarget rows) from the reports table; run once after migrating."
+
+    def handle(self, *args, **options):
+        touched = rebuild_targets()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {touched} report targets."))
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.20 on 2026-10-19 06:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_report'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['car', 'status', 'start_date', 'end_date'], name='booking_car_status_dates_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'approved'])), fields=['car', 'start_date', 'end_date'], name='booking_active_overlap_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', '-created_at'], name='booking_user_created_idx'),
+        ),
+    ]
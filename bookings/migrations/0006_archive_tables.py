@@ -0,0 +1,42 @@
+# Generated by Django 3.2.20 on 2026-10-19 07:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0005_similar_cars'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('bookings', '0005_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedBooking',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('total_cost', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('platform_fee', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('owner_payout', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending Approval'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('cancelled', 'Cancelled'), ('completed', 'Completed')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('car', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to='cars.car')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedbooking',
+            index=models.Index(fields=['user', '-created_at'], name='archbooking_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedbooking',
+            index=models.Index(fields=['car', 'start_date'], name='archbooking_car_start_idx'),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 3.2.20 on 2026-10-19 07:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('cars', '0006_car_deleted_at'),
+        ('bookings', '0006_archive_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportTarget',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_type', models.CharField(choices=[('user', 'User'), ('car', 'Car')], max_length=10)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('closed', 'Closed')], default='open', max_length=10)),
+                ('open_count', models.PositiveIntegerField(default=0)),
+                ('report_count', models.PositiveIntegerField(default=0)),
+                ('latest_reason', models.TextField(blank=True)),
+                ('latest_report_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='admin_notes',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='resolved_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='status',
+            field=models.CharField(choices=[('open', 'Open'), ('resolved', 'Resolved'), ('dismissed', 'Dismissed')], default='open', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['report_type', 'status'], name='report_type_status_idx'),
+        ),
+        migrations.AddField(
+            model_name='reporttarget',
+            name='reported_car',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='cars.car'),
+        ),
+        migrations.AddField(
+            model_name='reporttarget',
+            name='reported_user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='target',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reports', to='bookings.reporttarget'),
+        ),
+        migrations.AddIndex(
+            model_name='reporttarget',
+            index=models.Index(fields=['report_type', 'status', '-latest_report_at'], name='reporttarget_queue_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='reporttarget',
+            constraint=models.UniqueConstraint(condition=models.Q(('report_type', 'user')), fields=('reported_user',), name='reporttarget_user_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='reporttarget',
+            constraint=models.UniqueConstraint(condition=models.Q(('report_type', 'car')), fields=('reported_car',), name='reporttarget_car_uniq'),
+        ),
+    ]
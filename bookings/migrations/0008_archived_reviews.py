@@ -0,0 +1,25 @@
+# Generated by Django 3.2.20 on 2026-10-19 08:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_report_moderation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedReview',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('rating', models.PositiveIntegerField()),
+                ('comment', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('booking', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='review', to='bookings.archivedbooking')),
+            ],
+        ),
+    ]
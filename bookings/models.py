@@ -22,10 +22,49 @@ class Booking(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Also serves owner dashboards, which join through car__owner and filter on status
+            models.Index(fields=['car', 'status', 'start_date', 'end_date'], name='booking_car_status_dates_idx'),
+            # Overlap check only ever looks at bookings that still hold the car
+            models.Index(
+                fields=['car', 'start_date', 'end_date'], name='booking_active_overlap_idx',
+                condition=models.Q(status__in=['pending', 'approved']),
+            ),
+            models.Index(fields=['user', '-created_at'], name='booking_user_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.car} ({self.start_date} to {self.end_date})"
 
+class ArchivedBooking(models.Model):
+    """Closed bookings past ARCHIVE_AFTER_DAYS, moved out of the hot table by archive_records.
+
+    Same columns as Booking and the same primary key values, so ids stay stable.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_bookings')
+    car = models.ForeignKey(Car, on_delete=models.CASCADE, related_name='archived_bookings')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    total_cost = models.DecimalField(max_digits=10, decimal_places=2)
+    platform_fee = models.DecimalField(max_digits=10, decimal_places=2)
+    owner_payout = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=20, choices=Booking.STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='archbooking_user_created_idx'),
+            models.Index(fields=['car', 'start_date'], name='archbooking_car_start_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.car} ({self.start_date} to {self.end_date}, archived)"
+
 class Review(models.Model):
     booking = models.OneToOneField(Booking, on_delete=models.CASCADE, related_name='review')
     rating = models.PositiveIntegerField()  # 1-5 stars
@@ -35,15 +74,73 @@ class Review(models.Model):
     def __str__(self):
         return f"Review for {self.booking}"
 
+
+class ArchivedReview(models.Model):
+    """Reviews of archived bookings, moved along with their booking by archive_records."""
+    id = models.BigIntegerField(primary_key=True)
+    booking = models.OneToOneField(ArchivedBooking, on_delete=models.CASCADE, related_name='review')
+    rating = models.PositiveIntegerField()
+    comment = models.TextField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Review for {self.booking}"
+
+class ReportTarget(models.Model):
+    """One row per reported user or car: the moderation queue, with counts kept up to date by bookings.moderation."""
+    STATUS_CHOICES = (
+        ('open', 'Open'),
+        ('closed', 'Closed'),
+    )
+
+    report_type = models.CharField(max_length=10, choices=(('user', 'User'), ('car', 'Car')))
+    reported_user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+    reported_car = models.ForeignKey(Car, null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='open')
+    open_count = models.PositiveIntegerField(default=0)
+    report_count = models.PositiveIntegerField(default=0)
+    latest_reason = models.TextField(blank=True)
+    latest_report_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['reported_user'], condition=models.Q(report_type='user'),
+                                    name='reporttarget_user_uniq'),
+            models.UniqueConstraint(fields=['reported_car'], condition=models.Q(report_type='car'),
+                                    name='reporttarget_car_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['report_type', 'status', '-latest_report_at'], name='reporttarget_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.report_type} {self.reported_user_id or self.reported_car_id}: {self.open_count} open"
+
 class Report(models.Model):
     REPORT_TYPE_CHOICES = (
         ('user', 'User'),
         ('car', 'Car'),
     )
+    STATUS_CHOICES = (
+        ('open', 'Open'),
+        ('resolved', 'Resolved'),
+        ('dismissed', 'Dismissed'),
+    )
 
     reporter = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='reports_made')
     report_type = models.CharField(max_length=10, choices=REPORT_TYPE_CHOICES)
     reason = models.TextField()
     reported_user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.CASCADE, related_name='reports_received')
     reported_car = models.ForeignKey(Car, null=True, blank=True, on_delete=models.CASCADE, related_name='reports')
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    target = models.ForeignKey(ReportTarget, null=True, blank=True, on_delete=models.SET_NULL, related_name='reports')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='open')
+    admin_notes = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['report_type', 'status'], name='report_type_status_idx'),
+        ]
@@ -0,0 +1,108 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Q
+from django.utils import timezone
+
+from .models import Report, ReportTarget
+
+CLOSED_STATUSES = ('resolved', 'dismissed')
+
+
+def _target_lookup(report_type, reported_user_id, reported_car_id):
+    if report_type == 'user':
+        return {'report_type': 'user', 'reported_user_id': reported_user_id}
+    return {'report_type': 'car', 'reported_car_id': reported_car_id}
+
+
+def get_target(report_type, reported_user_id=None, reported_car_id=None):
+    lookup = _target_lookup(report_type, reported_user_id, reported_car_id)
+    try:
+        with transaction.atomic():
+            target, _ = ReportTarget.objects.get_or_create(**lookup)
+    except IntegrityError:
+        # Another request created it first
+        target = ReportTarget.objects.get(**lookup)
+    return target
+
+
+def file_report(reporter, report_type, reason, reported_user=None, reported_car=None):
+    """Create a report and bump its target's counts in the same transaction."""
+    with transaction.atomic():
+        target = get_target(report_type, getattr(reported_user, 'id', None), getattr(reported_car, 'id', None))
+        report = Report.objects.create(
+            reporter=reporter, report_type=report_type, reason=reason,
+            reported_user=reported_user, reported_car=reported_car, target=target,
+        )
+        ReportTarget.objects.filter(id=target.id).update(
+            open_count=F('open_count') + 1, report_count=F('report_count') + 1,
+            latest_reason=reason, latest_report_at=report.created_at, status='open',
+        )
+    return report
+
+
+def _sync_target_status(target_ids):
+    ReportTarget.objects.filter(id__in=target_ids, open_count=0).update(status='closed')
+    ReportTarget.objects.filter(id__in=target_ids, open_count__gt=0).update(status='open')
+
+
+def set_report_status(report, status, admin_notes=None):
+    """Move one report to ``status``, keeping its target's open count in step. Returns the updated report."""
+    with transaction.atomic():
+        # Locked and re-read so concurrent updates of the same report see each other's status
+        report = Report.objects.select_for_update().get(id=report.id)
+        was_open = report.status == 'open'
+        report.status = status
+        if admin_notes is not None:
+            report.admin_notes = admin_notes
+        report.resolved_at = timezone.now() if status in CLOSED_STATUSES else None
+        report.save(update_fields=['status', 'admin_notes', 'resolved_at'])
+
+        if report.target_id and was_open != (status == 'open'):
+            delta = -1 if was_open else 1
+            ReportTarget.objects.filter(id=report.target_id).update(open_count=F('open_count') + delta)
+            _sync_target_status([report.target_id])
+    return report
+
+
+def bulk_resolve(target_ids, status='resolved', admin_notes=''):
+    """Close every open report of the given targets with set-based updates.
+
+    The targets are locked first, so a report filed meanwhile waits and then
+    reopens its target instead of being counted away. Returns the number of
+    reports closed.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        target_ids = list(ReportTarget.objects.select_for_update().filter(id__in=target_ids).values_list('id', flat=True))
+        closed = Report.objects.filter(target_id__in=target_ids, status='open').update(
+            status=status, admin_notes=admin_notes, resolved_at=now,
+        )
+        ReportTarget.objects.filter(id__in=target_ids).update(open_count=0, status='closed', updated_at=now)
+    return closed
+
+
+def rebuild_targets():
+    """Recount every target from the reports table and link unlinked reports. Returns targets touched."""
+    groups = (
+        Report.objects.values('report_type', 'reported_user_id', 'reported_car_id')
+        .annotate(
+            report_count=Count('id'),
+            open_count=Count('id', filter=Q(status='open')),
+            latest_report_at=Max('created_at'),
+        )
+        .order_by()
+    )
+    touched = 0
+    for group in groups.iterator():
+        lookup = _target_lookup(group['report_type'], group['reported_user_id'], group['reported_car_id'])
+        reports = Report.objects.filter(**lookup)
+        with transaction.atomic():
+            target = get_target(group['report_type'], group['reported_user_id'], group['reported_car_id'])
+            latest = reports.order_by('-created_at', '-id').values_list('reason', flat=True).first()
+            ReportTarget.objects.filter(id=target.id).update(
+                report_count=group['report_count'], open_count=group['open_count'],
+                latest_report_at=group['latest_report_at'], latest_reason=latest or '',
+                status='open' if group['open_count'] else 'closed',
+            )
+            reports.exclude(target=target).update(target=target)
+        touched += 1
+    return touched
@@ -1,11 +1,15 @@
+from decimal import Decimal
+
 from rest_framework import serializers
-from .models import Booking
+from .models import Booking, ArchivedBooking
 from cars.serializers import CarSerializer  # optional for nested car info
 from rest_framework.response import Response
 from rest_framework import serializers
-from .models import Report
+from .models import Report, ReportTarget
+from .moderation import file_report
 from users.models import User
 from cars.models import Car
+from cars.pricing import InvalidStay, check_stay, quote
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 
@@ -16,13 +20,23 @@ class BookingSerializer(serializers.ModelSerializer):
         model = Booking
         fields = '__all__'
 
+class ArchivedBookingSerializer(serializers.ModelSerializer):
+    car = CarSerializer(read_only=True)
+    archived = serializers.BooleanField(default=True, read_only=True)
+
+    class Meta:
+        model = ArchivedBooking
+        fields = '__all__'
+
 class ReportSerializer(serializers.ModelSerializer):
     reported_user_id = serializers.IntegerField(required=False, allow_null=True)
     reported_car_id = serializers.IntegerField(required=False, allow_null=True)
 
     class Meta:
         model = Report
-        fields = ['report_type', 'reason', 'reported_user_id', 'reported_car_id']
+        fields = ['id', 'report_type', 'reason', 'reported_user_id', 'reported_car_id',
+                  'status', 'admin_notes', 'created_at', 'resolved_at']
+        read_only_fields = ['id', 'status', 'admin_notes', 'created_at', 'resolved_at']
 
     def validate(self, data):
         report_type = data.get('report_type')
@@ -45,13 +59,31 @@ class ReportSerializer(serializers.ModelSerializer):
         elif report_type == 'car':
             reported_car = Car.objects.get(id=validated_data['reported_car_id'])
 
-        return Report.objects.create(
-            reporter=reporter,
-            report_type=report_type,
-            reason=reason,
-            reported_user=reported_user,
-            reported_car=reported_car,
-        )
+        return file_report(reporter, report_type, reason, reported_user=reported_user, reported_car=reported_car)
+
+
+class ReportTargetSerializer(serializers.ModelSerializer):
+    target = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportTarget
+        fields = ['id', 'report_type', 'target', 'status', 'open_count', 'report_count',
+                  'latest_reason', 'latest_report_at']
+
+    def get_target(self, obj):
+        if obj.report_type == 'user':
+            user = obj.reported_user
+            return {'id': obj.reported_user_id, 'label': user.username if user else None}
+        car = obj.reported_car
+        return {'id': obj.reported_car_id, 'label': str(car) if car else None}
+
+
+class BulkResolveSerializer(serializers.Serializer):
+    targets = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=500)
+    status = serializers.ChoiceField(choices=['resolved', 'dismissed'], default='resolved')
+    admin_notes = serializers.CharField(required=False, allow_blank=True, default='')
+    suspend_users = serializers.BooleanField(default=False)
+    remove_cars = serializers.BooleanField(default=False)
 
 
 
@@ -61,8 +93,10 @@ class BookingCreateSerializer(serializers.Serializer):
     end_date = serializers.DateField()
 
     def validate(self, data):
-        if data['start_date'] > data['end_date']:
-            raise serializers.ValidationError("start_date must be before or equal to end_date.")
+        try:
+            check_stay(data['start_date'], data['end_date'])
+        except InvalidStay as exc:
+            raise serializers.ValidationError(str(exc))
 
         try:
             car = Car.objects.get(id=data['car_id'], status='available')
@@ -87,8 +121,7 @@ class BookingCreateSerializer(serializers.Serializer):
         start_date = validated_data['start_date']
         end_date = validated_data['end_date']
 
-        days = (end_date - start_date).days + 1
-        total_cost = car.daily_rate * Decimal(days)
+        total_cost = quote(car, start_date, end_date).total
         platform_fee = total_cost * Decimal('0.10')
         owner_payout = total_cost - platform_fee
 
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.mail import send_mail
+
+from jobs.queue import task
+from .models import Booking
+
+
+@task(queue='email', max_attempts=5)
+def send_booking_request_email(booking_id):
+    """Tell the car owner about a new booking (or that one was auto-approved)."""
+    booking = Booking.objects.select_related('car__owner', 'user').filter(id=booking_id).first()
+    if booking is None or not booking.car.owner.email:
+        return
+
+    car = booking.car
+    if booking.status == 'approved':
+        subject = f"New booking for your {car.make} {car.model}"
+        action = "It was approved automatically."
+    else:
+        subject = f"Booking request for your {car.make} {car.model}"
+        action = "Please approve or reject it from your dashboard."
+    message = (
+        f"{booking.user.username} booked your {car.year} {car.make} {car.model} "
+        f"from {booking.start_date} to {booking.end_date}.\n\n{action}"
+    )
+    send_mail(subject, message, settings.EMAIL_HOST_USER, [car.owner.email])
@@ -1,3 +1,292 @@
-from django.test import TestCase
+import csv
+import io
+from datetime import date, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+import pytest
+from rest_framework.authtoken.models import Token
+
+from bookings.archive import archive_bookings
+from bookings.factories import BookingFactory, ReviewFactory
+from bookings.models import ArchivedBooking, ArchivedReview, Booking, Report, ReportTarget, Review
+from bookings.moderation import bulk_resolve, file_report, rebuild_targets, set_report_status
+from bookings.serializers import BookingCreateSerializer
+from cars.deletion import soft_delete_car
+from cars.factories import CarFactory, CarFeatureFactory
+from cars.models import Car
+from turo_clone.instrumentation import max_queries
+from users.factories import UserFactory
+
+
+def _days(n):
+    return date.today() + timedelta(days=n)
+
+
+@pytest.fixture
+def car(db):
+    return CarFactory(status='available', auto_approve_bookings=False)
+
+
+@pytest.fixture
+def booked_car(car):
+    # Days 10..14 inclusive are taken
+    BookingFactory(car=car, start_date=_days(10), end_date=_days(14), status='approved')
+    return car
+
+
+def _validate(car, start, end, user):
+    class Request:
+        pass
+    request = Request()
+    request.user = user
+    serializer = BookingCreateSerializer(
+        data={'car_id': car.id, 'start_date': start.isoformat(), 'end_date': end.isoformat()},
+        context={'request': request},
+    )
+    return serializer.is_valid(), serializer.errors
+
+
+@pytest.mark.parametrize('start, end', [
+    (10, 14),   # same stay
+    (8, 10),    # ends on the first booked day
+    (14, 16),   # starts on the last booked day
+    (11, 12),   # inside
+    (5, 20),    # around
+])
+def test_overlapping_stay_is_rejected(booked_car, user, start, end):
+    valid, errors = _validate(booked_car, _days(start), _days(end), user)
+    assert not valid
+    assert 'already booked' in str(errors)
+
+
+@pytest.mark.parametrize('start, end', [(5, 9), (15, 18)])
+def test_adjacent_stay_is_accepted(booked_car, user, start, end):
+    valid, errors = _validate(booked_car, _days(start), _days(end), user)
+    assert valid, errors
+
+
+@pytest.mark.parametrize('status', ['cancelled', 'rejected', 'completed'])
+def test_inactive_bookings_do_not_block(car, user, status):
+    BookingFactory(car=car, start_date=_days(10), end_date=_days(14), status=status)
+    valid, errors = _validate(car, _days(10), _days(14), user)
+    assert valid, errors
+
+
+@pytest.mark.parametrize('start, end', [
+    (-3, 2),        # starts in the past
+    (6, 4),         # ends before it starts
+    (1, 91),        # longer than QUOTE_MAX_DAYS
+    (3000, 3005),   # past PRICE_CALENDAR_MONTHS
+])
+def test_out_of_bounds_stay_is_rejected(car, user, start, end):
+    valid, errors = _validate(car, _days(start), _days(end), user)
+    assert not valid
+    assert 'non_field_errors' in errors
+
+
+def test_pending_booking_blocks(car, user):
+    BookingFactory(car=car, start_date=_days(10), end_date=_days(14), status='pending')
+    valid, _ = _validate(car, _days(12), _days(13), user)
+    assert not valid
+
+
+def test_other_cars_do_not_block(booked_car, user):
+    other = CarFactory(status='available')
+    valid, errors = _validate(other, _days(10), _days(14), user)
+    assert valid, errors
+
+
+
+@pytest.fixture
+def archived_history(user):
+    cars = CarFactory.create_batch(3)
+    for car in cars:
+        CarFeatureFactory.create_batch(2, car=car)
+        BookingFactory(user=user, car=car, start_date=_days(-400), end_date=_days(-398), status='completed')
+        BookingFactory(user=user, car=car, start_date=_days(5), end_date=_days(7), status='approved')
+    assert archive_bookings(horizon_days=30) == 3
+    return cars
+
+
+def test_reviewed_booking_is_archived_with_its_review(user):
+    booking = BookingFactory(user=user, start_date=_days(-400), end_date=_days(-398), status='completed')
+    review = ReviewFactory(booking=booking, rating=4)
+    assert archive_bookings(horizon_days=30) == 1
+    assert not Booking.objects.filter(id=booking.id).exists()
+    assert not Review.objects.exists()
+    archived = ArchivedReview.objects.get(id=review.id)
+    assert archived.booking == ArchivedBooking.objects.get(id=booking.id)
+    assert (archived.rating, archived.comment, archived.created_at) == (4, review.comment, review.created_at)
+
+
+def test_admin_booking_list_prefetches_the_car_graph(client, archived_history):
+    client.force_login(UserFactory(is_staff=True))
+    with max_queries(8):
+        response = client.get('/api/admin/bookings/?include_archived=1')
+    assert response.status_code == 200
+    assert len(response.json()) == 6
+    assert all(len(row['car']['features']) == 2 for row in response.json())
+
+
+def test_my_bookings_with_archive_stays_within_budget(client, user, archived_history):
+    client.force_login(user)
+    with max_queries(4):
+        response = client.get('/api/my-bookings/?include_archived=1')
+    assert [row['archived'] for row in response.json()].count(True) == 3
+
+
+@pytest.fixture
+def reported(db):
+    reporter = UserFactory()
+    offender = UserFactory()
+    car = CarFactory()
+    reports = [
+        file_report(reporter, 'user', 'spam', reported_user=offender),
+        file_report(UserFactory(), 'user', 'rude', reported_user=offender),
+        file_report(reporter, 'car', 'fake photos', reported_car=car),
+    ]
+    return offender, car, reports
+
+
+def _target(report):
+    return ReportTarget.objects.get(id=report.target_id)
+
+
+def test_target_counts_follow_file_resolve_and_reopen(reported):
+    _, _, (first, second, _) = reported
+    target = _target(first)
+    assert (target.open_count, target.report_count, target.status) == (2, 2, 'open')
+    assert target.latest_reason == 'rude'
+
+    # Loaded by a second admin before the first one's update
+    stale = Report.objects.get(id=first.id)
+    set_report_status(first, 'resolved')
+    set_report_status(stale, 'dismissed')
+    target = _target(first)
+    assert (target.open_count, target.status) == (1, 'open')
+
+    set_report_status(second, 'resolved')
+    target = _target(first)
+    assert (target.open_count, target.report_count, target.status) == (0, 2, 'closed')
+
+    set_report_status(first, 'open')
+    target = _target(first)
+    assert (target.open_count, target.status) == (1, 'open')
+    assert Report.objects.get(id=first.id).resolved_at is None
+
+
+def test_bulk_resolve_closes_only_the_given_targets(reported):
+    _, _, (user_report, _, car_report) = reported
+    assert bulk_resolve([user_report.target_id], 'dismissed', 'duplicate') == 2
+    assert (_target(user_report).open_count, _target(user_report).status) == (0, 'closed')
+    assert set(Report.objects.filter(target_id=user_report.target_id).values_list('status', flat=True)) == {'dismissed'}
+    assert _target(car_report).open_count == 1
+
+
+def test_rebuild_targets_recounts_from_reports(reported):
+    _, _, (user_report, _, car_report) = reported
+    Report.objects.filter(id=user_report.id).update(status='resolved')
+    ReportTarget.objects.update(open_count=7, report_count=0)
+    Report.objects.filter(id=car_report.id).update(target=None)
+
+    assert rebuild_targets() == 2
+    target = _target(user_report)
+    assert (target.open_count, target.report_count, target.status) == (1, 2, 'open')
+    assert Report.objects.get(id=car_report.id).target_id is not None
+    assert (_target(car_report).open_count, _target(car_report).report_count) == (1, 1)
+
+
+@pytest.fixture
+def staff_client(db, client):
+    client.force_login(UserFactory(is_staff=True))
+    return client
+
+
+def test_moderation_queue_lists_open_targets(staff_client, reported):
+    _, _, (user_report, _, car_report) = reported
+    set_report_status(car_report, 'dismissed')
+    response = staff_client.get('/api/admin/moderation/reports/')
+    assert response.status_code == 200
+    rows = response.json()['results']
+    assert [row['id'] for row in rows] == [user_report.target_id]
+    assert rows[0]['open_count'] == 2
+
+
+def test_bulk_resolve_endpoint_suspends_and_removes(staff_client, reported):
+    offender, car, (user_report, _, car_report) = reported
+    Token.objects.create(user=offender)
+    soft_delete_car(car.id)
+    response = staff_client.post('/api/admin/moderation/reports/resolve/', {
+        'targets': [user_report.target_id, car_report.target_id],
+        'suspend_users': True, 'remove_cars': True,
+    }, content_type='application/json')
+    assert response.status_code == 200
+    # The car was already deleted, so only the suspension is an action taken here
+    assert response.json() == {'targets': 2, 'reports_closed': 3, 'users_suspended': 1, 'cars_removed': 0}
+    offender.refresh_from_db()
+    assert offender.is_suspended
+    assert not Token.objects.filter(user=offender).exists()
+    assert not Report.objects.filter(status='open').exists()
+    assert not ReportTarget.objects.filter(status='open').exists()
+
+
+def test_bulk_resolve_endpoint_removes_cars(staff_client, reported):
+    _, car, (_, _, car_report) = reported
+    response = staff_client.post('/api/admin/moderation/reports/resolve/', {
+        'targets': [car_report.target_id], 'remove_cars': True,
+    }, content_type='application/json')
+    assert response.json()['cars_removed'] == 1
+    assert Car.all_objects.get(id=car.id).deleted_at is not None
+
+
+def test_report_update_suspension_revokes_tokens(staff_client, reported):
+    offender, _, (user_report, _, _) = reported
+    Token.objects.create(user=offender)
+    response = staff_client.put(f'/api/admin/reports/{user_report.id}/', {
+        'status': 'resolved', 'suspend_user': True,
+    }, content_type='application/json')
+    assert response.status_code == 200
+    offender.refresh_from_db()
+    assert offender.is_suspended
+    assert not Token.objects.filter(user=offender).exists()
+    assert _target(user_report).open_count == 1
+
+
+@pytest.fixture
+def finance_bookings(db):
+    car = CarFactory()
+    for day, cost, status in [(3, '100.00', 'completed'), (10, '50.00', 'completed'), (12, '80.00', 'pending')]:
+        total = Decimal(cost)
+        BookingFactory(car=car, start_date=date(2025, 3, day), end_date=date(2025, 3, day + 1), status=status,
+                       total_cost=total, platform_fee=total / 10, owner_payout=total - total / 10)
+    return car
+
+
+EXPORT_ROWS = {'bookings': 3, 'payouts': 2, 'revenue': 1}
+
+
+def _export(client, dataset, file_format):
+    response = client.get(f'/api/admin/exports/{dataset}.{file_format}')
+    assert response.status_code == 200
+    assert response.streaming
+    return b''.join(response.streaming_content)
+
+
+@pytest.mark.parametrize('dataset', sorted(EXPORT_ROWS))
+def test_export_streams_readable_csv(staff_client, finance_bookings, dataset):
+    rows = list(csv.DictReader(io.StringIO(_export(staff_client, dataset, 'csv').decode())))
+    assert len(rows) == EXPORT_ROWS[dataset]
+    if dataset == 'revenue':
+        assert rows[0]['gross'] == '150.00'
+        assert rows[0]['owner_payout'] == '135.00'
+
+
+@pytest.mark.parametrize('dataset', sorted(EXPORT_ROWS))
+def test_export_streams_readable_arrow(staff_client, finance_bookings, dataset):
+    pa = pytest.importorskip('pyarrow')
+    table = pa.ipc.open_stream(_export(staff_client, dataset, 'arrow')).read_all()
+    assert table.num_rows == EXPORT_ROWS[dataset]
+    if dataset == 'revenue':
+        assert table.column('gross').to_pylist() == [Decimal('150.00')]
+    if dataset == 'payouts':
+        assert sorted(table.column('owner_payout').to_pylist()) == [Decimal('45.00'), Decimal('90.00')]
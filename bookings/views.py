@@ -1,20 +1,40 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from django.utils import timezone
 from datetime import datetime
 from decimal import Decimal
-from .models import Booking, Review,Report
+from .models import Booking, Review,Report, ArchivedBooking, ReportTarget
+from users.models import User
 from .forms import BookingForm, ReviewForm
 from cars.models import Car
 from rest_framework.permissions import IsAuthenticated
-from .serializers import BookingSerializer,ReportSerializer,BookingCreateSerializer
+from .serializers import BookingSerializer,ReportSerializer,BookingCreateSerializer, ArchivedBookingSerializer
+from .serializers import ReportTargetSerializer, BulkResolveSerializer
+from .moderation import bulk_resolve, file_report, set_report_status
+from rest_framework.pagination import LimitOffsetPagination
+from .archive import filter_bookings, with_car_graph
+from cars.deletion import soft_delete_car
+from users.moderation import bulk_moderate
+from turo_clone.archive import include_archived
+from .tasks import send_booking_request_email
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions, status
+from rest_framework import status as http_status
 from rest_framework import generics
 from rest_framework.permissions import IsAdminUser
 from rest_framework.decorators import api_view, permission_classes
+from users.points import credit_points
+from turo_clone.instrumentation import query_budget
+from turo_clone.db_routers import replica_reads
+from turo_clone.sqlite import retry_atomic
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from . import exports
+
+COMPLETION_POINTS = 50
 
 
 class IsAdminOrSupport(permissions.BasePermission):
@@ -25,18 +45,24 @@ class IsAdminOnly(permissions.BasePermission):
         return request.user.user_type == 'admin'
 
 
+@replica_reads
+@query_budget(3)
 class AdminReportListAPIView(generics.ListAPIView):
     serializer_class = ReportSerializer
+    permission_classes = [IsAdminUser]
 
     def get_queryset(self):
-        queryset = Report.objects.all()
+        queryset = Report.objects.order_by('-created_at')
         report_type = self.request.query_params.get("report_type")
         status = self.request.query_params.get("status")
+        target = self.request.query_params.get("target")
 
         if report_type:
             queryset = queryset.filter(report_type=report_type)
         if status:
             queryset = queryset.filter(status=status)
+        if target:
+            queryset = queryset.filter(target_id=target)
 
         return queryset
 class AdminReportUpdateAPIView(APIView):
@@ -49,19 +75,78 @@ class AdminReportUpdateAPIView(APIView):
         suspend_user = request.data.get('suspend_user', False)
         remove_car = request.data.get('remove_car', False)
 
-        report.status = status
-        report.admin_notes = notes
-        report.save()
-
-        if status == 'resolved':
-            if report.report_type == 'user' and suspend_user:
-                report.reported_user.is_suspended = True
-                report.reported_user.save()
-            elif report.report_type == 'car' and remove_car:
-                report.reported_car.delete()
+        if status not in dict(Report.STATUS_CHOICES):
+            return Response({'error': 'Invalid status'}, status=http_status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            report = set_report_status(report, status, notes)
+            if status == 'resolved':
+                if report.report_type == 'user' and suspend_user:
+                    bulk_moderate(User.objects.filter(id=report.reported_user_id), {'is_suspended': True}, revoke=True)
+                elif report.report_type == 'car' and remove_car:
+                    soft_delete_car(report.reported_car_id)
 
         return Response({'message': 'Report updated successfully'})
 
+
+class ModerationQueuePagination(LimitOffsetPagination):
+    default_limit = 50
+    max_limit = 200
+
+
+@replica_reads
+@query_budget(3)
+class ModerationQueueAPIView(generics.ListAPIView):
+    """Reported users and cars, one row per target with its report counts; open ones by default."""
+    serializer_class = ReportTargetSerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = ModerationQueuePagination
+
+    def get_queryset(self):
+        queryset = ReportTarget.objects.select_related('reported_user', 'reported_car')
+        report_type = self.request.query_params.get("report_type")
+        if report_type:
+            queryset = queryset.filter(report_type=report_type)
+        queryset = queryset.filter(status=self.request.query_params.get("status", "open"))
+        return queryset.order_by('-open_count', '-latest_report_at')
+
+
+class ModerationBulkResolveAPIView(APIView):
+    """Resolve or dismiss every open report of many targets at once."""
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        serializer = BulkResolveSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=http_status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        suspended = removed = 0
+        # Reports are only closed together with the action taken on them
+        with transaction.atomic():
+            targets = list(ReportTarget.objects.filter(id__in=data['targets'])
+                           .values_list('id', 'report_type', 'reported_user_id', 'reported_car_id'))
+            target_ids = [target[0] for target in targets]
+            closed = bulk_resolve(target_ids, data['status'], data['admin_notes'])
+
+            if data['status'] == 'resolved':
+                if data['suspend_users']:
+                    user_ids = [user_id for _, kind, user_id, _ in targets if kind == 'user' and user_id]
+                    users = User.objects.filter(id__in=user_ids)
+                    suspended = bulk_moderate(users, {'is_suspended': True}, revoke=True)['updated']
+                if data['remove_cars']:
+                    for _, kind, _, car_id in targets:
+                        # None when the car was already deleted
+                        if kind == 'car' and car_id and soft_delete_car(car_id):
+                            removed += 1
+
+        return Response({
+            'targets': len(target_ids),
+            'reports_closed': closed,
+            'users_suspended': suspended,
+            'cars_removed': removed,
+        })
+
+
 class AdminBookingUpdateAPIView(generics.UpdateAPIView):
     queryset = Booking.objects.all()
     serializer_class = BookingSerializer
@@ -69,36 +154,33 @@ class AdminBookingUpdateAPIView(generics.UpdateAPIView):
     lookup_field = 'id'
 
 
+# Session, user, bookings and the car features and availability prefetches; the archive repeats the last three
+@replica_reads
+@query_budget(8)
 class AdminBookingListAPIView(generics.ListAPIView):
     serializer_class = BookingSerializer
 
     def get_queryset(self):
-        queryset = Booking.objects.all()
-        status = self.request.query_params.get("status")
-        user_id = self.request.query_params.get("user_id")
-        car_id = self.request.query_params.get("car_id")
-        start_date = self.request.query_params.get("start_date")
-        end_date = self.request.query_params.get("end_date")
+        return with_car_graph(filter_bookings(Booking.objects.all(), self.request.query_params))
 
-        if status:
-            queryset = queryset.filter(status=status)
-        if user_id:
-            queryset = queryset.filter(user_id=user_id)
-        if car_id:
-            queryset = queryset.filter(car_id=car_id)
-        if start_date:
-            queryset = queryset.filter(start_date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(end_date__lte=end_date)
-
-        return queryset
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if include_archived(request):
+            archived = with_car_graph(filter_bookings(ArchivedBooking.objects.all(), request.query_params))
+            response.data = list(response.data) + ArchivedBookingSerializer(archived, many=True).data
+        return response
 
 
+# Session, user and bookings; ?include_archived=1 adds the archived bookings query
+@query_budget(4)
 class MyBookingsAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        bookings = Booking.objects.filter(user=request.user).order_by('-created_at')
+        bookings = list(Booking.objects.filter(user=request.user).select_related('car').order_by('-created_at'))
+        if include_archived(request):
+            archived = ArchivedBooking.objects.filter(user=request.user).select_related('car').order_by('-created_at')
+            bookings += list(archived)
 
         data = []
         for booking in bookings:
@@ -118,18 +200,27 @@ class MyBookingsAPIView(APIView):
                 "platform_fee": str(booking.platform_fee),
                 "owner_payout": str(booking.owner_payout),
                 "created_at": booking.created_at,
+                "archived": isinstance(booking, ArchivedBooking),
             })
 
         return Response(data)
 
 
+@retry_atomic
+def _create_booking(serializer):
+    # create() rather than save(): a retried save() would update the rolled-back instance
+    booking = serializer.create(serializer.validated_data)
+    send_booking_request_email.enqueue(booking_id=booking.id)
+    return booking
+
+
 class BookingCreateAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
         serializer = BookingCreateSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
-            booking = serializer.save()
+            booking = _create_booking(serializer)
             return Response({
                 "message": "Booking created successfully.",
                 "booking_id": booking.id,
@@ -163,11 +254,7 @@ class ReportCreateAPIView(APIView):
             except User.DoesNotExist:
                 return Response({'error': 'Reported user does not exist'}, status=status.HTTP_404_NOT_FOUND)
             
-            report = Report.objects.create(
-                report_type='user',
-                reason=reason,
-                reported_user=reported_user
-            )
+            report = file_report(request.user, 'user', reason, reported_user=reported_user)
         else:  # report_type == 'car'
             if not reported_car_id:
                 return Response({'error': 'reported_car_id is required for car reports'}, status=status.HTTP_400_BAD_REQUEST)
@@ -176,12 +263,7 @@ class ReportCreateAPIView(APIView):
             except Car.DoesNotExist:
                 return Response({'error': 'Reported car does not exist'}, status=status.HTTP_404_NOT_FOUND)
             
-            report = Report.objects.create(
-                report_type='car',
-                reporter=request.user,
-                reason=reason,
-                reported_car=reported_car
-            )
+            report = file_report(request.user, 'car', reason, reported_car=reported_car)
 
         return Response({'message': 'Report created successfully'}, status=status.HTTP_201_CREATED)
 
@@ -212,17 +294,20 @@ class BookingApprovalAPIView(APIView):
 
         # Update status
         booking.status = 'approved' if action == 'approve' else 'rejected'
-        booking.save()
+        retry_atomic(booking.save)()
 
         return Response({"message": f"Booking {action}d successfully."}, status=status.HTTP_200_OK)
 
 
+@query_budget(5)
 class OwnerBookingsAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         # Get all bookings for cars owned by the current user
-        bookings = Booking.objects.filter(car__owner=request.user)
+        bookings = Booking.objects.filter(car__owner=request.user).select_related('car').prefetch_related(
+            'car__features', 'car__availability'
+        )
 
         # Optional status filter
         status_filter = request.query_params.get('status')
@@ -233,11 +318,29 @@ class OwnerBookingsAPIView(APIView):
         serializer = BookingSerializer(bookings, many=True)
         return Response(serializer.data)
 
+@retry_atomic
+def _complete_booking(booking):
+    """Mark an approved booking completed and award its points; None if it was no longer approved."""
+    # Conditional update so concurrent requests cannot complete (and award) twice
+    updated = Booking.objects.filter(id=booking.id, status='approved').update(
+        status='completed', updated_at=timezone.now()
+    )
+    if not updated:
+        return None
+
+    # Award points if regular user
+    awarded_points = 0
+    if booking.user.user_type == 'regular':
+        awarded_points = COMPLETION_POINTS
+        credit_points(booking.user, awarded_points, 'booking_completed', reference=f"booking:{booking.id}")
+    return awarded_points
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def complete_booking(request, booking_id):
     try:
-        booking = Booking.objects.get(id=booking_id)
+        booking = Booking.objects.select_related('car', 'user').get(id=booking_id)
     except Booking.DoesNotExist:
         return Response({"error": "Booking not found."}, status=status.HTTP_404_NOT_FOUND)
 
@@ -248,17 +351,13 @@ def complete_booking(request, booking_id):
     if booking.status != 'approved':
         return Response({"error": "Only approved bookings can be marked as completed."}, status=status.HTTP_400_BAD_REQUEST)
 
-    booking.status = 'completed'
-    booking.save()
-
-    # Award points if regular user
-    if booking.user.user_type == 'regular':
-        booking.user.points += 50  # You can change this logic if you want
-        booking.user.save()
+    awarded_points = _complete_booking(booking)
+    if awarded_points is None:
+        return Response({"error": "Only approved bookings can be marked as completed."}, status=status.HTTP_400_BAD_REQUEST)
 
     return Response({
         "message": "Booking marked as completed. Points awarded.",
-        "awarded_points": 50,
+        "awarded_points": awarded_points,
         "total_user_points": booking.user.points
     }, status=status.HTTP_200_OK)
 
@@ -395,3 +494,48 @@ def review_create(request, booking_id):
         form = ReviewForm()
     
     return render(request, 'bookings/review_form.html', {'form': form, 'booking': booking})
+
+
+# Only the request's own lookups; rows are read in chunks while the body streams
+@query_budget(2)
+class AdminExportAPIView(APIView):
+    """Streaming finance exports: /admin/exports/<bookings|payouts|revenue>.<csv|parquet|arrow>
+
+    Filters: status, start_date, end_date, car_id, owner_id; revenue also
+    takes period=day|month. Rows are read in chunks, so memory stays flat
+    however many bookings match.
+    """
+    permission_classes = [IsAdminUser]
+
+    def perform_content_negotiation(self, request, force=False):
+        # Clients asking for text/csv etc. get the file; only errors go through a renderer
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, dataset, file_format):
+        if dataset not in exports.DATASETS or file_format not in exports.FORMATS:
+            return Response({'error': 'Unknown export.'}, status=status.HTTP_404_NOT_FOUND)
+        if file_format in exports.COLUMNAR_FORMATS and exports.pa is None:
+            return Response({'error': f'{file_format} exports need pyarrow installed.'},
+                            status=status.HTTP_501_NOT_IMPLEMENTED)
+
+        params = {key: request.query_params.get(key) for key in
+                  ('status', 'start_date', 'end_date', 'car_id', 'owner_id', 'period')}
+        for key in ('start_date', 'end_date'):
+            if params[key]:
+                try:
+                    params[key] = parse_date(params[key])
+                except ValueError:
+                    params[key] = None
+                if params[key] is None:
+                    return Response({'error': f'{key} must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        for key in ('car_id', 'owner_id'):
+            if params[key] and not params[key].isdigit():
+                return Response({'error': f'{key} must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            exports.stream_export(dataset, file_format, params),
+            content_type=exports.FORMATS[file_format],
+        )
+        filename = f'{dataset}-{timezone.localdate().isoformat()}.{file_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Car, CarImage, CarFeature, CarAvailability
+from .models import Car, CarImage, CarFeature, CarAvailability, CarPricingRule
+from .facets import invalidate_catalog
 
 class CarImageInline(admin.TabularInline):
     model = CarImage
@@ -13,18 +14,25 @@ class CarAvailabilityInline(admin.TabularInline):
     model = CarAvailability
     extra = 1
 
+class CarPricingRuleInline(admin.TabularInline):
+    model = CarPricingRule
+    extra = 0
+
 @admin.register(Car)
 class CarAdmin(admin.ModelAdmin):
     list_display = ('make', 'model', 'year', 'owner', 'daily_rate', 'status')
     list_filter = ('status', 'make', 'year')
     search_fields = ('make', 'model', 'owner__username')
-    inlines = [CarImageInline, CarFeatureInline, CarAvailabilityInline]
+    inlines = [CarImageInline, CarFeatureInline, CarAvailabilityInline, CarPricingRuleInline]
     actions = ['approve_cars', 'reject_cars']
     
     def approve_cars(self, request, queryset):
         queryset.update(status='available')
+        # update() skips the post_save signal that expires cached facet counts
+        invalidate_catalog()
     approve_cars.short_description = "Approve selected cars"
     
     def reject_cars(self, request, queryset):
         queryset.update(status='rejected')
+        invalidate_catalog()
     reject_cars.short_description = "Reject selected cars"
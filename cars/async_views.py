@@ -0,0 +1,58 @@
+from django.http import HttpResponse, HttpResponseNotAllowed
+from django.db.models import Prefetch
+
+from api.serializers import CarSerializer
+from turo_clone.async_db import run_db
+from turo_clone.db_routers import replica_reads
+from turo_clone.instrumentation import query_budget
+from turo_clone.renderers import FastJSONRenderer
+from .models import Car, CarImage
+from .pricing import InvalidStay
+from .views import available_cars_data
+
+# Async variants of the public car reads. The handler never blocks the event
+# loop: each view gathers everything it needs in a single run_db() call, so a
+# slow client holds a coroutine rather than a worker thread.
+
+
+def _json(data, status=200):
+    # Same renderer as the DRF views, so dates and decimals serialize identically
+    return HttpResponse(FastJSONRenderer().render(data), status=status, content_type='application/json')
+
+
+@replica_reads
+@query_budget(6)
+async def available_cars(request):
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET', 'HEAD'])
+    try:
+        return _json(await run_db(available_cars_data, request))
+    except InvalidStay as exc:
+        return _json({'error': str(exc)}, status=400)
+
+
+def _car_detail_data(request, car_id):
+    car = (
+        Car.objects.filter(id=car_id, status='available')
+        .select_related('owner')
+        .prefetch_related(
+            Prefetch('images', queryset=CarImage.objects.order_by('id')),
+            'features',
+            'availability',
+        )
+        .first()
+    )
+    if car is None:
+        return None
+    return CarSerializer(car, context={'request': request}).data
+
+
+@replica_reads
+@query_budget(4)
+async def car_detail(request, car_id):
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET', 'HEAD'])
+    data = await run_db(_car_detail_data, request, car_id)
+    if data is None:
+        return _json({'detail': 'Not found.'}, status=404)
+    return _json(data)
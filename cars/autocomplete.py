@@ -0,0 +1,167 @@
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+from .models import Car
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ['make', 'model', 'location']
+
+
+def normalize(value):
+    return ' '.join((value or '').lower().split())
+
+
+class PrefixIndex:
+    """Distinct values of one field, weighted by listing count, searchable by prefix.
+
+    Every word start of a value is a sorted key, so "fran" finds
+    "San Francisco, CA". Lookups are a bisect plus a scan over the matching run.
+    """
+
+    def __init__(self):
+        self._keys = []       # sorted (key, normalized value)
+        self._counts = {}     # normalized value -> listing count
+        self._display = {}    # normalized value -> first spelling seen
+
+    @staticmethod
+    def _key_starts(value):
+        words = value.split(' ')
+        return {' '.join(words[i:]) for i in range(len(words))}
+
+    def add(self, value, count=1):
+        value_key = normalize(value)
+        if not value_key:
+            return
+        if value_key not in self._counts:
+            self._counts[value_key] = 0
+            self._display[value_key] = value.strip()
+            for key in self._key_starts(value_key):
+                insort(self._keys, (key, value_key))
+        self._counts[value_key] += count
+
+    def remove(self, value):
+        value_key = normalize(value)
+        if value_key not in self._counts:
+            return
+        self._counts[value_key] -= 1
+        if self._counts[value_key] > 0:
+            return
+        del self._counts[value_key]
+        del self._display[value_key]
+        for key in self._key_starts(value_key):
+            position = bisect_left(self._keys, (key, value_key))
+            if position < len(self._keys) and self._keys[position] == (key, value_key):
+                del self._keys[position]
+
+    def search(self, prefix, limit):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        matches = set()
+        position = bisect_left(self._keys, (prefix,))
+        while position < len(self._keys) and self._keys[position][0].startswith(prefix):
+            matches.add(self._keys[position][1])
+            position += 1
+        best = heapq.nlargest(limit, matches, key=lambda value_key: (self._counts[value_key], value_key))
+        return [{'value': self._display[value_key], 'count': self._counts[value_key]} for value_key in best]
+
+
+class Autocomplete:
+    """Per-process typeahead over available cars' make, model and location.
+
+    Built from one query, then kept current by the car signals of this
+    process. Changes made elsewhere (other workers, queryset.update()) are
+    picked up by a background rebuild every AUTOCOMPLETE_REBUILD_SECONDS.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._indexes = None
+        self._cars = {}
+        self._built_at = None
+        self._rebuilding = False
+
+    def build(self):
+        rows = Car.objects.filter(status='available').values_list('id', *FIELDS)
+        indexes = {field: PrefixIndex() for field in FIELDS}
+        cars = {}
+        for car_id, *values in rows.iterator():
+            cars[car_id] = tuple(values)
+            for field, value in zip(FIELDS, values):
+                indexes[field].add(value)
+        with self._lock:
+            self._indexes, self._cars = indexes, cars
+            self._built_at = time.monotonic()
+
+    def warm(self):
+        """Build at worker startup. Best effort: before migrate, or when the server
+        loads the app inside its event loop, the first search builds instead."""
+        try:
+            self.build()
+        except Exception:
+            logger.warning("Autocomplete index not built at startup", exc_info=True)
+        finally:
+            # Loaded before forking (gunicorn --preload), the workers would
+            # otherwise all inherit and share this one socket. None when the
+            # build never got to connect, e.g. inside the server's event loop.
+            if connection.connection is not None:
+                connection.close()
+
+    def _rebuild_in_background(self):
+        try:
+            self.build()
+        except DatabaseError:
+            logger.exception("Autocomplete index rebuild failed")
+        finally:
+            self._rebuilding = False
+            # The thread's own connection would otherwise stay open until exit
+            connection.close()
+
+    def _ensure_fresh(self):
+        if self._indexes is None:
+            self.build()
+            return
+        max_age = getattr(settings, 'AUTOCOMPLETE_REBUILD_SECONDS', 300)
+        with self._lock:
+            if self._rebuilding or time.monotonic() - self._built_at < max_age:
+                return
+            self._rebuilding = True
+        # Stale answers keep being served while the new index loads
+        threading.Thread(target=self._rebuild_in_background, daemon=True).start()
+
+    def car_changed(self, car):
+        with self._lock:
+            if self._indexes is None:
+                return
+            self._forget(car.id)
+            if car.status == 'available':
+                values = tuple(getattr(car, field) for field in FIELDS)
+                self._cars[car.id] = values
+                for field, value in zip(FIELDS, values):
+                    self._indexes[field].add(value)
+
+    def car_removed(self, car_id):
+        with self._lock:
+            if self._indexes is not None:
+                self._forget(car_id)
+
+    def _forget(self, car_id):
+        values = self._cars.pop(car_id, None)
+        if values:
+            for field, value in zip(FIELDS, values):
+                self._indexes[field].remove(value)
+
+    def search(self, prefix, fields=FIELDS, limit=8):
+        self._ensure_fresh()
+        with self._lock:
+            return {field: self._indexes[field].search(prefix, limit) for field in fields}
+
+
+index = Autocomplete()
@@ -0,0 +1,182 @@
+import time
+from calendar import monthrange
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import CharField, F, Value
+
+from bookings.models import Booking
+from .models import Car, CarAvailability
+
+# Booking statuses that take the car, mapped to the calendar state they produce
+BOOKING_STATES = {'approved': 'booked', 'completed': 'booked', 'pending': 'pending'}
+# Later states win when a day is covered by several rows
+STATE_RANK = {'blocked': 0, 'available': 1, 'pending': 2, 'booked': 3}
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(day):
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def month_key(day):
+    return day.strftime('%Y-%m')
+
+
+def _version_key(car_id):
+    return f'car-calendar:{car_id}:version'
+
+
+def calendar_version(car_id):
+    version = cache.get(_version_key(car_id))
+    if version is None:
+        # A fresh, never-used version: entries cached under an evicted counter stay unreachable
+        version = time.time_ns()
+        cache.add(_version_key(car_id), version, None)
+        version = cache.get(_version_key(car_id), version)
+    return version
+
+
+def invalidate_car_calendar(car_id):
+    """Drop every cached month of the car's calendar by moving it to a new version."""
+    try:
+        cache.incr(_version_key(car_id))
+    except ValueError:
+        cache.set(_version_key(car_id), time.time_ns(), None)
+
+
+def calendar_rows(car_id, start, end):
+    """Availability windows and taking bookings overlapping [start, end], in one UNION query."""
+    windows = (
+        CarAvailability.objects.filter(car_id=car_id, start_date__lte=end, end_date__gte=start)
+        .annotate(kind=Value('available', output_field=CharField()))
+        .values_list('start_date', 'end_date', 'kind')
+    )
+    bookings = (
+        Booking.objects.filter(car_id=car_id, status__in=list(BOOKING_STATES), start_date__lte=end, end_date__gte=start)
+        .annotate(kind=F('status'))
+        .values_list('start_date', 'end_date', 'kind')
+    )
+    return windows.union(bookings, all=True)
+
+
+def compute_days(rows, start, end):
+    """{date: state} for every day in [start, end]; days outside any window are blocked."""
+    states = {}
+    for row_start, row_end, kind in rows:
+        state = BOOKING_STATES.get(kind, kind)
+        day = max(row_start, start)
+        last = min(row_end, end)
+        while day <= last:
+            if STATE_RANK[state] > STATE_RANK[states.get(day, 'blocked')]:
+                states[day] = state
+            day += timedelta(days=1)
+    return {
+        start + timedelta(days=offset): states.get(start + timedelta(days=offset), 'blocked')
+        for offset in range((end - start).days + 1)
+    }
+
+
+def _month_payload(first, days):
+    last = first.replace(day=monthrange(first.year, first.month)[1])
+    return {
+        'month': month_key(first),
+        'days': [
+            {'date': day.isoformat(), 'state': days[day]}
+            for day in (first + timedelta(days=offset) for offset in range((last - first).days + 1))
+        ],
+    }
+
+
+def car_calendar(car_id, first_month, months):
+    """Per-day states for ``months`` months from ``first_month``, cached per car-month."""
+    firsts = [first_month]
+    for _ in range(months - 1):
+        firsts.append(next_month(firsts[-1]))
+
+    version = calendar_version(car_id)
+    keys = {first: f'car-calendar:{car_id}:{version}:{month_key(first)}' for first in firsts}
+    cached = cache.get_many(list(keys.values()))
+
+    missing = [first for first in firsts if keys[first] not in cached]
+    if missing:
+        start, end = missing[0], next_month(missing[-1]) - timedelta(days=1)
+        days = compute_days(calendar_rows(car_id, start, end), start, end)
+        fresh = {keys[first]: _month_payload(first, days) for first in missing}
+        cache.set_many(fresh, getattr(settings, 'CAR_CALENDAR_CACHE_SECONDS', 3600))
+        cached.update(fresh)
+
+    return [cached[keys[first]] for first in firsts]
+
+
+def parse_month(value, default):
+    """``'2026-10'`` -> date(2026, 10, 1); ``default`` if empty, None if malformed."""
+    if not value:
+        return month_start(default)
+    try:
+        year, month = value.split('-')
+        return date(int(year), int(month), 1)
+    except ValueError:
+        return None
+
+
+def coalesce(windows):
+    """Minimal sorted list of (start, end) covering the same days: overlapping and adjacent windows merge."""
+    merged = []
+    for start, end in sorted(windows):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def replace_availability(car_id, windows, merge=False):
+    """Make the car's availability exactly ``coalesce(windows)``, touching only rows that differ.
+
+    With ``merge`` the windows are added to the current ones instead. Runs in
+    one transaction with the car row locked, so concurrent updates of the
+    same car apply one after the other. Returns (rows, created, deleted).
+    """
+    with transaction.atomic():
+        # Serializes writers per car (SQLite has no row locks but serializes all writers)
+        Car.objects.select_for_update().filter(id=car_id).values_list('id').first()
+        existing = list(CarAvailability.objects.filter(car_id=car_id).order_by('start_date', 'id'))
+        if merge:
+            windows = [(row.start_date, row.end_date) for row in existing] + list(windows)
+        target = coalesce(windows)
+
+        wanted = set(target)
+        keep, stale = {}, []
+        for row in existing:
+            window = (row.start_date, row.end_date)
+            if window in wanted and window not in keep:
+                keep[window] = row
+            else:
+                stale.append(row.id)
+        missing = [CarAvailability(car_id=car_id, start_date=start, end_date=end)
+                   for start, end in target if (start, end) not in keep]
+
+        if not stale and not missing:
+            return existing, 0, 0
+        if stale:
+            CarAvailability.objects.filter(id__in=stale).delete()
+        if missing:
+            CarAvailability.objects.bulk_create(missing)
+        # bulk_create() sends no post_save, so refresh the calendar here
+        transaction.on_commit(lambda: invalidate_car_calendar(car_id))
+        # Re-read for the primary keys bulk_create() does not return on every backend
+        rows = list(CarAvailability.objects.filter(car_id=car_id).order_by('start_date'))
+    return rows, len(missing), len(stale)
+
+
+def add_availability(car_id, start_date, end_date):
+    """Add one window, merging it into its neighbours; returns the stored row that covers it."""
+    rows, _, _ = replace_availability(car_id, [(start_date, end_date)], merge=True)
+    return next(row for row in rows if row.start_date <= start_date and end_date <= row.end_date)
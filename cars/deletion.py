@@ -0,0 +1,22 @@
+from django.db import transaction
+from django.utils import timezone
+
+from . import autocomplete
+from .facets import invalidate_catalog
+from .models import Car
+from .tasks import purge_car
+
+
+def soft_delete_car(car_id):
+    """Hide the car now and queue the purge of its rows and files.
+
+    Returns the purge Job, or None when the car was already deleted.
+    """
+    with transaction.atomic():
+        if not Car.all_objects.filter(id=car_id, deleted_at__isnull=True).update(deleted_at=timezone.now()):
+            return None
+        job = purge_car.enqueue(car_id=car_id)
+        # update() sends no signals
+        transaction.on_commit(invalidate_catalog)
+        transaction.on_commit(lambda: autocomplete.index.car_removed(car_id))
+    return job
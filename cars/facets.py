@@ -0,0 +1,187 @@
+import hashlib
+import json
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, F, IntegerField, Q, Value, When
+from django.db.models.functions import Cast, Mod
+
+# (label, lower bound inclusive, upper bound exclusive) on daily_rate
+PRICE_BANDS = [
+    ('0-50', None, 50),
+    ('50-100', 50, 100),
+    ('100-200', 100, 200),
+    ('200+', 200, None),
+]
+YEAR_BAND_SIZE = 5
+# Selected values outside these are dropped like unknown ones (and would overflow the INTEGER columns)
+YEAR_RE = re.compile(r'[0-9]{4}')
+SEATS_RE = re.compile(r'[0-9]{1,2}')
+
+# In response order; the two bands are computed in SQL
+FACETS = ['make', 'fuel_type', 'transmission', 'seats', 'year_band', 'price_band']
+
+CATALOG_VERSION_KEY = 'car-catalog:version'
+
+
+def catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        cache.add(CATALOG_VERSION_KEY, version, None)
+        version = cache.get(CATALOG_VERSION_KEY, version)
+    return version
+
+
+def invalidate_catalog():
+    """Expire every cached facet count; call once per batch of car changes."""
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, time.time_ns(), None)
+
+
+def _price_band_q(label):
+    for band, low, high in PRICE_BANDS:
+        if band == label:
+            q = Q()
+            if low is not None:
+                q &= Q(daily_rate__gte=low)
+            if high is not None:
+                q &= Q(daily_rate__lt=high)
+            return q
+    return None
+
+
+def _year_band_q(label):
+    first = label.split('-')[0]
+    if not YEAR_RE.fullmatch(first):
+        return None
+    first = int(first)
+    first -= first % YEAR_BAND_SIZE
+    return Q(year__gte=first, year__lt=first + YEAR_BAND_SIZE)
+
+
+def year_band(year):
+    first = year - year % YEAR_BAND_SIZE
+    return f'{first}-{first + YEAR_BAND_SIZE - 1}'
+
+
+def parse_selection(params):
+    """{facet: sorted values} from ``?make=Toyota,Honda&seats=5``; unknown values are dropped."""
+    selection = {}
+    for facet in FACETS:
+        raw = params.get(facet)
+        if not raw:
+            continue
+        values = {value.strip() for value in raw.split(',') if value.strip()}
+        if facet == 'seats':
+            values = {value for value in values if SEATS_RE.fullmatch(value)}
+        elif facet == 'price_band':
+            values = {value for value in values if _price_band_q(value) is not None}
+        elif facet == 'year_band':
+            # '2017' and '2015-2019' both name the band holding that year
+            values = {year_band(int(value.split('-')[0])) for value in values if _year_band_q(value) is not None}
+        if values:
+            selection[facet] = sorted(values)
+    return selection
+
+
+def facet_q(facet, values):
+    """OR of the selected values of one facet."""
+    if facet == 'price_band':
+        parts = [_price_band_q(value) for value in values]
+    elif facet == 'year_band':
+        parts = [_year_band_q(value) for value in values]
+    elif facet == 'seats':
+        return Q(seats__in=[int(value) for value in values])
+    else:
+        return Q(**{f'{facet}__in': values})
+    q = Q()
+    for part in parts:
+        q |= part
+    return q
+
+
+def apply_selection(queryset, selection):
+    for facet, values in selection.items():
+        queryset = queryset.filter(facet_q(facet, values))
+    return queryset
+
+
+def _price_band_case():
+    whens = []
+    for label, low, high in PRICE_BANDS:
+        if high is not None:
+            whens.append(When(daily_rate__lt=high, then=Value(label)))
+    return Case(*whens, default=Value(PRICE_BANDS[-1][0]), output_field=CharField())
+
+
+def compute_facets(queryset, selection):
+    """Counts per value of every facet for ``queryset`` narrowed by ``selection``, in one GROUP BY.
+
+    Counting is disjunctive: a facet's own selection is ignored when counting
+    its values, so picking "Toyota" still shows how many Hondas there are.
+    """
+    rows = list(
+        queryset.annotate(
+            year_band_start=Cast(F('year') - Mod('year', YEAR_BAND_SIZE), IntegerField()),
+            price_band=_price_band_case(),
+        )
+        .values('make', 'fuel_type', 'transmission', 'seats', 'year_band_start', 'price_band')
+        .annotate(n=Count('id'))
+        .order_by()
+    )
+    for row in rows:
+        row['year_band'] = year_band(row.pop('year_band_start'))
+
+    facets = {facet: {} for facet in FACETS}
+    total = 0
+    for row in rows:
+        failed = [facet for facet, values in selection.items() if str(row[facet]) not in values]
+        if not failed:
+            total += row['n']
+        # A row counts towards a facet only if every other facet's selection holds
+        for facet in FACETS:
+            if failed and failed != [facet]:
+                continue
+            counts = facets[facet]
+            counts[row[facet]] = counts.get(row[facet], 0) + row['n']
+
+    ordered = {}
+    for facet, counts in facets.items():
+        if facet in ('make', 'fuel_type', 'transmission'):
+            items = sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+        elif facet == 'price_band':
+            order = [label for label, _, _ in PRICE_BANDS]
+            items = sorted(counts.items(), key=lambda item: order.index(item[0]))
+        else:
+            items = sorted(counts.items())
+        ordered[facet] = [
+            {'value': value, 'count': count, 'selected': str(value) in selection.get(facet, ())}
+            for value, count in items
+        ]
+    return {'total': total, 'facets': ordered}
+
+
+def cached_facets(queryset, selection, scope):
+    """``compute_facets`` cached per normalized ``scope`` + ``selection`` and catalog version.
+
+    ``scope`` holds the non-facet filters that shaped ``queryset`` (owner,
+    location, visibility); together with ``selection`` it names the result.
+    """
+    signature = json.dumps({'scope': scope, 'selection': selection}, sort_keys=True)
+    key = f'car-facets:{hashlib.sha1(signature.encode()).hexdigest()}'
+    # The entry carries the catalog version it was computed at, so one lookup reads both
+    found = cache.get_many([CATALOG_VERSION_KEY, key])
+    version = found.get(CATALOG_VERSION_KEY)
+    if version is None:
+        version = catalog_version()
+    entry = found.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    result = compute_facets(queryset, selection)
+    cache.set(key, (version, result), getattr(settings, 'CAR_FACETS_CACHE_SECONDS', 300))
+    return result
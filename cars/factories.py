@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+import factory
+
+from cars.models import Car, CarImage, CarFeature, CarAvailability
+from users.factories import OwnerFactory
+
+MAKES = {
+    'Toyota': ['Corolla', 'Camry', 'RAV4', 'Prius'],
+    'Honda': ['Civic', 'Accord', 'CR-V'],
+    'Ford': ['Focus', 'Mustang', 'F-150'],
+    'Tesla': ['Model 3', 'Model Y'],
+    'BMW': ['3 Series', 'X5'],
+    'Kia': ['Sportage', 'Rio'],
+}
+CITIES = [
+    ('Los Angeles', 34.05, -118.24), ('San Francisco', 37.77, -122.42), ('New York', 40.71, -74.01),
+    ('Chicago', 41.88, -87.63), ('Miami', 25.76, -80.19), ('Seattle', 47.61, -122.33),
+]
+FEATURES = ['GPS', 'Bluetooth', 'Backup camera', 'Heated seats', 'Sunroof', 'Apple CarPlay', 'Child seat', 'Bike rack']
+SAMPLE_IMAGE = 'car_images/Cover.jpeg'
+
+
+class CarFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Car
+
+    class Params:
+        city = factory.Faker('random_element', elements=CITIES)
+
+    owner = factory.SubFactory(OwnerFactory)
+    make = factory.Faker('random_element', elements=list(MAKES))
+    model = factory.LazyAttributeSequence(lambda o, n: MAKES[o.make][n % len(MAKES[o.make])])
+    year = factory.Faker('random_int', min=2008, max=2024)
+    color = factory.Faker('safe_color_name')
+    license_plate = factory.Faker('bothify', text='???-####')
+    description = factory.Faker('sentence', nb_words=12)
+    daily_rate = factory.Faker('pydecimal', left_digits=3, right_digits=2, positive=True, min_value=25, max_value=400)
+    location = factory.LazyAttribute(lambda o: o.city[0])
+    latitude = factory.LazyAttribute(lambda o: o.city[1])
+    longitude = factory.LazyAttribute(lambda o: o.city[2])
+    seats = factory.Faker('random_element', elements=[2, 4, 5, 5, 5, 7])
+    transmission = factory.Faker('random_element', elements=['automatic', 'automatic', 'manual'])
+    fuel_type = factory.Faker('random_element', elements=['petrol', 'diesel', 'hybrid', 'electric'])
+    status = factory.Faker('random_element', elements=['available'] * 8 + ['pending_approval', 'maintenance'])
+
+
+class CarImageFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = CarImage
+
+    car = factory.SubFactory(CarFactory)
+    # Points at a shipped sample so seeding never writes media files
+    image = SAMPLE_IMAGE
+    is_primary = False
+
+
+class CarFeatureFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = CarFeature
+
+    car = factory.SubFactory(CarFactory)
+    name = factory.Faker('random_element', elements=FEATURES)
+
+
+class CarAvailabilityFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = CarAvailability
+
+    class Params:
+        days = factory.Faker('random_int', min=3, max=60)
+
+    car = factory.SubFactory(CarFactory)
+    start_date = factory.Faker('date_between', start_date='-30d', end_date='+60d')
+    end_date = factory.LazyAttribute(lambda o: o.start_date + timedelta(days=o.days))
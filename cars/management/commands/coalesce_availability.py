@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from cars.availability import replace_availability
+from cars.models import CarAvailability
+
+
+class Command(BaseCommand):
+    help = "Merge every car's overlapping or adjacent availability windows into a minimal set."
+
+    def handle(self, *args, **options):
+        # Only cars with more than one window can need merging
+        car_ids = (
+            CarAvailability.objects.values('car_id').annotate(n=Count('id')).filter(n__gt=1)
+            .order_by('car_id').values_list('car_id', flat=True)
+        )
+        cars = removed = 0
+        for car_id in car_ids.iterator():
+            _, created, deleted = replace_availability(car_id, [], merge=True)
+            if created or deleted:
+                cars += 1
+                removed += deleted - created
+        self.stdout.write(self.style.SUCCESS(f"Coalesced {cars} cars, {removed} windows fewer."))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from cars.models import Car, CarPricingRule
+from cars.pricing import compile_price_calendar
+
+
+class Command(BaseCommand):
+    help = "Recompile every listed car's price calendar from today (run nightly to roll the window forward)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--all', action='store_true', help="Include cars that are not available")
+
+    def handle(self, *args, **options):
+        cars = Car.objects.order_by('id')
+        if not options['all']:
+            cars = cars.filter(status='available')
+
+        compiled = 0
+        last_id = 0
+        while True:
+            batch = list(cars.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            rules = {car.id: [] for car in batch}
+            for rule in CarPricingRule.objects.filter(car__in=batch):
+                rules[rule.car_id].append(rule)
+            for car in batch:
+                compile_price_calendar(car, rules=rules[car.id])
+            compiled += len(batch)
+            last_id = batch[-1].id
+        self.stdout.write(self.style.SUCCESS(f"Compiled {compiled} price calendars."))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from cars.similarity import CHUNK_SIZE, DEFAULT_K, compute_similar_cars
+from cars.tasks import refresh_similar_cars
+
+
+class Command(BaseCommand):
+    help = "Recompute stored similar-car lists (incrementally unless --full)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Rewrite every list, not just changed ones")
+        parser.add_argument('-k', type=int, default=DEFAULT_K, help="Neighbours kept per car")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Rows per similarity matrix block")
+        parser.add_argument('--enqueue', action='store_true', help="Queue the work for run_jobs instead")
+
+    def handle(self, *args, **options):
+        if options['enqueue']:
+            job = refresh_similar_cars.enqueue(full=options['full'])
+            self.stdout.write(self.style.SUCCESS(f"Queued job {job.id}."))
+            return
+        refreshed = compute_similar_cars(
+            k=options['k'], full=options['full'], chunk_size=options['chunk_size'], log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Refreshed similar cars for {refreshed} cars."))
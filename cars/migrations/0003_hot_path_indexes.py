@@ -0,0 +1,21 @@
+# Generated by Django 3.2.20 on 2026-10-19 06:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['status', '-created_at'], name='car_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(condition=models.Q(('status', 'pending_approval')), fields=['created_at'], name='car_pending_created_idx'),
+        ),
+    ]
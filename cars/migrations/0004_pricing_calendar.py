@@ -0,0 +1,43 @@
+# Generated by Django 3.2.20 on 2026-10-19 07:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0003_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CarPricingRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rule_type', models.CharField(choices=[('weekday', 'Weekday price'), ('season', 'Seasonal price'), ('long_stay', 'Long-stay discount')], max_length=20)),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('weekdays', models.CharField(blank=True, max_length=20)),
+                ('start_date', models.DateField(blank=True, null=True)),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('daily_rate', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('min_days', models.PositiveIntegerField(blank=True, null=True)),
+                ('discount_percent', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('priority', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('car', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pricing_rules', to='cars.car')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CarPriceCalendar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('base_rate', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('cumulative', models.JSONField(default=list)),
+                ('long_stay', models.JSONField(default=list)),
+                ('compiled_at', models.DateTimeField(auto_now=True)),
+                ('car', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='price_calendar', to='cars.car')),
+            ],
+        ),
+    ]
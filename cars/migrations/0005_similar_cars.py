@@ -0,0 +1,29 @@
+# Generated by Django 3.2.20 on 2026-10-19 07:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0004_pricing_calendar'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarCar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('computed_at', models.DateTimeField()),
+                ('car', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar', to='cars.car')),
+                ('similar_car', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='cars.car')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='similarcar',
+            constraint=models.UniqueConstraint(fields=('car', 'rank'), name='similarcar_car_rank_uniq'),
+        ),
+    ]
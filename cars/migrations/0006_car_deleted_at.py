@@ -0,0 +1,18 @@
+# Generated by Django 3.2.20 on 2026-10-19 07:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0005_similar_cars'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='car',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,6 +1,13 @@
 from django.db import models
 from users.models import User
 
+class ActiveCarManager(models.Manager):
+    """Hides soft-deleted cars; ``Car.all_objects`` still sees them."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Car(models.Model):
     STATUS_CHOICES = (
         ('available', 'Available'),
@@ -28,6 +35,20 @@ class Car(models.Model):
     auto_approve_bookings = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set on delete; the row and its children are purged by a background job
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ActiveCarManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-created_at'], name='car_status_created_idx'),
+            models.Index(
+                fields=['created_at'], name='car_pending_created_idx',
+                condition=models.Q(status='pending_approval'),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.year} {self.make} {self.model}"
@@ -54,3 +75,65 @@ class CarAvailability(models.Model):
     
     def __str__(self):
         return f"{self.car} - {self.start_date} to {self.end_date}"
+
+class CarPricingRule(models.Model):
+    RULE_TYPES = (
+        ('weekday', 'Weekday price'),
+        ('season', 'Seasonal price'),
+        ('long_stay', 'Long-stay discount'),
+    )
+
+    car = models.ForeignKey(Car, on_delete=models.CASCADE, related_name='pricing_rules')
+    rule_type = models.CharField(max_length=20, choices=RULE_TYPES)
+    name = models.CharField(max_length=100, blank=True)
+    # weekday: comma-separated day numbers, Monday=0 (weekends are "5,6")
+    weekdays = models.CharField(max_length=20, blank=True)
+    # season: inclusive date range
+    start_date = models.DateField(null=True, blank=True)
+    end_date = models.DateField(null=True, blank=True)
+    # Price per day for weekday and season rules
+    daily_rate = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    # long_stay: percentage off the whole booking from min_days days
+    min_days = models.PositiveIntegerField(null=True, blank=True)
+    discount_percent = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    # Where rules overlap on a day, the highest priority wins (seasons beat weekdays on ties)
+    priority = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def weekday_set(self):
+        return {int(day) for day in self.weekdays.split(',') if day.strip() != ''}
+
+    def __str__(self):
+        return f"{self.car} - {self.name or self.get_rule_type_display()}"
+
+class CarPriceCalendar(models.Model):
+    """Compiled per-day prices of a car, see cars.pricing."""
+    car = models.OneToOneField(Car, on_delete=models.CASCADE, related_name='price_calendar')
+    start_date = models.DateField()
+    # daily_rate the calendar was compiled from; a different rate means it is stale
+    base_rate = models.DecimalField(max_digits=10, decimal_places=2)
+    # Running totals in integer cents: cumulative[i] is the price of the first i
+    # days from start_date, so any range total is two lookups
+    cumulative = models.JSONField(default=list)
+    # [[min_days, discount_percent], ...] of the car's long-stay rules
+    long_stay = models.JSONField(default=list)
+    compiled_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Price calendar for {self.car}"
+
+class SimilarCar(models.Model):
+    """Precomputed nearest neighbours of a car, see cars.similarity."""
+    car = models.ForeignKey(Car, on_delete=models.CASCADE, related_name='similar')
+    similar_car = models.ForeignKey(Car, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['car', 'rank'], name='similarcar_car_rank_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.car} ~ {self.similar_car} ({self.score:.3f})"
@@ -0,0 +1,64 @@
+from django.db import transaction
+from django.db.models import OuterRef, Prefetch, Subquery
+from django.utils import timezone
+
+from . import autocomplete
+from .autocomplete import FIELDS
+from .facets import invalidate_catalog
+from .models import Car, CarFeature, CarImage
+
+DECISIONS = {
+    'approve': 'available',
+    'reject': 'rejected',
+}
+
+
+def pending_cars():
+    """Cars awaiting review, oldest first; the thumbnail is a subquery and features one prefetch."""
+    # Primary image, else the first uploaded; only its file name is read
+    thumbnail = (
+        CarImage.objects.filter(car=OuterRef('pk'))
+        .order_by('-is_primary', 'id')
+        .values('image')[:1]
+    )
+    return (
+        Car.objects.filter(status='pending_approval')
+        .select_related('owner')
+        .annotate(thumbnail=Subquery(thumbnail))
+        .prefetch_related(Prefetch('features', queryset=CarFeature.objects.order_by('id')))
+        .order_by('created_at', 'id')
+    )
+
+
+def _refresh_autocomplete(car_ids):
+    cars = Car.objects.filter(id__in=car_ids).only('id', 'status', *FIELDS)
+    for car in cars:
+        autocomplete.index.car_changed(car)
+
+
+def decide(decisions):
+    """Apply {'approve': [car ids], 'reject': [car ids]} to pending cars, one update per decision.
+
+    Cars no longer pending (already decided, deleted) are skipped. Returns
+    {decision: [car ids changed]}.
+    """
+    changed = {}
+    now = timezone.now()
+    with transaction.atomic():
+        for decision, status in DECISIONS.items():
+            car_ids = set(decisions.get(decision) or ())
+            if not car_ids:
+                continue
+            pending = Car.objects.filter(id__in=car_ids, status='pending_approval')
+            # Lock first so the ids reported match the rows updated
+            ids = sorted(pending.select_for_update().values_list('id', flat=True))
+            if ids:
+                Car.objects.filter(id__in=ids).update(status=status, updated_at=now)
+            changed[decision] = ids
+
+        decided = [car_id for ids in changed.values() for car_id in ids]
+        if decided:
+            # update() sends no signals; one expiry for the whole batch
+            transaction.on_commit(invalidate_catalog)
+            transaction.on_commit(lambda: _refresh_autocomplete(decided))
+    return changed
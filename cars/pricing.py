@@ -0,0 +1,177 @@
+from calendar import monthrange
+from collections import namedtuple
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import CarPriceCalendar, CarPricingRule
+
+CENT = Decimal('0.01')
+
+Quote = namedtuple('Quote', ['days', 'subtotal', 'discount', 'total'])
+
+
+def to_cents(amount):
+    return int((Decimal(amount) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    return (Decimal(cents) / 100).quantize(CENT)
+
+
+def add_months(day, months):
+    index = day.month - 1 + months
+    year, month = day.year + index // 12, index % 12 + 1
+    # Clamp the 31st to the last day of shorter months
+    return date(year, month, min(day.day, monthrange(year, month)[1]))
+
+
+def daily_prices(car, rules, start, days):
+    """Price in cents of each of ``days`` days from ``start``, before long-stay discounts."""
+    prices = [to_cents(car.daily_rate)] * days
+    day_rules = [rule for rule in rules if rule.rule_type in ('weekday', 'season') and rule.daily_rate is not None]
+    # Apply lowest priority first so higher priorities overwrite; seasons win ties
+    day_rules.sort(key=lambda rule: (rule.priority, rule.rule_type == 'season', rule.id or 0))
+    end = start + timedelta(days=days - 1)
+
+    for rule in day_rules:
+        price = to_cents(rule.daily_rate)
+        if rule.rule_type == 'weekday':
+            weekdays = rule.weekday_set()
+            for offset in range(days):
+                if (start + timedelta(days=offset)).weekday() in weekdays:
+                    prices[offset] = price
+        else:
+            if rule.start_date is None or rule.end_date is None:
+                continue
+            first = max(rule.start_date, start)
+            last = min(rule.end_date, end)
+            for offset in range((first - start).days, (last - start).days + 1):
+                prices[offset] = price
+    return prices
+
+
+def calendar_months():
+    return getattr(settings, 'PRICE_CALENDAR_MONTHS', 12)
+
+
+def build_price_calendar(car, start=None, end=None, rules=None):
+    """Unsaved calendar of the car's running price totals from ``start`` (today) to ``end`` (PRICE_CALENDAR_MONTHS ahead)."""
+    start = start or timezone.localdate()
+    end = end or add_months(start, calendar_months())
+    if rules is None:
+        rules = list(car.pricing_rules.all())
+
+    cumulative = [0]
+    for price in daily_prices(car, rules, start, (end - start).days + 1):
+        cumulative.append(cumulative[-1] + price)
+
+    long_stay = [
+        [rule.min_days, str(rule.discount_percent)]
+        for rule in rules
+        if rule.rule_type == 'long_stay' and rule.min_days and rule.discount_percent
+    ]
+    return CarPriceCalendar(
+        car=car, start_date=start, base_rate=car.daily_rate, cumulative=cumulative, long_stay=long_stay,
+    )
+
+
+def compile_price_calendar(car, start=None, end=None, rules=None):
+    """Build and store the car's calendar. Write paths and jobs only; quotes never store one."""
+    calendar = build_price_calendar(car, start, end, rules)
+    fields = {
+        'start_date': calendar.start_date, 'base_rate': calendar.base_rate,
+        'cumulative': calendar.cumulative, 'long_stay': calendar.long_stay,
+        'compiled_at': timezone.now(),
+    }
+    # Update first, insert once: update_or_create races on the one-to-one row
+    if not CarPriceCalendar.objects.filter(car=car).update(**fields):
+        try:
+            with transaction.atomic():
+                calendar.save(force_insert=True)
+        except IntegrityError:
+            # A concurrent compile inserted it first; the newer totals win
+            CarPriceCalendar.objects.filter(car=car).update(**fields)
+    return calendar
+
+
+def _covers(calendar, car, start_date, end_date):
+    if calendar is None or calendar.base_rate != car.daily_rate:
+        return False
+    last = calendar.start_date + timedelta(days=len(calendar.cumulative) - 2)
+    return calendar.start_date <= start_date and end_date <= last
+
+
+def ensure_calendar(car, calendar, start_date, end_date, rules=None):
+    """Return ``calendar`` if it is current and covers the range, else an unsaved one of just the range."""
+    if _covers(calendar, car, start_date, end_date):
+        return calendar
+    return build_price_calendar(car, start_date, end_date, rules)
+
+
+class InvalidStay(ValueError):
+    pass
+
+
+def check_stay(start_date, end_date):
+    """Raise InvalidStay unless the range is one a public quote may ask for.
+
+    It must start today or later, end within PRICE_CALENDAR_MONTHS (what the
+    nightly compile covers) and last at most QUOTE_MAX_DAYS.
+    """
+    today = timezone.localdate()
+    max_days = getattr(settings, 'QUOTE_MAX_DAYS', 90)
+    if start_date > end_date:
+        raise InvalidStay("end_date must not be before start_date.")
+    if start_date < today:
+        raise InvalidStay("start_date must not be in the past.")
+    if end_date > add_months(today, calendar_months()):
+        raise InvalidStay(f"end_date must be within {calendar_months()} months.")
+    if (end_date - start_date).days + 1 > max_days:
+        raise InvalidStay(f"A stay is at most {max_days} days.")
+
+
+def quote_from_calendar(calendar, start_date, end_date):
+    days = (end_date - start_date).days + 1
+    first = (start_date - calendar.start_date).days
+    subtotal = from_cents(calendar.cumulative[first + days] - calendar.cumulative[first])
+
+    percent = Decimal('0')
+    eligible = [rule for rule in calendar.long_stay if days >= rule[0]]
+    if eligible:
+        percent = Decimal(max(eligible)[1])
+    discount = (subtotal * percent / 100).quantize(CENT, rounding=ROUND_HALF_UP)
+    return Quote(days=days, subtotal=subtotal, discount=discount, total=subtotal - discount)
+
+
+def quote(car, start_date, end_date):
+    """Price of renting ``car`` from ``start_date`` to ``end_date`` inclusive. Reads only."""
+    calendar = CarPriceCalendar.objects.filter(car=car).first()
+    calendar = ensure_calendar(car, calendar, start_date, end_date)
+    return quote_from_calendar(calendar, start_date, end_date)
+
+
+def quote_many(cars, start_date, end_date):
+    """{car_id: Quote} for a page of search results, in one query once calendars are compiled.
+
+    Cars without a current calendar are priced from one rules query, in memory.
+    """
+    calendars = {
+        calendar.car_id: calendar
+        for calendar in CarPriceCalendar.objects.filter(car_id__in=[car.id for car in cars])
+    }
+    stale = [car for car in cars if not _covers(calendars.get(car.id), car, start_date, end_date)]
+    if stale:
+        rules = {car.id: [] for car in stale}
+        for rule in CarPricingRule.objects.filter(car__in=stale):
+            rules[rule.car_id].append(rule)
+        for car in stale:
+            calendars[car.id] = ensure_calendar(car, None, start_date, end_date, rules[car.id])
+    return {car.id: quote_from_calendar(calendars[car.id], start_date, end_date) for car in cars}
+
+
+def invalidate_price_calendar(car_id):
+    CarPriceCalendar.objects.filter(car_id=car_id).delete()
@@ -1,9 +1,9 @@
 # cars/serializers.py
 from rest_framework import serializers
-from .models import Car, CarImage, CarFeature, CarAvailability
+from .models import Car, CarImage, CarFeature, CarAvailability, CarPricingRule
+from .availability import replace_availability
 
 import base64
-import six
 import uuid
 from django.core.files.base import ContentFile
 from rest_framework import serializers
@@ -38,6 +38,16 @@ class CarAvailabilitySerializer(serializers.ModelSerializer):
         fields = ['start_date', 'end_date']
 
 
+class AvailabilityWindowSerializer(serializers.Serializer):
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+    def validate(self, data):
+        if data['end_date'] < data['start_date']:
+            raise serializers.ValidationError("end_date must not be before start_date.")
+        return data
+
+
 class CarSerializer(serializers.ModelSerializer):
     # Remove images from here because handled separately
     features = CarFeatureSerializer(many=True)
@@ -61,12 +71,88 @@ class CarSerializer(serializers.ModelSerializer):
         for feature_data in features_data:
             CarFeature.objects.create(car=car, **feature_data)
 
-        for availability_item in availability_data:
-            CarAvailability.objects.create(car=car, **availability_item)
+        # Stored coalesced: overlapping or adjacent windows become one row
+        replace_availability(car.id, [
+            (item['start_date'], item['end_date']) for item in availability_data
+        ])
 
         return car
 
 class AdminCarUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Car
-        fields = '__all__'  # or list explicitly
\ No newline at end of file
+        fields = '__all__'  # or list explicitly
+
+
+class CarPricingRuleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CarPricingRule
+        fields = [
+            'id', 'rule_type', 'name', 'weekdays', 'start_date', 'end_date',
+            'daily_rate', 'min_days', 'discount_percent', 'priority',
+        ]
+
+    def validate(self, data):
+        merged = {field: getattr(self.instance, field) for field in self.Meta.fields[1:]} if self.instance else {}
+        merged.update(data)
+        rule_type = merged.get('rule_type')
+
+        if rule_type in ['weekday', 'season'] and merged.get('daily_rate') is None:
+            raise serializers.ValidationError({'daily_rate': 'Required for weekday and season rules.'})
+        if rule_type == 'weekday':
+            days = [day.strip() for day in (merged.get('weekdays') or '').split(',') if day.strip()]
+            if not days or any(not day.isdigit() or int(day) > 6 for day in days):
+                raise serializers.ValidationError({'weekdays': 'Comma-separated day numbers 0 (Monday) to 6 (Sunday).'})
+        if rule_type == 'season':
+            if not merged.get('start_date') or not merged.get('end_date'):
+                raise serializers.ValidationError('start_date and end_date are required for season rules.')
+            if merged['start_date'] > merged['end_date']:
+                raise serializers.ValidationError('start_date must be before or equal to end_date.')
+        if rule_type == 'long_stay':
+            if not merged.get('min_days') or merged.get('discount_percent') is None:
+                raise serializers.ValidationError('min_days and discount_percent are required for long_stay rules.')
+            if not 0 < merged['discount_percent'] < 100:
+                raise serializers.ValidationError({'discount_percent': 'Must be between 0 and 100.'})
+        return data
+
+
+class PendingCarSerializer(serializers.ModelSerializer):
+    owner = serializers.SerializerMethodField()
+    thumbnail = serializers.SerializerMethodField()
+    features = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Car
+        fields = [
+            'id', 'make', 'model', 'year', 'color', 'license_plate', 'description',
+            'daily_rate', 'location', 'seats', 'transmission', 'fuel_type',
+            'created_at', 'owner', 'thumbnail', 'features',
+        ]
+
+    def get_owner(self, car):
+        return {'id': car.owner_id, 'username': car.owner.username}
+
+    def get_thumbnail(self, car):
+        # Annotated by cars.moderation.pending_cars
+        if not car.thumbnail:
+            return None
+        url = CarImage.image.field.storage.url(car.thumbnail)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def get_features(self, car):
+        return [feature.name for feature in car.features.all()]
+
+
+class CarDecisionSerializer(serializers.Serializer):
+    approve = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    reject = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+    def validate(self, data):
+        if not data['approve'] and not data['reject']:
+            raise serializers.ValidationError("Nothing to approve or reject.")
+        if set(data['approve']) & set(data['reject']):
+            raise serializers.ValidationError("A car cannot be both approved and rejected.")
+        if len(data['approve']) + len(data['reject']) > 500:
+            raise serializers.ValidationError("At most 500 cars per batch.")
+        return data
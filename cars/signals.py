@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from . import autocomplete
+from .availability import invalidate_car_calendar
+from .facets import invalidate_catalog
+from .models import Car, CarAvailability, CarFeature, CarPricingRule
+from .pricing import invalidate_price_calendar
+
+
+def _pricing_rule_changed(sender, instance, **kwargs):
+    from .tasks import compile_car_price_calendar
+    # Quotes price the car in memory until the job has stored the new calendar
+    invalidate_price_calendar(instance.car_id)
+    compile_car_price_calendar.enqueue(car_id=instance.car_id)
+
+
+def _calendar_changed(sender, instance, **kwargs):
+    invalidate_car_calendar(instance.car_id)
+
+
+def _features_changed(sender, instance, **kwargs):
+    # Marks the car as changed for the incremental similar-cars refresh
+    Car.objects.filter(id=instance.car_id).update(updated_at=timezone.now())
+
+
+def _catalog_changed(sender, **kwargs):
+    invalidate_catalog()
+
+
+def _car_saved(sender, instance, **kwargs):
+    # Rolled-back edits never reach the in-memory autocomplete index
+    transaction.on_commit(lambda: autocomplete.index.car_changed(instance))
+
+
+def _car_deleted(sender, instance, **kwargs):
+    car_id = instance.id
+    transaction.on_commit(lambda: autocomplete.index.car_removed(car_id))
+
+
+def connect():
+    post_save.connect(_pricing_rule_changed, sender=CarPricingRule, dispatch_uid='cars.pricing_rule_saved')
+    post_delete.connect(_pricing_rule_changed, sender=CarPricingRule, dispatch_uid='cars.pricing_rule_deleted')
+    post_save.connect(_calendar_changed, sender=CarAvailability, dispatch_uid='cars.availability_saved')
+    post_delete.connect(_calendar_changed, sender=CarAvailability, dispatch_uid='cars.availability_deleted')
+    post_save.connect(_calendar_changed, sender='bookings.Booking', dispatch_uid='cars.booking_saved')
+    post_delete.connect(_calendar_changed, sender='bookings.Booking', dispatch_uid='cars.booking_deleted')
+    post_save.connect(_catalog_changed, sender=Car, dispatch_uid='cars.car_saved')
+    post_delete.connect(_catalog_changed, sender=Car, dispatch_uid='cars.car_deleted')
+    post_save.connect(_car_saved, sender=Car, dispatch_uid='cars.autocomplete_car_saved')
+    post_delete.connect(_car_deleted, sender=Car, dispatch_uid='cars.autocomplete_car_deleted')
+    post_save.connect(_features_changed, sender=CarFeature, dispatch_uid='cars.feature_saved')
+    post_delete.connect(_features_changed, sender=CarFeature, dispatch_uid='cars.feature_deleted')
@@ -0,0 +1,179 @@
+import math
+from collections import defaultdict
+
+import numpy as np
+from django.db import transaction
+from django.db.models import F, Min, Q
+from django.utils import timezone
+
+from .models import Car, CarFeature, SimilarCar
+
+DEFAULT_K = 10
+CHUNK_SIZE = 256
+
+# Relative importance of each block of the vector; blocks are scaled to unit
+# length before weighting so wide one-hot blocks do not dominate
+WEIGHTS = {
+    'price': 2.0,
+    'seats': 1.0,
+    'year': 1.0,
+    'coordinates': 1.5,
+    'transmission': 1.0,
+    'fuel_type': 1.0,
+    'features': 1.0,
+}
+NUMERIC_FIELDS = ['daily_rate', 'seats', 'year', 'latitude', 'longitude']
+
+
+def load_cars():
+    """Rows and feature names of every available car, in two queries."""
+    rows = list(
+        Car.objects.filter(status='available').order_by('id')
+        .values_list('id', *NUMERIC_FIELDS, 'transmission', 'fuel_type')
+    )
+    features = defaultdict(set)
+    names = CarFeature.objects.filter(car__status='available').values_list('car_id', 'name')
+    for car_id, name in names.iterator():
+        features[car_id].add(name.strip().lower())
+    return rows, features
+
+
+def _zscore(column):
+    column = np.asarray(column, dtype=np.float64)
+    present = ~np.isnan(column)
+    if not present.any():
+        return np.zeros_like(column)
+    mean = column[present].mean()
+    std = column[present].std() or 1.0
+    # Missing values sit at the mean so they neither attract nor repel
+    return np.where(present, (column - mean) / std, 0.0)
+
+
+def _one_hot(values):
+    vocabulary = {value: i for i, value in enumerate(sorted(set(values)))}
+    block = np.zeros((len(values), len(vocabulary)))
+    for row, value in enumerate(values):
+        block[row, vocabulary[value]] = 1.0
+    return block
+
+
+def encode(rows, features):
+    """(car_ids, matrix): one L2-normalised float32 row per car, so ``a @ b`` is cosine similarity."""
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    if not rows:
+        return ids, np.zeros((0, 0), dtype=np.float32)
+
+    def column(index):
+        return [math.nan if row[index] is None else float(row[index]) for row in rows]
+
+    blocks = {
+        'price': _zscore(np.log1p(column(1)))[:, None],
+        'seats': _zscore(column(2))[:, None],
+        'year': _zscore(column(3))[:, None],
+        'coordinates': np.column_stack([_zscore(column(4)), _zscore(column(5))]) / math.sqrt(2),
+        'transmission': _one_hot([(row[6] or '').strip().lower() for row in rows]),
+        'fuel_type': _one_hot([(row[7] or '').strip().lower() for row in rows]),
+    }
+    vocabulary = {name: i for i, name in enumerate(sorted(set().union(*features.values())))}
+    feature_block = np.zeros((len(rows), len(vocabulary)))
+    for row_index, row in enumerate(rows):
+        for name in features.get(row[0], ()):
+            feature_block[row_index, vocabulary[name]] = 1.0
+    counts = feature_block.sum(axis=1, keepdims=True)
+    blocks['features'] = np.divide(feature_block, np.sqrt(counts), out=feature_block, where=counts > 0)
+
+    matrix = np.hstack([blocks[name] * WEIGHTS[name] for name in WEIGHTS]).astype(np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms > 0, norms, 1.0)
+    return ids, matrix
+
+
+def top_k(matrix, query_rows, k, chunk_size=CHUNK_SIZE):
+    """Yield (row, neighbour_rows, scores) for each query row, best first, never the row itself."""
+    k = min(k, len(matrix) - 1)
+    if k <= 0:
+        return
+    for start in range(0, len(query_rows), chunk_size):
+        chunk = np.asarray(query_rows[start:start + chunk_size])
+        scores = matrix[chunk] @ matrix.T
+        scores[np.arange(len(chunk)), chunk] = -np.inf
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1)
+        neighbours = np.take_along_axis(candidates, order, axis=1)
+        ranked_scores = np.take_along_axis(candidate_scores, order, axis=1)
+        for i, row in enumerate(chunk):
+            yield int(row), neighbours[i], ranked_scores[i]
+
+
+def changed_car_ids():
+    """Available cars with no neighbour list, or edited since theirs was computed."""
+    return set(
+        Car.objects.filter(status='available')
+        .annotate(computed=Min('similar__computed_at'))
+        .filter(Q(computed__isnull=True) | Q(updated_at__gt=F('computed')))
+        .values_list('id', flat=True)
+    )
+
+
+def _store(ids, results, computed_at):
+    car_ids = [int(ids[row]) for row, _, _ in results]
+    objects = [
+        SimilarCar(car_id=int(ids[row]), similar_car_id=int(ids[neighbour]), rank=rank,
+                   score=float(score), computed_at=computed_at)
+        for row, neighbours, scores in results
+        for rank, (neighbour, score) in enumerate(zip(neighbours, scores), start=1)
+    ]
+    with transaction.atomic():
+        SimilarCar.objects.filter(car_id__in=car_ids).delete()
+        SimilarCar.objects.bulk_create(objects, batch_size=1000)
+
+
+def compute_similar_cars(k=DEFAULT_K, full=False, chunk_size=CHUNK_SIZE, log=lambda message: None):
+    """Refresh stored neighbour lists; returns the number of cars whose list was rewritten.
+
+    Incremental runs rewrite the lists of changed cars, of cars whose list
+    points at a changed or delisted car, and of cars a changed car would now
+    enter the top ``k`` of. Scaling statistics drift slowly, so run a full
+    refresh periodically.
+    """
+    computed_at = timezone.now()
+    rows, features = load_cars()
+    ids, matrix = encode(rows, features)
+    index = {int(car_id): row for row, car_id in enumerate(ids)}
+
+    # Lists of delisted cars are never served
+    SimilarCar.objects.exclude(car__status='available').delete()
+
+    if full:
+        targets = list(range(len(ids)))
+    else:
+        changed = changed_car_ids()
+        affected = set(
+            SimilarCar.objects.filter(Q(similar_car_id__in=changed) | ~Q(similar_car__status='available'))
+            .values_list('car_id', flat=True)
+        )
+        changed_rows = np.array(sorted(index[car_id] for car_id in changed if car_id in index), dtype=np.int64)
+        if len(changed_rows):
+            # Cars whose current k-th best score a changed car now beats
+            kth = dict(
+                SimilarCar.objects.filter(rank=min(k, max(len(ids) - 1, 1)))
+                .values_list('car_id', 'score')
+            )
+            threshold = np.array([kth.get(int(car_id), -np.inf) for car_id in ids], dtype=np.float32)
+            for start in range(0, len(changed_rows), chunk_size):
+                chunk = changed_rows[start:start + chunk_size]
+                best = (matrix[chunk] @ matrix.T).max(axis=0)
+                affected.update(int(ids[row]) for row in np.nonzero(best > threshold)[0])
+        targets = sorted(index[car_id] for car_id in changed | affected if car_id in index)
+
+    log(f"Encoded {len(ids)} cars into {matrix.shape[1] if len(ids) else 0} dimensions; refreshing {len(targets)}")
+    batch = []
+    for result in top_k(matrix, targets, k, chunk_size):
+        batch.append(result)
+        if len(batch) >= chunk_size:
+            _store(ids, batch, computed_at)
+            batch = []
+    if batch:
+        _store(ids, batch, computed_at)
+    return len(targets)
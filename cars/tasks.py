@@ -0,0 +1,70 @@
+import io
+import os
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from jobs.queue import report_progress, task
+from .models import CarImage
+
+MAX_IMAGE_SIZE = (1600, 1600)
+JPEG_QUALITY = 85
+
+
+@task(queue='images', max_attempts=3)
+def process_car_image(image_id):
+    """Apply EXIF rotation, cap the dimensions and re-encode an uploaded car photo."""
+    car_image = CarImage.objects.filter(id=image_id).first()
+    if car_image is None or not car_image.image:
+        return
+
+    with car_image.image.open('rb') as fh:
+        picture = Image.open(fh)
+        picture.load()
+    # 0x0112 is the EXIF orientation tag; 1 means already upright
+    changed = picture.getexif().get(0x0112, 1) != 1
+    picture = ImageOps.exif_transpose(picture)
+    upright_size = picture.size
+    picture.thumbnail(MAX_IMAGE_SIZE)
+    changed = changed or picture.size != upright_size
+    if picture.mode not in ('RGB', 'L'):
+        picture = picture.convert('RGB')
+
+    buffer = io.BytesIO()
+    picture.save(buffer, format='JPEG', quality=JPEG_QUALITY, optimize=True)
+    if not changed and buffer.tell() >= car_image.image.size:
+        # Already small enough; keep the original bytes
+        return
+
+    old_name = car_image.image.name
+    stem = os.path.splitext(os.path.basename(old_name))[0]
+    car_image.image.save(f'{stem}.jpg', ContentFile(buffer.getvalue()), save=False)
+    CarImage.objects.filter(id=car_image.id).update(image=car_image.image.name)
+    if car_image.image.name != old_name and not CarImage.objects.filter(image=old_name).exists():
+        car_image.image.storage.delete(old_name)
+
+
+@task(queue='default', max_attempts=3)
+def refresh_similar_cars(full=False):
+    from .similarity import compute_similar_cars
+    compute_similar_cars(full=full)
+
+
+@task(queue='default', max_attempts=5)
+def purge_car(car_id):
+    """Hard-delete a soft-deleted car and everything hanging off it, in batches."""
+    from turo_clone.purge import purge
+    from .models import Car
+    # A car restored (deleted_at cleared) before the job ran is left alone
+    cars = Car.all_objects.filter(id=car_id, deleted_at__isnull=False)
+    purge(cars, on_batch=lambda counts: report_progress(deleted=counts))
+
+
+@task(queue='default', max_attempts=3)
+def compile_car_price_calendar(car_id):
+    """Store a fresh price calendar for the car after its pricing changed."""
+    from .models import Car
+    from .pricing import compile_price_calendar
+    car = Car.objects.filter(id=car_id).first()
+    if car is not None:
+        compile_price_calendar(car)
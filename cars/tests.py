@@ -1,3 +1,589 @@
-from django.test import TestCase
+import io
+import json
+from datetime import date, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+from PIL import Image
+
+from bookings.factories import BookingFactory
+from cars.autocomplete import Autocomplete, PrefixIndex
+from cars.availability import add_availability, coalesce, replace_availability
+from cars.factories import CITIES, CarFactory, CarFeatureFactory, CarImageFactory
+from cars.models import Car, CarAvailability, CarImage, CarPriceCalendar, CarPricingRule, SimilarCar
+from cars.pricing import build_price_calendar, compile_price_calendar, daily_prices, quote_from_calendar
+from cars.similarity import compute_similar_cars
+from jobs.models import Job
+from jobs.queue import claim, execute
+from turo_clone.instrumentation import max_queries
+from users.factories import OwnerFactory, UserFactory
+
+
+def _png(name):
+    buffer = io.BytesIO()
+    Image.new('RGB', (4, 4), 'red').save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+@pytest.fixture
+def car_form():
+    return {
+        'make': 'Toyota', 'model': 'Corolla', 'year': 2020, 'color': 'red', 'license_plate': 'ABC-1234',
+        'description': 'Clean', 'daily_rate': '50.00', 'location': 'Miami', 'seats': 5,
+        'transmission': 'automatic', 'fuel_type': 'gas',
+        'features': json.dumps([{'name': 'GPS'}]),
+        'availability': json.dumps([{'start_date': '2030-01-01', 'end_date': '2030-01-10'}]),
+    }
+
+
+def test_image_jobs_are_enqueued_on_commit(db, client, settings, tmp_path, car_form,
+                                           django_capture_on_commit_callbacks):
+    settings.MEDIA_ROOT = str(tmp_path)
+    client.force_login(OwnerFactory())
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post('/api/create/', dict(car_form, images=[_png('a.png'), _png('b.png')]))
+        assert response.status_code == 201
+        # The rows exist but no worker can see a job before the commit
+        assert CarImage.objects.count() == 2
+        assert not Job.objects.exists()
+    assert sorted(Job.objects.values_list('payload__image_id', flat=True)) == \
+        sorted(CarImage.objects.values_list('id', flat=True))
+
+
+
+@pytest.fixture
+def car(db):
+    return CarFactory(status='available', daily_rate=Decimal('50.00'))
+
+
+def _quote(client, car, start, end):
+    today = timezone.localdate()
+    return client.get(f'/api/cars/{car.id}/quote/', {
+        'start_date': (today + timedelta(days=start)).isoformat(),
+        'end_date': (today + timedelta(days=end)).isoformat(),
+    })
+
+
+@pytest.mark.parametrize('start, end', [
+    (-1, 2),     # starts in the past
+    (5, 3),      # ends before it starts
+    (300, 400),  # past PRICE_CALENDAR_MONTHS
+    (1, 91),     # longer than QUOTE_MAX_DAYS
+])
+def test_quote_range_is_bounded(client, car, start, end):
+    response = _quote(client, car, start, end)
+    assert response.status_code == 400
+    assert 'error' in response.json()
+
+
+def test_quote_without_calendar_stores_nothing(client, car):
+    response = _quote(client, car, 1, 3)
+    assert response.status_code == 200
+    assert response.json()['total'] == '150.00'
+    assert not CarPriceCalendar.objects.exists()
+
+
+def test_quote_uses_compiled_calendar(client, car):
+    compile_price_calendar(car)
+    assert _quote(client, car, 1, 3).json()['total'] == '150.00'
+
+
+def test_available_cars_rejects_a_bad_range(client, car):
+    response = client.get('/api/available-cars/', {'start_date': 'soon', 'end_date': '2030-01-01'})
+    assert response.status_code == 400
+
+
+def test_compiling_twice_keeps_one_row(car):
+    compile_price_calendar(car)
+    car.daily_rate = Decimal('60.00')
+    compile_price_calendar(car)
+    assert CarPriceCalendar.objects.get(car=car).base_rate == Decimal('60.00')
+
+
+def test_pricing_rule_change_recompiles_in_a_job(client, car):
+    compile_price_calendar(car)
+    CarPricingRule.objects.create(car=car, rule_type='long_stay', min_days=2, discount_percent=Decimal('10'))
+    assert not CarPriceCalendar.objects.exists()
+    # Priced in memory meanwhile
+    assert _quote(client, car, 1, 3).json()['total'] == '135.00'
+
+    ids, lock_token = claim('default', 'worker', 10)
+    assert len(ids) == 1
+    execute(ids[0], 'worker', lock_token)
+    assert CarPriceCalendar.objects.get(car=car).long_stay == [[2, '10.00']]
+
+
+MONDAY = date(2030, 3, 4)
+
+
+def _rule(car, rule_type, **fields):
+    return CarPricingRule(car=car, rule_type=rule_type, **fields)
+
+
+def _euros(prices):
+    return [cents // 100 for cents in prices]
+
+
+def test_weekday_rule_prices_its_days(car):
+    weekend = _rule(car, 'weekday', weekdays='5,6', daily_rate=Decimal('80.00'))
+    assert _euros(daily_prices(car, [weekend], MONDAY, 9)) == [50, 50, 50, 50, 50, 80, 80, 50, 50]
+
+
+def test_season_rule_is_clamped_to_the_range(car):
+    season = _rule(car, 'season', start_date=MONDAY - timedelta(days=3), end_date=MONDAY + timedelta(days=1),
+                   daily_rate=Decimal('65.00'))
+    assert _euros(daily_prices(car, [season], MONDAY, 4)) == [65, 65, 50, 50]
+    # Open-ended seasons price nothing
+    assert _euros(daily_prices(car, [_rule(car, 'season', daily_rate=Decimal('65.00'))], MONDAY, 2)) == [50, 50]
+
+
+def test_overlapping_rules_follow_priority_then_seasons(car):
+    weekend = _rule(car, 'weekday', weekdays='5,6', daily_rate=Decimal('80.00'))
+    season = _rule(car, 'season', start_date=MONDAY + timedelta(days=4), end_date=MONDAY + timedelta(days=8),
+                   daily_rate=Decimal('60.00'))
+    # Equal priority: the season wins its weekend
+    assert _euros(daily_prices(car, [weekend, season], MONDAY, 14)) == \
+        [50, 50, 50, 50, 60, 60, 60, 60, 60, 50, 50, 50, 80, 80]
+    weekend.priority = 1
+    assert _euros(daily_prices(car, [season, weekend], MONDAY, 14)) == \
+        [50, 50, 50, 50, 60, 80, 80, 60, 60, 50, 50, 50, 80, 80]
+
+
+def test_calendar_totals_stack_rules_then_discount(car):
+    rules = [
+        _rule(car, 'weekday', weekdays='5,6', daily_rate=Decimal('80.00'), priority=1),
+        _rule(car, 'season', start_date=MONDAY + timedelta(days=4), end_date=MONDAY + timedelta(days=8),
+              daily_rate=Decimal('60.00')),
+        _rule(car, 'long_stay', min_days=7, discount_percent=Decimal('10')),
+        _rule(car, 'long_stay', min_days=14, discount_percent=Decimal('20')),
+    ]
+    calendar = build_price_calendar(car, MONDAY, MONDAY + timedelta(days=30), rules)
+    prices = daily_prices(car, rules, MONDAY, 31)
+    # Any range is two lookups into the running totals
+    for first, last in [(0, 0), (4, 8), (2, 20), (0, 30)]:
+        assert calendar.cumulative[last + 1] - calendar.cumulative[first] == sum(prices[first:last + 1])
+
+    short = quote_from_calendar(calendar, MONDAY + timedelta(days=4), MONDAY + timedelta(days=6))
+    assert (short.subtotal, short.discount, short.total) == (Decimal('220.00'), Decimal('0.00'), Decimal('220.00'))
+    week = quote_from_calendar(calendar, MONDAY, MONDAY + timedelta(days=6))
+    assert (week.subtotal, week.discount) == (Decimal('420.00'), Decimal('42.00'))
+    # Only the best long-stay discount applies
+    fortnight = quote_from_calendar(calendar, MONDAY, MONDAY + timedelta(days=13))
+    assert (fortnight.subtotal, fortnight.total) == (Decimal('850.00'), Decimal('680.00'))
+
+
+@pytest.mark.parametrize('limit', ['abc', '0', '-3'])
+def test_autocomplete_rejects_a_bad_limit(client, limit):
+    response = client.get('/api/cars/autocomplete/', {'q': 'to', 'limit': limit})
+    assert response.status_code == 400
+
+
+def test_warm_index_closes_its_connection(db, monkeypatch):
+    CarFactory(status='available', make='Toyota')
+    closed = []
+    # The in-memory test database ignores close(); record the call instead
+    monkeypatch.setattr(connection, 'close', lambda: closed.append(True))
+    index = Autocomplete()
+    index.warm()
+    assert closed == [True]
+    assert index.search('toy', fields=['make']) == {'make': [{'value': 'Toyota', 'count': 1}]}
+
+
+def test_prefix_index_ranks_by_listing_count():
+    locations = PrefixIndex()
+    for value, count in [('San Francisco, CA', 3), ('San Diego', 5), ('Santa Monica', 1), ('Seattle', 9)]:
+        locations.add(value, count)
+    assert locations.search('san', 10) == [
+        {'value': 'San Diego', 'count': 5},
+        {'value': 'San Francisco, CA', 'count': 3},
+        {'value': 'Santa Monica', 'count': 1},
+    ]
+    assert locations.search('SAN', 1) == [{'value': 'San Diego', 'count': 5}]
+    # Any word start matches, once per value
+    assert locations.search('fran', 10) == [{'value': 'San Francisco, CA', 'count': 3}]
+    assert locations.search('  ', 10) == []
+
+
+def test_prefix_index_merges_spellings_and_counts_down():
+    makes = PrefixIndex()
+    makes.add('Tesla')
+    makes.add('  tesla ')
+    makes.add('Toyota')
+    # One entry per normalized value, shown as first spelt
+    assert makes.search('t', 10) == [{'value': 'Tesla', 'count': 2}, {'value': 'Toyota', 'count': 1}]
+
+    makes.remove('TESLA')
+    assert makes.search('tes', 10) == [{'value': 'Tesla', 'count': 1}]
+    makes.remove('tesla')
+    assert makes.search('tes', 10) == []
+    # Removing what is not there changes nothing
+    makes.remove('Tesla')
+    makes.remove('Kia')
+    assert makes.search('t', 10) == [{'value': 'Toyota', 'count': 1}]
+    makes.add('Tesla')
+    assert makes.search('te', 10) == [{'value': 'Tesla', 'count': 1}]
+
+
+def test_autocomplete_follows_car_changes(db):
+    first = CarFactory(status='available', make='Toyota', model='Corolla', location='Miami')
+    CarFactory(status='available', make='Toyota', model='Camry', location='Miami')
+    index = Autocomplete()
+    index.build()
+    assert index.search('toy', fields=['make']) == {'make': [{'value': 'Toyota', 'count': 2}]}
+
+    first.make = 'Tesla'
+    index.car_changed(first)
+    # Equal counts tie-break on the normalized value, largest first
+    assert index.search('t', fields=['make']) == {'make': [
+        {'value': 'Toyota', 'count': 1}, {'value': 'Tesla', 'count': 1},
+    ]}
+    first.status = 'maintenance'
+    index.car_changed(first)
+    assert index.search('cor', fields=['model']) == {'model': []}
+    index.car_removed(first.id + 1000)
+    assert index.search('mia', fields=['location']) == {'location': [{'value': 'Miami', 'count': 1}]}
+
+
+def _window(start, end):
+    first = timezone.localdate()
+    return first + timedelta(days=start), first + timedelta(days=end)
+
+
+def _stored(car):
+    return list(CarAvailability.objects.filter(car=car).order_by('start_date').values_list('id', 'start_date', 'end_date'))
+
+
+def test_coalesce_merges_overlapping_and_adjacent_windows():
+    assert coalesce([_window(10, 12), _window(0, 3), _window(2, 5), _window(6, 8), _window(11, 11)]) == [
+        _window(0, 8),    # overlap, then adjacent (5 and 6)
+        _window(10, 12),  # 9 is uncovered; the window inside it disappears
+    ]
+    assert coalesce([]) == []
+
+
+def test_replace_availability_writes_the_coalesced_windows(car):
+    rows, created, deleted = replace_availability(car.id, [_window(0, 3), _window(4, 6), _window(9, 9)])
+    assert [(row.start_date, row.end_date) for row in rows] == [_window(0, 6), _window(9, 9)]
+    assert (created, deleted) == (2, 0)
+
+
+def test_replace_availability_keeps_unchanged_rows(car):
+    replace_availability(car.id, [_window(0, 6), _window(9, 9), _window(20, 25)])
+    before = _stored(car)
+
+    rows, created, deleted = replace_availability(car.id, [_window(0, 6), _window(9, 12), _window(20, 25)])
+    assert (created, deleted) == (1, 1)
+    after = _stored(car)
+    # Rows whose window did not change keep their ids
+    assert after[0] == before[0]
+    assert after[2] == before[2]
+    assert after[1][0] != before[1][0]
+
+    # Nothing to do: same rows, no writes
+    assert replace_availability(car.id, [_window(20, 25), _window(0, 6), _window(9, 12)])[1:] == (0, 0)
+    assert _stored(car) == after
+
+
+def test_replace_availability_merge_adds_to_current_windows(car):
+    replace_availability(car.id, [_window(0, 3), _window(10, 12)])
+    kept = _stored(car)[1]
+    rows, created, deleted = replace_availability(car.id, [_window(4, 5)], merge=True)
+    assert [(row.start_date, row.end_date) for row in rows] == [_window(0, 5), _window(10, 12)]
+    assert (created, deleted) == (1, 1)
+    assert _stored(car)[1] == kept
+
+    row = add_availability(car.id, *_window(6, 9))
+    assert (row.start_date, row.end_date) == _window(0, 12)
+    assert len(_stored(car)) == 1
+
+
+@pytest.fixture
+def catalog(db, client):
+    cache.clear()
+    client.force_login(OwnerFactory())
+    specs = [
+        ('Toyota', 'hybrid', 5, 2017, '40.00', 'Miami'),
+        ('Toyota', 'petrol', 5, 2021, '80.00', 'Los Angeles'),
+        ('Honda', 'petrol', 7, 2016, '120.00', 'Los Angeles'),
+        ('Honda', 'petrol', 5, 2022, '250.00', 'LA'),
+    ]
+    return [
+        CarFactory(status='available', make=make, fuel_type=fuel, seats=seats, year=year,
+                   daily_rate=Decimal(rate), location=location)
+        for make, fuel, seats, year, rate, location in specs
+    ]
+
+
+def _facets(client, **params):
+    response = client.get('/api/cars/', dict(params, facets=params.pop('facets', '1')))
+    assert response.status_code == 200
+    return response.json()
+
+
+def _counts(data, facet):
+    return {row['value']: row['count'] for row in data['facets'][facet]}
+
+
+def test_facet_counts(client, catalog):
+    data = _facets(client)
+    assert data['total'] == 4
+    assert len(data['results']) == 4
+    assert _counts(data, 'make') == {'Toyota': 2, 'Honda': 2}
+    assert _counts(data, 'seats') == {5: 3, 7: 1}
+    assert _counts(data, 'year_band') == {'2015-2019': 2, '2020-2024': 2}
+    assert _counts(data, 'price_band') == {'0-50': 1, '50-100': 1, '100-200': 1, '200+': 1}
+
+
+def test_facet_selection_is_disjunctive(client, catalog):
+    data = _facets(client, make='Honda', seats='5')
+    assert data['total'] == 1
+    assert [car['make'] for car in data['results']] == ['Honda']
+    # A facet's own selection does not narrow its counts, the others' do
+    assert _counts(data, 'make') == {'Toyota': 2, 'Honda': 1}
+    assert _counts(data, 'seats') == {5: 1, 7: 1}
+    assert [row['value'] for row in data['facets']['make'] if row['selected']] == ['Honda']
+
+    data = _facets(client, year_band='2017', facets='only')
+    assert data['total'] == 2
+    assert _counts(data, 'year_band') == {'2015-2019': 2, '2020-2024': 2}
+    assert 'results' not in data
+
+
+@pytest.mark.parametrize('params', [
+    {'year_band': '99999999999999999999999'},
+    {'year_band': '99999999999999999999999-99999999999999999999999'},
+    {'seats': '99999999999999999999999'},
+    {'seats': '²'},
+    {'price_band': '5-10'},
+])
+def test_facet_values_out_of_range_are_dropped(client, catalog, params):
+    data = _facets(client, **params)
+    assert data['total'] == 4
+    assert not any(row['selected'] for rows in data['facets'].values() for row in rows)
+
+
+def test_facets_follow_car_changes(client, catalog):
+    assert _counts(_facets(client, facets='only'), 'make')['Toyota'] == 2
+    catalog[0].make = 'Kia'
+    catalog[0].save()
+    assert _counts(_facets(client, facets='only'), 'make') == {'Toyota': 1, 'Honda': 2, 'Kia': 1}
+
+
+def test_facet_cache_is_keyed_on_the_location_filter(client, catalog):
+    assert _facets(client, location='Los Angeles', facets='only')['total'] == 2
+    assert _facets(client, location='LA')['total'] == 1
+    # Stripped for the filter and the cache key alike, so the cached counts match the results
+    data = _facets(client, location=' LA ')
+    assert data['total'] == len(data['results']) == 1
+    data = _facets(client, location='la')
+    assert data['total'] == len(data['results']) == 1
+
+
+def test_facets_fit_their_query_budget_on_a_database_cache(client, catalog, settings):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'facet_cache'}}
+    call_command('createcachetable', verbosity=0)
+    # The first request ever also stores the catalog version
+    _facets(client)
+    catalog[0].save()
+
+    settings.QUERY_BUDGET_STRICT = True
+    strict = Client()
+    strict.force_login(OwnerFactory())
+    # A miss stores the counts within FACETS_QUERY_BUDGET (the middleware raises otherwise)
+    _facets(strict)
+    with max_queries(7):
+        # Cached: the counts and the catalog version come back in one lookup
+        _facets(strict)
+
+
+def _calendar(client, car, **params):
+    return client.get(f'/api/cars/{car.id}/calendar/', params)
+
+
+def _states(response):
+    return {day['date']: day['state'] for month in response.json()['months'] for day in month['days']}
+
+
+def test_calendar_maps_windows_and_bookings_to_day_states(client, car):
+    cache.clear()
+    CarAvailability.objects.create(car=car, start_date=date(2030, 3, 1), end_date=date(2030, 3, 10))
+    BookingFactory(car=car, status='approved', start_date=date(2030, 3, 2), end_date=date(2030, 3, 3))
+    BookingFactory(car=car, status='pending', start_date=date(2030, 3, 5), end_date=date(2030, 3, 5))
+    BookingFactory(car=car, status='cancelled', start_date=date(2030, 3, 7), end_date=date(2030, 3, 7))
+    # Booked wins over an overlapping pending booking
+    BookingFactory(car=car, status='pending', start_date=date(2030, 3, 3), end_date=date(2030, 3, 3))
+
+    response = _calendar(client, car, start='2030-03', months=2)
+    assert response.status_code == 200
+    assert [month['month'] for month in response.json()['months']] == ['2030-03', '2030-04']
+    assert len(response.json()['months'][0]['days']) == 31
+    states = _states(response)
+    assert len(states) == 31 + 30
+    assert [states[f'2030-03-{day:02}'] for day in range(1, 12)] == [
+        'available', 'booked', 'booked', 'available', 'pending', 'available',
+        'available', 'available', 'available', 'available', 'blocked',
+    ]
+    assert set(states[day] for day in states if day.startswith('2030-04')) == {'blocked'}
+
+
+@pytest.mark.parametrize('params', [
+    {'start': 'March'},
+    {'start': '2030-13'},
+    {'start': '2030-03', 'months': '0'},
+    {'start': '2030-03', 'months': '13'},
+    {'start': '2030-03', 'months': 'many'},
+])
+def test_calendar_rejects_a_bad_month(client, car, params):
+    response = _calendar(client, car, **params)
+    assert response.status_code == 400
+    assert 'error' in response.json()
+
+
+def test_calendar_hides_unlisted_cars(client, car):
+    car.status = 'pending_approval'
+    car.save()
+    assert _calendar(client, car, start='2030-03').status_code == 404
+    client.force_login(car.owner)
+    assert _calendar(client, car, start='2030-03').status_code == 200
+
+
+def test_calendar_cache_is_dropped_when_a_booking_changes(client, car):
+    cache.clear()
+    CarAvailability.objects.create(car=car, start_date=date(2030, 3, 1), end_date=date(2030, 3, 31))
+    assert _states(_calendar(client, car, start='2030-03', months=1))['2030-03-15'] == 'available'
+    with max_queries(1):
+        # Cached: only the car lookup
+        assert _states(_calendar(client, car, start='2030-03', months=1))['2030-03-15'] == 'available'
+
+    booking = BookingFactory(car=car, status='pending', start_date=date(2030, 3, 15), end_date=date(2030, 3, 16))
+    assert _states(_calendar(client, car, start='2030-03', months=1))['2030-03-15'] == 'pending'
+    booking.status = 'approved'
+    booking.save()
+    assert _states(_calendar(client, car, start='2030-03', months=1))['2030-03-16'] == 'booked'
+    booking.delete()
+    assert _states(_calendar(client, car, start='2030-03', months=1))['2030-03-16'] == 'available'
+
+
+@pytest.fixture
+def fleet(db):
+    def make(rate, seats, year, city, transmission, fuel):
+        return CarFactory(status='available', daily_rate=Decimal(rate), seats=seats, year=year, city=city,
+                          transmission=transmission, fuel_type=fuel)
+    miami, seattle = CITIES[4], CITIES[5]
+    return [
+        make('50.00', 5, 2020, miami, 'automatic', 'petrol'),     # the source car
+        make('52.00', 5, 2020, miami, 'automatic', 'petrol'),     # near twin
+        make('90.00', 5, 2018, miami, 'manual', 'petrol'),
+        make('390.00', 2, 2009, seattle, 'manual', 'electric'),   # nothing alike
+    ]
+
+
+def _similar(client, car):
+    response = client.get(f'/api/cars/{car.id}/similar/')
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_similar_cars_are_ranked_best_first(client, fleet):
+    source, twin, cousin, stranger = fleet
+    assert compute_similar_cars(k=2, full=True) == 4
+    data = _similar(client, source)
+    assert [car['id'] for car in data] == [twin.id, cousin.id]
+    assert data[0]['score'] > data[1]['score']
+    # Never a car's own neighbour, wherever it ranks
+    assert not SimilarCar.objects.filter(car_id=F('similar_car_id')).exists()
+    assert SimilarCar.objects.filter(car=stranger).count() == 2
+
+
+def test_similar_cars_skip_delisted_cars(client, fleet):
+    source, twin, cousin, stranger = fleet
+    compute_similar_cars(k=2, full=True)
+    twin.status = 'maintenance'
+    twin.save()
+    assert [car['id'] for car in _similar(client, source)] == [cousin.id]
+    assert client.get(f'/api/cars/{twin.id}/similar/').status_code == 404
+
+
+def test_similar_cars_follow_a_changed_car(client, fleet):
+    source, twin, cousin, stranger = fleet
+    compute_similar_cars(k=2, full=True)
+    assert compute_similar_cars(k=2) == 0
+
+    stranger.daily_rate = source.daily_rate
+    stranger.seats, stranger.year = source.seats, source.year
+    stranger.latitude, stranger.longitude = source.latitude, source.longitude
+    stranger.transmission, stranger.fuel_type = source.transmission, source.fuel_type
+    stranger.save()
+    # The changed car, and every car it now enters the top 2 of
+    assert compute_similar_cars(k=2) >= 2
+    assert [car['id'] for car in _similar(client, source)] == [stranger.id, twin.id]
+    assert _similar(client, stranger)[0]['id'] == source.id
+
+
+@pytest.fixture
+def review_queue(db, client):
+    client.force_login(UserFactory(is_staff=True))
+    newer, older = CarFactory(status='pending_approval'), CarFactory(status='pending_approval')
+    Car.objects.filter(id=older.id).update(created_at=timezone.now() - timedelta(days=1))
+    CarImageFactory(car=older, image='car_images/first.jpeg')
+    CarImageFactory(car=older, image='car_images/primary.jpeg', is_primary=True)
+    CarFeatureFactory(car=older, name='GPS')
+    CarFactory(status='available')
+    return older, newer
+
+
+def test_pending_queue_lists_new_listings_oldest_first(client, review_queue):
+    older, newer = review_queue
+    with max_queries(5):
+        response = client.get('/api/admin/cars/pending/')
+    assert response.status_code == 200
+    data = response.json()
+    assert data['count'] == 2
+    assert [car['id'] for car in data['results']] == [older.id, newer.id]
+    first = data['results'][0]
+    assert first['owner'] == {'id': older.owner_id, 'username': older.owner.username}
+    assert first['thumbnail'].endswith('car_images/primary.jpeg')
+    assert first['features'] == ['GPS']
+    assert data['results'][1]['thumbnail'] is None
+
+
+def test_decisions_approve_reject_and_skip(client, review_queue, django_capture_on_commit_callbacks):
+    older, newer = review_queue
+    listed = Car.objects.get(status='available')
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post('/api/admin/cars/pending/decide/', {
+            'approve': [older.id, listed.id], 'reject': [newer.id, 999999],
+        }, content_type='application/json')
+    assert response.status_code == 200
+    assert response.json() == {'approved': [older.id], 'rejected': [newer.id], 'skipped': [listed.id, 999999]}
+    assert dict(Car.objects.filter(id__in=[older.id, newer.id]).values_list('id', 'status')) == {
+        older.id: 'available', newer.id: 'rejected',
+    }
+    # Decided cars leave the queue, and deciding again skips them
+    assert client.get('/api/admin/cars/pending/').json()['count'] == 0
+    response = client.post('/api/admin/cars/pending/decide/', {'reject': [older.id]}, content_type='application/json')
+    assert response.json() == {'approved': [], 'rejected': [], 'skipped': [older.id]}
+    assert Car.objects.get(id=older.id).status == 'available'
+
+
+@pytest.mark.parametrize('payload', [{}, {'approve': [1], 'reject': [1]}, {'approve': ['one']}])
+def test_decisions_reject_a_bad_batch(client, review_queue, payload):
+    response = client.post('/api/admin/cars/pending/decide/', payload, content_type='application/json')
+    assert response.status_code == 400
+    assert Car.objects.filter(status='pending_approval').count() == 2
+
+
+def test_review_queue_is_for_admins_only(client, review_queue):
+    older, newer = review_queue
+    client.force_login(older.owner)
+    assert client.get('/api/admin/cars/pending/').status_code == 403
+    response = client.post('/api/admin/cars/pending/decide/', {'approve': [older.id]}, content_type='application/json')
+    assert response.status_code == 403
+    assert Car.objects.get(id=older.id).status == 'pending_approval'
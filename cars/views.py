@@ -9,11 +9,28 @@ from rest_framework.response import Response
 from rest_framework import permissions, status
 from rest_framework.parsers import MultiPartParser, FormParser
 from .serializers import CarSerializer,AdminCarUpdateSerializer
+from .serializers import PendingCarSerializer, CarDecisionSerializer
 from rest_framework.permissions import IsAdminUser
 from rest_framework import generics
 from rest_framework.permissions import AllowAny
 
 from rest_framework.permissions import BasePermission
+from django.db import transaction
+from django.db.models import Prefetch
+from turo_clone.instrumentation import query_budget
+from turo_clone.db_routers import replica_reads
+from .tasks import process_car_image
+from .pricing import InvalidStay, check_stay, quote, quote_many
+from .serializers import CarPricingRuleSerializer, AvailabilityWindowSerializer
+from .models import CarPricingRule, SimilarCar
+from django.utils.dateparse import parse_date
+from django.utils import timezone
+from .deletion import soft_delete_car
+from jobs.views import job_accepted
+from .availability import car_calendar, parse_month, replace_availability
+from . import autocomplete
+from .moderation import decide, pending_cars
+from rest_framework.pagination import LimitOffsetPagination
 
 class IsAdminOrSupport(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -34,6 +51,14 @@ class AdminCarDeleteAPIView(generics.DestroyAPIView):
     permission_classes = [IsAdminUser]
     lookup_field = 'id'
 
+    def destroy(self, request, *args, **kwargs):
+        car = self.get_object()
+        job = soft_delete_car(car.id)
+        if job is None:
+            # Deleted by a concurrent request
+            return Response({'error': 'Car not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return job_accepted(request, job, 'Car scheduled for deletion.')
+
 class AdminCarUpdateAPIView(APIView):
     permission_classes = [IsAdminUser]
 
@@ -47,16 +72,21 @@ class AdminCarUpdateAPIView(APIView):
 
     def delete(self, request, car_id):
         car = get_object_or_404(Car, id=car_id)
-        car.delete()
-        return Response({"message": "Car deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
+        # Hidden now; bookings, images and the rest are purged by a background job
+        job = soft_delete_car(car.id)
+        if job is None:
+            return Response({'error': 'Car not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return job_accepted(request, job, 'Car scheduled for deletion.')
 
 
+@replica_reads
+@query_budget(5)
 class AdminCarListAPIView(generics.ListAPIView):
     serializer_class = CarSerializer
     permission_classes = [IsAdminUser]
 
     def get_queryset(self):
-        qs = Car.objects.all()
+        qs = Car.objects.prefetch_related('features', 'availability')
         status = self.request.query_params.get('status')
         owner_id = self.request.query_params.get('owner_id')
         search = self.request.query_params.get('search')
@@ -74,53 +104,141 @@ class AdminCarListAPIView(generics.ListAPIView):
             )
         return qs
 
-class AvailableCarsAPIView(APIView):
-    authentication_classes = []  # Public access
-    permission_classes = []      # Public access
+class PendingCarPagination(LimitOffsetPagination):
+    default_limit = 50
+    max_limit = 200
 
-    def get(self, request):
-        cars = Car.objects.filter(status='available').order_by('-created_at')
-        data = []
 
-        for car in cars:
-            # Get primary image or first image
-            primary_image = car.images.filter(is_primary=True).first() or car.images.first()
-            image_url = (
-                request.build_absolute_uri(primary_image.image.url)
-                if primary_image and primary_image.image
-                else None
-            )
+# Session and user, then count, page of cars and their features
+@replica_reads
+@query_budget(5)
+class AdminPendingCarListAPIView(generics.ListAPIView):
+    """Review queue of new listings awaiting approval, oldest first."""
+    serializer_class = PendingCarSerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = PendingCarPagination
 
-            # Get availability list
-            availability_list = [
-                {
-                    "start_date": a.start_date.strftime('%Y-%m-%d'),
-                    "end_date": a.end_date.strftime('%Y-%m-%d'),
-                }
-                for a in car.availability.all()
-            ]
+    def get_queryset(self):
+        return pending_cars()
 
-            # Get features list
-            features_list = [f.name for f in car.features.all()]
 
-            data.append({
-                "id": car.id,
-                "make": car.make,
-                "model": car.model,
-                "year": car.year,
-                "color": car.color,
-                "license_plate": car.license_plate,
-                "daily_rate": str(car.daily_rate),
-                "location": car.location,
-                "seats": car.seats,
-                "transmission": car.transmission,
-                "fuel_type": car.fuel_type,
-                "image": image_url,
-                "availability": availability_list,
-                "features": features_list,
-            })
+class AdminCarDecisionAPIView(APIView):
+    """Approve and reject many pending cars in one request."""
+    permission_classes = [IsAdminUser]
 
-        return Response(data)
+    def post(self, request):
+        serializer = CarDecisionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        changed = decide(serializer.validated_data)
+        requested = set(serializer.validated_data['approve']) | set(serializer.validated_data['reject'])
+        decided = {car_id for ids in changed.values() for car_id in ids}
+        return Response({
+            'approved': changed.get('approve', []),
+            'rejected': changed.get('reject', []),
+            # Already decided, deleted or never existed
+            'skipped': sorted(requested - decided),
+        })
+
+
+def parse_date_range(params):
+    """(start_date, end_date) from query params, None if neither is given.
+
+    Raises InvalidStay for a malformed or out of bounds range, see check_stay.
+    """
+    if not params.get('start_date') and not params.get('end_date'):
+        return None
+    try:
+        start_date = parse_date(params.get('start_date') or '')
+        end_date = parse_date(params.get('end_date') or '')
+    except ValueError:
+        start_date = end_date = None
+    if not start_date or not end_date:
+        raise InvalidStay("Valid start_date and end_date (YYYY-MM-DD) are required.")
+    check_stay(start_date, end_date)
+    return start_date, end_date
+
+
+def _quote_data(quote):
+    return {
+        "days": quote.days,
+        "subtotal": str(quote.subtotal),
+        "discount": str(quote.discount),
+        "total": str(quote.total),
+    }
+
+
+def available_cars_data(request):
+    """Payload of the public available-cars listing, shared with the async variant.
+
+    With ?start_date=&end_date= every car also carries the price quote for that
+    stay; a range check_stay() refuses raises InvalidStay.
+    """
+    date_range = parse_date_range(request.GET)
+    cars = list(Car.objects.filter(status='available').order_by('-created_at').prefetch_related(
+        Prefetch('images', queryset=CarImage.objects.order_by('id')),
+        'availability',
+        'features',
+    ))
+    quotes = quote_many(cars, *date_range) if date_range and cars else {}
+    data = []
+
+    for car in cars:
+        # Get primary image or first image
+        images = list(car.images.all())
+        primary_image = next((img for img in images if img.is_primary), images[0] if images else None)
+        image_url = (
+            request.build_absolute_uri(primary_image.image.url)
+            if primary_image and primary_image.image
+            else None
+        )
+
+        # Get availability list
+        availability_list = [
+            {
+                "start_date": a.start_date.strftime('%Y-%m-%d'),
+                "end_date": a.end_date.strftime('%Y-%m-%d'),
+            }
+            for a in car.availability.all()
+        ]
+
+        # Get features list
+        features_list = [f.name for f in car.features.all()]
+
+        data.append({
+            "id": car.id,
+            "make": car.make,
+            "model": car.model,
+            "year": car.year,
+            "color": car.color,
+            "license_plate": car.license_plate,
+            "daily_rate": str(car.daily_rate),
+            "location": car.location,
+            "seats": car.seats,
+            "transmission": car.transmission,
+            "fuel_type": car.fuel_type,
+            "image": image_url,
+            "availability": availability_list,
+            "features": features_list,
+        })
+        if car.id in quotes:
+            data[-1]["quote"] = _quote_data(quotes[car.id])
+
+    return data
+
+
+# Cars and three prefetches; a date range adds the calendars and the rules of cars without one
+@replica_reads
+@query_budget(6)
+class AvailableCarsAPIView(APIView):
+    authentication_classes = []  # Public access
+    permission_classes = []      # Public access
+
+    def get(self, request):
+        try:
+            return Response(available_cars_data(request))
+        except InvalidStay as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
 
 
@@ -147,21 +265,234 @@ class CarCreateAPIView(APIView):
 
         serializer = CarSerializer(data=data, context={'request': request})
         if serializer.is_valid():
-            car = serializer.save()
+            # All or nothing: no car without its images, no image job without its row
+            with transaction.atomic():
+                car = serializer.save()
 
-            # Handle image files
-            for img in request.FILES.getlist('images'):
-                CarImage.objects.create(car=car, image=img)
+                # Handle image files; resizing and re-encoding happen in the jobs worker
+                for img in request.FILES.getlist('images'):
+                    car_image = CarImage.objects.create(car=car, image=img)
+                    transaction.on_commit(lambda image_id=car_image.id: process_car_image.enqueue(image_id=image_id))
 
             return Response({'message': 'Car created successfully'}, status=201)
 
         return Response(serializer.errors, status=400)
+
+
+# Car and its compiled price calendar, plus its pricing rules when that is missing or stale
+@query_budget(3)
+class CarQuoteAPIView(APIView):
+    authentication_classes = []  # Public access
+    permission_classes = []      # Public access
+
+    def get(self, request, car_id):
+        car = get_object_or_404(Car, id=car_id, status='available')
+        try:
+            date_range = parse_date_range(request.query_params)
+        except InvalidStay as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if not date_range:
+            return Response({'error': 'Valid start_date and end_date (YYYY-MM-DD) are required.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        data = {"car_id": car.id, "start_date": str(date_range[0]), "end_date": str(date_range[1])}
+        data.update(_quote_data(quote(car, *date_range)))
+        return Response(data)
+
+
+@query_budget(4)
+class CarCalendarAPIView(APIView):
+    permission_classes = [AllowAny]
+    MAX_MONTHS = 12
+
+    def get(self, request, car_id):
+        car = get_object_or_404(Car.objects.only('id', 'owner_id', 'status'), id=car_id)
+        if car.status != 'available' and car.owner_id != request.user.id and not request.user.is_staff:
+            return Response({'error': 'Car not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        first_month = parse_month(request.query_params.get('start'), timezone.localdate())
+        try:
+            months = int(request.query_params.get('months', 3))
+        except ValueError:
+            months = 0
+        if first_month is None or not 1 <= months <= self.MAX_MONTHS:
+            return Response({'error': f'start must be YYYY-MM and months between 1 and {self.MAX_MONTHS}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'car_id': car.id, 'months': car_calendar(car.id, first_month, months)})
+
+
+# One query only when this worker's index has not been built yet
+@query_budget(1)
+class CarAutocompleteAPIView(APIView):
+    authentication_classes = []  # Public access, and no session or token lookup
+    permission_classes = []      # Public access
+    MAX_LIMIT = 20
+
+    def get(self, request):
+        prefix = request.query_params.get('q', '')
+        field = request.query_params.get('field')
+        if field and field not in autocomplete.FIELDS:
+            return Response({'error': f"field must be one of {', '.join(autocomplete.FIELDS)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get('limit', 8))
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return Response({'error': 'limit must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+        fields = [field] if field else autocomplete.FIELDS
+        return Response(autocomplete.index.search(prefix, fields, min(limit, self.MAX_LIMIT)))
+
+
+@replica_reads
+@query_budget(3)
+class SimilarCarsAPIView(APIView):
+    authentication_classes = []  # Public access
+    permission_classes = []      # Public access
+
+    def get(self, request, car_id):
+        similar = list(
+            SimilarCar.objects.filter(car_id=car_id, car__status='available', similar_car__status='available',
+                                      similar_car__deleted_at__isnull=True)
+            .select_related('similar_car')
+            .prefetch_related(Prefetch('similar_car__images', queryset=CarImage.objects.order_by('id')))
+            .order_by('rank')
+        )
+        if not similar and not Car.objects.filter(id=car_id, status='available').exists():
+            return Response({'error': 'Car not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        data = []
+        for entry in similar:
+            car = entry.similar_car
+            images = list(car.images.all())
+            primary_image = next((img for img in images if img.is_primary), images[0] if images else None)
+            data.append({
+                "id": car.id,
+                "make": car.make,
+                "model": car.model,
+                "year": car.year,
+                "daily_rate": str(car.daily_rate),
+                "location": car.location,
+                "seats": car.seats,
+                "transmission": car.transmission,
+                "fuel_type": car.fuel_type,
+                "image": (
+                    request.build_absolute_uri(primary_image.image.url)
+                    if primary_image and primary_image.image else None
+                ),
+                "score": round(entry.score, 4),
+            })
+        return Response(data)
+
+
+def _owned_car(request, car_id):
+    car = get_object_or_404(Car, id=car_id)
+    if car.owner_id != request.user.id and not request.user.is_staff:
+        return None
+    return car
+
+
+@query_budget(4)
+class CarPricingRuleListCreateAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, car_id):
+        car = _owned_car(request, car_id)
+        if car is None:
+            return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
+        rules = CarPricingRule.objects.filter(car=car).order_by('-priority', 'id')
+        return Response(CarPricingRuleSerializer(rules, many=True).data)
+
+    def post(self, request, car_id):
+        car = _owned_car(request, car_id)
+        if car is None:
+            return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
+        serializer = CarPricingRuleSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save(car=car)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@query_budget(4)
+class CarAvailabilityBulkAPIView(APIView):
+    """The car's full set of availability windows; PUT replaces it.
+
+    PUT body: {"windows": [{"start_date": "2026-11-01", "end_date": "2026-11-10"}, ...]}
+    (a bare list also works). Windows are coalesced and only the rows that
+    differ are deleted or inserted, in one transaction.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def _windows_data(self, rows):
+        return [
+            {'id': row.id, 'start_date': row.start_date.isoformat(), 'end_date': row.end_date.isoformat()}
+            for row in rows
+        ]
+
+    def get(self, request, car_id):
+        car = _owned_car(request, car_id)
+        if car is None:
+            return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
+        rows = CarAvailability.objects.filter(car=car).order_by('start_date')
+        return Response({'car_id': car.id, 'windows': self._windows_data(rows)})
+
+    def put(self, request, car_id):
+        car = _owned_car(request, car_id)
+        if car is None:
+            return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
+        windows = request.data.get('windows') if isinstance(request.data, dict) else request.data
+        if not isinstance(windows, list):
+            return Response({'error': 'windows must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = AvailabilityWindowSerializer(data=windows, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        rows, created, deleted = replace_availability(car.id, [
+            (window['start_date'], window['end_date']) for window in serializer.validated_data
+        ])
+        return Response({
+            'car_id': car.id,
+            'windows': self._windows_data(rows),
+            'created': created,
+            'deleted': deleted,
+        })
+
+
+class CarPricingRuleDetailAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get_rule(self, request, rule_id):
+        rule = get_object_or_404(CarPricingRule.objects.select_related('car'), id=rule_id)
+        if rule.car.owner_id != request.user.id and not request.user.is_staff:
+            return None
+        return rule
+
+    def patch(self, request, rule_id):
+        rule = self.get_rule(request, rule_id)
+        if rule is None:
+            return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
+        serializer = CarPricingRuleSerializer(rule, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request, rule_id):
+        rule = self.get_rule(request, rule_id)
+        if rule is None:
+            return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
+        rule.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@query_budget(5)
 class OwnerCarListAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         user = request.user
-        cars = Car.objects.filter(owner=user)
+        cars = Car.objects.filter(owner=user).prefetch_related('features', 'availability')
         serializer = CarSerializer(cars, many=True)
         return Response(serializer.data)
 
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'queue', 'status', 'attempts', 'max_attempts', 'run_at', 'finished_at')
+    list_filter = ('queue', 'status')
+    search_fields = ('name', 'last_error')
+    readonly_fields = ('locked_by', 'locked_at', 'created_at', 'finished_at')
@@ -0,0 +1,94 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from jobs.queue import claim, execute, release_stale
+
+
+def parse_queues(values):
+    """``['default:4', 'email']`` -> ``{'default': 4, 'email': 1}``"""
+    queues = {}
+    for value in values:
+        name, _, concurrency = value.partition(':')
+        try:
+            queues[name] = int(concurrency or 1)
+        except ValueError:
+            raise CommandError(f"Invalid queue spec {value!r}, expected name:concurrency")
+        if queues[name] < 1:
+            raise CommandError(f"Concurrency for {name!r} must be at least 1")
+    return queues
+
+
+class Command(BaseCommand):
+    help = "Run queued jobs, with a separate concurrency limit per queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queues', nargs='+',
+                            help="queue:concurrency pairs (default: the JOBS_QUEUES setting)")
+        parser.add_argument('--pool', choices=['thread', 'process'], default='thread')
+        parser.add_argument('--poll-interval', type=float)
+        parser.add_argument('--once', action='store_true', help="Exit once no job is due")
+
+    def handle(self, *args, **options):
+        if options['queues']:
+            queues = parse_queues(options['queues'])
+        else:
+            queues = dict(getattr(settings, 'JOBS_QUEUES', {'default': 4}))
+        poll_interval = options['poll_interval'] or getattr(settings, 'JOBS_POLL_INTERVAL', 1.0)
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+
+        stopping = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stopping.set())
+
+        if options['pool'] == 'process':
+            # Spawned (not forked) children never inherit the parent's DB connections
+            context = multiprocessing.get_context('spawn')
+            executors = {
+                name: ProcessPoolExecutor(max_workers=limit, mp_context=context, initializer=django.setup)
+                for name, limit in queues.items()
+            }
+        else:
+            executors = {
+                name: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f'jobs-{name}')
+                for name, limit in queues.items()
+            }
+        running = {name: set() for name in queues}
+
+        self.stdout.write(f"Worker {worker_id} ({options['pool']} pool) serving {queues}")
+        try:
+            while not stopping.is_set():
+                close_old_connections()
+                released = release_stale()
+                if released:
+                    self.stdout.write(f"Requeued {released} stale job(s)")
+
+                claimed = 0
+                for name, limit in queues.items():
+                    running[name] = {future for future in running[name] if not future.done()}
+                    free = limit - len(running[name])
+                    if free <= 0:
+                        continue
+                    job_ids, lock_token = claim(name, worker_id, free)
+                    for job_id in job_ids:
+                        running[name].add(executors[name].submit(execute, job_id, worker_id, lock_token))
+                        claimed += 1
+
+                busy = any(running.values())
+                if options['once'] and not claimed and not busy:
+                    break
+                if not claimed:
+                    # Poll faster while jobs run so freed slots are refilled promptly
+                    stopping.wait(min(poll_interval, 0.1) if busy else poll_interval)
+        finally:
+            self.stdout.write("Waiting for running jobs to finish...")
+            for executor in executors.values():
+                executor.shutdown(wait=True)
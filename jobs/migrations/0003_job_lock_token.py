@@ -0,0 +1,18 @@
+# Generated by Django 3.2.20 on 2026-10-19 07:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_job_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='lock_token',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    )
+
+    queue = models.CharField(max_length=50, default='default')
+    # Dotted path of the task function, imported by the worker
+    name = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    # New for every claim: a worker that lost the lock to release_stale() can
+    # no longer write to the job, even if the same worker claimed it again
+    lock_token = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    # Written by long-running tasks through jobs.queue.report_progress()
+    progress = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Workers only ever scan due, queued jobs of one queue
+            models.Index(
+                fields=['queue', 'run_at', 'id'], name='job_claimable_idx',
+                condition=Q(status='queued'),
+            ),
+            models.Index(fields=['status', 'locked_at'], name='job_status_locked_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} [{self.queue}] {self.status}"
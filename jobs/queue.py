@@ -0,0 +1,167 @@
+import contextvars
+import logging
+import random
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# The job the current thread or process is executing, as its held_lock() queryset
+_current_job = contextvars.ContextVar('current_job', default=None)
+
+
+def _task_name(func):
+    if isinstance(func, str):
+        return func
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+def enqueue(func, *, queue=None, run_at=None, delay=None, max_attempts=None, **payload):
+    """Queue ``func(**payload)`` for a worker. ``func`` is a task function or its dotted path.
+
+    The job row is written in the caller's transaction, so it only becomes
+    visible to workers once the surrounding work commits.
+    """
+    if run_at is None:
+        run_at = timezone.now() + timedelta(seconds=delay or 0)
+    return Job.objects.create(
+        name=_task_name(func),
+        queue=queue or getattr(func, 'queue', 'default'),
+        payload=payload,
+        run_at=run_at,
+        max_attempts=max_attempts or getattr(func, 'max_attempts', 5),
+    )
+
+
+def task(queue='default', max_attempts=5):
+    """Mark a function as a job; ``func.enqueue(**payload)`` queues it."""
+    def decorator(func):
+        func.queue = queue
+        func.max_attempts = max_attempts
+        func.enqueue = lambda **kwargs: enqueue(func, **kwargs)
+        return func
+    return decorator
+
+
+def claim(queue, worker_id, limit):
+    """Atomically take up to ``limit`` due jobs from ``queue`` and mark them running.
+
+    Returns ``(job ids, lock token)``; pass both with ``worker_id`` to execute().
+    """
+    now = timezone.now()
+    lock_token = uuid.uuid4().hex
+    due = Job.objects.filter(queue=queue, status='queued', run_at__lte=now).order_by('run_at', 'id')
+    claimed_fields = dict(
+        status='running', locked_by=worker_id, lock_token=lock_token, locked_at=now,
+        attempts=F('attempts') + 1,
+    )
+
+    if connection.features.has_select_for_update_skip_locked:
+        # Concurrent workers skip each other's rows instead of waiting on them
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            Job.objects.filter(id__in=ids).update(**claimed_fields)
+    else:
+        # SQLite has no row locks but serializes writers, so a conditional
+        # update per candidate is a race-free claim
+        ids = []
+        for job_id in due.values_list('id', flat=True)[:limit]:
+            if Job.objects.filter(id=job_id, status='queued').update(**claimed_fields):
+                ids.append(job_id)
+    return ids, lock_token
+
+
+def held_lock(job_id, worker_id, lock_token):
+    """The job, as long as it is still running under this claim; updates through it are no-ops otherwise."""
+    return Job.objects.filter(id=job_id, status='running', locked_by=worker_id, lock_token=lock_token)
+
+
+def report_progress(**progress):
+    """Record how far the running task has got, e.g. ``report_progress(deleted=1200)``.
+
+    Also refreshes the job's lock, so long tasks that report progress are not
+    requeued by release_stale(). A no-op when the task is called directly.
+    """
+    held = _current_job.get()
+    if held is not None:
+        held.update(progress=progress, locked_at=timezone.now())
+
+
+def retry_delay(attempts):
+    base = getattr(settings, 'JOBS_RETRY_BACKOFF', 10)
+    cap = getattr(settings, 'JOBS_RETRY_BACKOFF_MAX', 3600)
+    delay = min(base * 2 ** (attempts - 1), cap)
+    # Jitter keeps a batch of failed jobs from retrying in lockstep
+    return delay * random.uniform(0.8, 1.2)
+
+
+def release_stale(timeout=None):
+    """Requeue running jobs whose worker died without finishing them; returns how many.
+
+    A job that has used up its attempts is failed instead, so one that kills
+    or hangs its worker every time is not claimed forever.
+    """
+    timeout = timeout or getattr(settings, 'JOBS_LOCK_TIMEOUT', 600)
+    now = timezone.now()
+    stale = Job.objects.filter(status='running', locked_at__lt=now - timedelta(seconds=timeout))
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', locked_by='', lock_token='', last_error='Worker lock expired', finished_at=now,
+    )
+    if failed:
+        logger.error("%s stale job(s) failed permanently", failed)
+    return stale.update(
+        status='queued', locked_by='', lock_token='', locked_at=None, last_error='Worker lock expired',
+    )
+
+
+def _record(held, job, **fields):
+    if not held.update(locked_by='', lock_token='', **fields):
+        # Requeued by release_stale() while running; the new claim owns the row now
+        logger.warning("Job %s (%s) lost its lock, outcome %r not recorded", job.id, job.name, fields['status'])
+        return False
+    return True
+
+
+def execute(job_id, worker_id, lock_token):
+    """Run one claimed job and record the outcome. Used by both thread and process pools.
+
+    Every write is guarded by the claim (``worker_id``, ``lock_token``), so a
+    job requeued and claimed again while this run was still going is left to
+    its new owner.
+    """
+    close_old_connections()
+    try:
+        held = held_lock(job_id, worker_id, lock_token)
+        job = held.first()
+        if job is None:
+            logger.warning("Job %s lost its lock before it started", job_id)
+            return False
+        token = _current_job.set(held)
+        try:
+            func = import_string(job.name)
+            func(**job.payload)
+        except Exception:
+            error = traceback.format_exc()
+            if job.attempts < job.max_attempts:
+                delay = retry_delay(job.attempts)
+                if _record(held, job, status='queued', locked_at=None, last_error=error,
+                           run_at=timezone.now() + timedelta(seconds=delay)):
+                    logger.warning("Job %s (%s) failed, retry %s in %.0fs", job.id, job.name, job.attempts, delay)
+            else:
+                if _record(held, job, status='failed', last_error=error, finished_at=timezone.now()):
+                    logger.error("Job %s (%s) failed permanently", job.id, job.name)
+            return False
+        finally:
+            _current_job.reset(token)
+        return _record(held, job, status='succeeded', finished_at=timezone.now())
+    finally:
+        close_old_connections()
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import claim, enqueue, execute, release_stale
+
+pytestmark = pytest.mark.django_db
+
+
+def noop():
+    pass
+
+
+def lose_lock_while_running():
+    # The lock expires mid-run and another worker claims the job again
+    Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+    assert release_stale(timeout=60) == 1
+    assert claim('default', 'worker-b', 1)[0]
+
+
+def test_claimed_job_runs_and_succeeds():
+    job = enqueue(noop)
+    ids, lock_token = claim('default', 'worker-a', 10)
+    assert ids == [job.id]
+    assert execute(job.id, 'worker-a', lock_token) is True
+    job.refresh_from_db()
+    assert job.status == 'succeeded'
+    assert (job.locked_by, job.lock_token) == ('', '')
+
+
+def test_requeued_job_is_left_to_its_new_claim():
+    job = enqueue(lose_lock_while_running)
+    ids, lock_token = claim('default', 'worker-a', 10)
+    assert execute(job.id, 'worker-a', lock_token) is False
+    job.refresh_from_db()
+    # Still running for worker-b, not marked succeeded by worker-a
+    assert job.status == 'running'
+    assert job.locked_by == 'worker-b'
+    assert job.lock_token != lock_token
+
+
+def test_same_worker_cannot_use_an_old_claim():
+    job = enqueue(noop)
+    _, old_token = claim('default', 'worker-a', 10)
+    Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+    release_stale(timeout=60)
+    _, new_token = claim('default', 'worker-a', 10)
+    assert execute(job.id, 'worker-a', old_token) is False
+    assert execute(job.id, 'worker-a', new_token) is True
+
+
+def test_stale_job_out_of_attempts_is_failed():
+    retried, exhausted = enqueue(noop, max_attempts=3), enqueue(noop, max_attempts=1)
+    claim('default', 'worker-a', 10)
+    Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+
+    assert release_stale(timeout=60) == 1
+    retried.refresh_from_db()
+    exhausted.refresh_from_db()
+    assert (retried.status, retried.attempts) == ('queued', 1)
+    assert exhausted.status == 'failed'
+    assert exhausted.finished_at is not None
+    assert (exhausted.locked_by, exhausted.lock_token) == ('', '')
+    # Never claimed again
+    assert claim('default', 'worker-b', 10)[0] == [retried.id]
@@ -0,0 +1,38 @@
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from turo_clone.instrumentation import query_budget
+from .models import Job
+
+
+@query_budget(3)
+class JobDetailAPIView(APIView):
+    """Status and progress of a background job, e.g. a purge started by a 202 delete."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, job_id):
+        job = get_object_or_404(Job, id=job_id)
+        return Response({
+            'id': job.id,
+            'name': job.name,
+            'queue': job.queue,
+            'status': job.status,
+            'attempts': job.attempts,
+            'progress': job.progress,
+            'last_error': job.last_error,
+            'created_at': job.created_at,
+            'finished_at': job.finished_at,
+        })
+
+
+def job_accepted(request, job, message):
+    """202 body pointing the client at the job doing the work."""
+    return Response({
+        'message': message,
+        'job_id': job.id,
+        'status_url': request.build_absolute_uri(reverse('admin-job-detail', args=[job.id])),
+    }, status=status.HTTP_202_ACCEPTED)
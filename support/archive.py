@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from turo_clone.archive import move_batch
+from .models import ArchivedTicketReply, TicketReply
+
+
+def archivable_replies(horizon_days=None):
+    """Replies on closed tickets written more than ``horizon_days`` (ARCHIVE_AFTER_DAYS) ago."""
+    horizon_days = horizon_days or getattr(settings, 'ARCHIVE_AFTER_DAYS', 365)
+    cutoff = timezone.now() - timedelta(days=horizon_days)
+    return TicketReply.objects.filter(ticket__status='closed', created_at__lt=cutoff)
+
+
+def archive_ticket_replies(horizon_days=None, batch_size=1000, limit=None):
+    moved = 0
+    queryset = archivable_replies(horizon_days)
+    while limit is None or moved < limit:
+        rows = move_batch(queryset, ArchivedTicketReply, batch_size if limit is None else min(batch_size, limit - moved))
+        if not rows:
+            break
+        moved += len(rows)
+    return moved
@@ -3,6 +3,7 @@ from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from .models import Ticket, TicketReply
 from django.contrib.auth.models import AnonymousUser
+from turo_clone.sqlite import retry_atomic
 
 class TicketConsumer(AsyncWebsocketConsumer):
     async def connect(self):
@@ -64,6 +65,7 @@ class TicketConsumer(AsyncWebsocketConsumer):
         }))
 
     @database_sync_to_async
+    @retry_atomic
     def save_reply(self, user, ticket_id, message):
         ticket = Ticket.objects.get(id=ticket_id)
-        return TicketReply.objects.create(ticket=ticket, author=user, message=message)
+        return TicketReply.objects.create(ticket=ticket, sender=user, message=message)
@@ -0,0 +1,24 @@
+import factory
+
+from support.models import Ticket, TicketReply
+from users.factories import UserFactory
+
+
+class TicketFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Ticket
+
+    user = factory.SubFactory(UserFactory)
+    subject = factory.Faker('sentence', nb_words=5)
+    message = factory.Faker('paragraph')
+    status = factory.Faker('random_element', elements=['open', 'in_progress', 'resolved', 'closed', 'closed'])
+
+
+class TicketReplyFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = TicketReply
+
+    ticket = factory.SubFactory(TicketFactory)
+    sender = factory.SelfAttribute('ticket.user')
+    message = factory.Faker('sentence', nb_words=15)
+    author = factory.LazyAttribute(lambda o: o.sender.username)
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.20 on 2026-10-19 06:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0002_ticketreply_author'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['user', '-created_at'], name='ticket_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticketreply',
+            index=models.Index(fields=['ticket', 'created_at'], name='ticketreply_ticket_created_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.20 on 2026-10-19 07:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('support', '0003_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTicketReply',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('message', models.TextField()),
+                ('author', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_replies', to='support.ticket')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedticketreply',
+            index=models.Index(fields=['ticket', 'created_at'], name='archreply_ticket_created_idx'),
+        ),
+    ]
@@ -18,9 +18,35 @@ class Ticket(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='open')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='ticket_user_created_idx'),
+        ]
+
 class TicketReply(models.Model):
     ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE, related_name="replies")
     sender = models.ForeignKey(User, on_delete=models.CASCADE)
     message = models.TextField()
     author = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ticket', 'created_at'], name='ticketreply_ticket_created_idx'),
+        ]
+
+
+class ArchivedTicketReply(models.Model):
+    """Replies on closed tickets past ARCHIVE_AFTER_DAYS, moved out of TicketReply by archive_records."""
+    id = models.BigIntegerField(primary_key=True)
+    ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE, related_name="archived_replies")
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    message = models.TextField()
+    author = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ticket', 'created_at'], name='archreply_ticket_created_idx'),
+        ]
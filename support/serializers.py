@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Ticket, TicketReply
+from .models import Ticket, TicketReply, ArchivedTicketReply
 
 
 
@@ -35,6 +35,13 @@ class TicketReplySerializer(serializers.ModelSerializer):
         model = TicketReply
         fields = ['id', 'message', 'created_at', 'author']
 
+class ArchivedTicketReplySerializer(serializers.ModelSerializer):
+    archived = serializers.BooleanField(default=True, read_only=True)
+
+    class Meta:
+        model = ArchivedTicketReply
+        fields = ['id', 'message', 'created_at', 'author', 'archived']
+
 class TicketDetailSerializer(serializers.ModelSerializer):
     replies = TicketReplySerializer(many=True, read_only=True)
 
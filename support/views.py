@@ -1,12 +1,16 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from .models import Ticket, TicketReply
-from .serializers import TicketSerializer, TicketReplySerializer, TicketStatusUpdateSerializer,TicketDetailSerializer
+from .models import Ticket, TicketReply, ArchivedTicketReply
+from .serializers import TicketSerializer, TicketReplySerializer, TicketStatusUpdateSerializer,TicketDetailSerializer, ArchivedTicketReplySerializer
+from turo_clone.archive import include_archived
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
+from turo_clone.instrumentation import query_budget
+from turo_clone.sqlite import retry_atomic
 
 
+@query_budget(4)
 class TicketRepliesView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -14,12 +18,16 @@ class TicketRepliesView(APIView):
         ticket = get_object_or_404(Ticket, id=ticket_id)
 
         # Only allow related user/support/admin
-        if request.user != ticket.user and not request.user.is_staff and request.user.user_type != 'support':
+        if request.user.id != ticket.user_id and not request.user.is_staff and request.user.user_type != 'support':
             return Response({"detail": "Not authorized."}, status=403)
 
         replies = TicketReply.objects.filter(ticket=ticket).order_by('created_at')
-        serializer = TicketReplySerializer(replies, many=True)
-        return Response(serializer.data)
+        data = TicketReplySerializer(replies, many=True).data
+        if include_archived(request):
+            # Archived replies are the oldest ones, so they go first
+            archived = ArchivedTicketReply.objects.filter(ticket=ticket).order_by('created_at')
+            data = ArchivedTicketReplySerializer(archived, many=True).data + data
+        return Response(data)
 
 class TicketDetailView(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -37,23 +45,26 @@ class CreateTicketView(generics.CreateAPIView):
     serializer_class = TicketSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    @retry_atomic
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+@query_budget(5)
 class MyTicketsView(generics.ListAPIView):
     serializer_class = TicketSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Ticket.objects.filter(user=self.request.user)
+        return Ticket.objects.filter(user=self.request.user).select_related('user').prefetch_related('replies__sender')
 
+@query_budget(5)
 class AllTicketsAdminSupportView(generics.ListAPIView):
     serializer_class = TicketSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         if self.request.user.user_type in ['admin', 'support']:
-            return Ticket.objects.all()
+            return Ticket.objects.select_related('user').prefetch_related('replies__sender')
         return Ticket.objects.none()
 
 class ReplyToTicketView(APIView):
@@ -67,7 +78,7 @@ class ReplyToTicketView(APIView):
 
         serializer = TicketReplySerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(ticket=ticket, sender=request.user)
+            retry_atomic(serializer.save)(ticket=ticket, sender=request.user)
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
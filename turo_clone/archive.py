@@ -0,0 +1,28 @@
+from django.db import transaction
+
+
+def move_batch(queryset, archive_model, batch_size):
+    """Copy up to ``batch_size`` rows of ``queryset`` into ``archive_model`` and delete them, atomically.
+
+    The archive model must have the same concrete field names as the source,
+    plus any defaulted extras. Returns the moved rows' values (empty when done).
+    """
+    model = queryset.model
+    fields = [field.attname for field in archive_model._meta.concrete_fields
+              if field.attname in {f.attname for f in model._meta.concrete_fields}]
+    with transaction.atomic(using=queryset.db):
+        rows = list(queryset.order_by('pk').values(*fields)[:batch_size])
+        if not rows:
+            return rows
+        archive_model.objects.using(queryset.db).bulk_create(
+            [archive_model(**row) for row in rows], ignore_conflicts=True,
+        )
+        # A plain DELETE: the archive keeps the data, so no per-row signals or
+        # cascade collection (callers move or exclude rows that still have dependants)
+        model.objects.filter(pk__in=[row['id'] for row in rows])._raw_delete(queryset.db)
+    return rows
+
+
+def include_archived(request):
+    """``?include_archived=1``: the caller wants archived rows merged in."""
+    return request.query_params.get('include_archived', '').lower() in ('1', 'true', 'yes')
@@ -8,21 +8,31 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 """
 
 import os
-from channels.routing import ProtocolTypeRouter, URLRouter
-from django.core.asgi import get_asgi_application
-from channels.auth import AuthMiddlewareStack
-import tickets.routing  # or wherever your WebSocket routes live
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'turo_clone.settings')
 
-application = get_asgi_application()
-#application = ProtocolTypeRouter({
-#    "http": get_asgi_application(),
-#    "websocket": AuthMiddlewareStack(
-#        URLRouter(
-#            tickets.routing.websocket_urlpatterns
-#        )
-#    ),
-#})
\ No newline at end of file
+# Set up Django (and the app registry) before anything imports models
+django_asgi_app = get_asgi_application()
+
+from channels.auth import AuthMiddlewareStack  # noqa: E402
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import AllowedHostsOriginValidator  # noqa: E402
+
+import support.routing  # noqa: E402
+from cars.autocomplete import index  # noqa: E402
+
+# Build the in-memory autocomplete index before the first request needs it
+index.warm()
+
+application = ProtocolTypeRouter({
+    "http": django_asgi_app,
+    "websocket": AllowedHostsOriginValidator(
+        AuthMiddlewareStack(
+            URLRouter(
+                support.routing.websocket_urlpatterns
+            )
+        )
+    ),
+})
@@ -0,0 +1,44 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide pool for the ORM work of async views; its size caps concurrent DB connections."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'ASYNC_DB_POOL_SIZE', 8),
+                    thread_name_prefix='async-db',
+                )
+    return _executor
+
+
+def _run(func, args, kwargs):
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_db(func, *args, **kwargs):
+    """Run ``func`` (all the queries a response needs, in one batch) on the DB pool.
+
+    The caller's context is copied so replica routing and query counting apply
+    inside the worker thread.
+    """
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, _run, func, args, kwargs)
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), call)
@@ -0,0 +1,83 @@
+import contextvars
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from turo_clone.instrumentation import get_view_attribute
+
+# Per-request routing state; contextvars keep concurrent requests (threads or tasks) apart
+_routing = contextvars.ContextVar('replica_routing', default=None)
+
+PIN_COOKIE = 'pin_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# Sessions and tokens are written on login and must be read back immediately
+PRIMARY_ONLY_APPS = ('sessions', 'authtoken')
+
+
+def replica_alias():
+    alias = getattr(settings, 'REPLICA_DATABASE_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+def replica_reads(view):
+    """Allow safe requests to this view to read from the replica database."""
+    view.replica_reads = True
+    return view
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if not state or not state['use_replica'] or state['pinned']:
+            return None
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        return replica_alias()
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            # Read-your-writes: everything after a write in this request goes to the primary
+            state['pinned'] = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _routing.set({'use_replica': False, 'pinned': PIN_COOKIE in request.COOKIES})
+        try:
+            return self.pin(request, self.get_response(request))
+        finally:
+            _routing.reset(token)
+
+    async def __acall__(self, request):
+        token = _routing.set({'use_replica': False, 'pinned': PIN_COOKIE in request.COOKIES})
+        try:
+            return self.pin(request, await self.get_response(request))
+        finally:
+            _routing.reset(token)
+
+    def pin(self, request, response):
+        # Keep this client on the primary until its writes have had time to replicate
+        if _routing.get()['pinned'] and request.method not in SAFE_METHODS:
+            response.set_cookie(PIN_COOKIE, '1', max_age=self.pin_seconds, httponly=True, samesite='Lax')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in SAFE_METHODS and replica_alias() and get_view_attribute(view_func, 'replica_reads'):
+            _routing.get()['use_replica'] = True
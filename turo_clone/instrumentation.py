@@ -0,0 +1,200 @@
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Collectors open in this context. Every connection carries one execute
+# wrapper that counts into them, so a query is counted by whichever requests'
+# context it runs in: sync views that ASGI moves to a thread and DB work handed
+# to turo_clone.async_db copy the context along.
+_active_collectors = contextvars.ContextVar('query_collectors', default=())
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCollector:
+    """Query count and time spent in the database, fed by ``count_queries``."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, elapsed):
+        with self._lock:
+            self.duration += elapsed
+            self.count += 1
+
+
+def count_queries(execute, sql, params, many, context):
+    """``execute_wrapper`` hook feeding the collectors active in the current context."""
+    collectors = _active_collectors.get()
+    if not collectors:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        for collector in collectors:
+            collector.add(elapsed)
+
+
+def install_query_counter(sender=None, connection=None, **kwargs):
+    """``connection_created`` hook putting ``count_queries`` on the connection, once."""
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+@contextmanager
+def collect_queries():
+    collector = QueryCollector()
+    # Connections of this thread that were opened before the signal was hooked up
+    for connection in connections.all():
+        install_query_counter(connection=connection)
+    token = _active_collectors.set(_active_collectors.get() + (collector,))
+    try:
+        yield collector
+    finally:
+        _active_collectors.reset(token)
+
+
+@contextmanager
+def max_queries(budget):
+    """Test helper: fail if the block runs more than ``budget`` queries."""
+    with collect_queries() as collector:
+        yield collector
+    if collector.count > budget:
+        raise QueryBudgetExceeded(f"{collector.count} queries run, budget is {budget}")
+
+
+def query_budget(budget):
+    """Declare the maximum number of queries a view may run per request."""
+    def decorator(view):
+        view.query_budget = budget
+        return view
+    return decorator
+
+
+def set_request_query_budget(request, budget):
+    """Give this one request its own budget, for a view path that does more than the view's declared work."""
+    # DRF's Request proxies reads to the HttpRequest the middleware sees, but not writes
+    getattr(request, '_request', request).query_budget = budget
+
+
+def get_view_attribute(view_func, name, default=None):
+    """Read an attribute set by a view decorator from a function view, a view class or a viewset."""
+    for target in (view_func, getattr(view_func, 'view_class', None), getattr(view_func, 'cls', None)):
+        value = getattr(target, name, None)
+        if value is not None:
+            return value
+    return default
+
+
+def get_query_budget(view_func):
+    return get_view_attribute(view_func, 'query_budget')
+
+
+class ViewStats:
+    """Per-process query and timing totals, keyed by view name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, view_name, queries, db_ms, total_ms):
+        with self._lock:
+            stats = self._stats.setdefault(view_name, {
+                'requests': 0, 'queries': 0, 'max_queries': 0, 'db_ms': 0.0, 'total_ms': 0.0,
+            })
+            stats['requests'] += 1
+            stats['queries'] += queries
+            stats['max_queries'] = max(stats['max_queries'], queries)
+            stats['db_ms'] += db_ms
+            stats['total_ms'] += total_ms
+
+    def snapshot(self):
+        with self._lock:
+            rows = [dict(view=name, **stats) for name, stats in self._stats.items()]
+        for row in rows:
+            row['avg_queries'] = row['queries'] / row['requests']
+            row['avg_db_ms'] = row['db_ms'] / row['requests']
+            row['avg_total_ms'] = row['total_ms'] / row['requests']
+        return sorted(rows, key=lambda row: row['queries'], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+view_stats = ViewStats()
+
+
+def view_name_for(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    return match.view_name or match._func_path
+
+
+def _is_staff(request):
+    # DRF copies the user it authenticated (session or token) onto the Django request
+    user = getattr(request, 'user', None)
+    return bool(user is not None and user.is_staff)
+
+
+class QueryInstrumentationMiddleware:
+    """Counts queries and DB time per request, enforces query budgets and sends staff ``Server-Timing``."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'SERVER_TIMING_ENABLED', False)
+        self.strict = getattr(settings, 'QUERY_BUDGET_STRICT', False)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with collect_queries() as collector:
+            response = self.get_response(request)
+        return self.finish(request, response, collector, start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with collect_queries() as collector:
+            response = await self.get_response(request)
+        return self.finish(request, response, collector, start)
+
+    def finish(self, request, response, collector, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = collector.duration * 1000
+
+        if self.server_timing and _is_staff(request):
+            response['Server-Timing'] = (
+                f'db;dur={db_ms:.1f};desc="{collector.count} queries", app;dur={total_ms:.1f}'
+            )
+
+        view_name = view_name_for(request)
+        if view_name is not None:
+            view_stats.record(view_name, collector.count, db_ms, total_ms)
+            budget = getattr(request, 'query_budget', None) or get_query_budget(request.resolver_match.func)
+            if budget is not None and collector.count > budget:
+                message = f"{view_name} ran {collector.count} queries, budget is {budget}"
+                if self.strict:
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+        return response
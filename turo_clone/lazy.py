@@ -0,0 +1,78 @@
+from asgiref.sync import markcoroutinefunction
+from django.urls import URLResolver
+from django.urls.resolvers import RegexPattern
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+
+class LazyView:
+    """URLconf callback that imports its view module on the first request routed to it.
+
+    ``dotted_path`` names a view function or a class-based view; class views are
+    built with ``as_view(**initkwargs)``. Attributes set by view decorators
+    (``csrf_exempt``, ``query_budget``, ``view_class``...) are read from the
+    resolved view, so middleware sees the same callback it would without laziness.
+    """
+
+    def __init__(self, dotted_path, **initkwargs):
+        self.dotted_path = dotted_path
+        self.initkwargs = initkwargs
+        # ResolverMatch builds _func_path from these without touching the view
+        self.__module__, self.__name__ = dotted_path.rsplit('.', 1)
+        self.__qualname__ = self.__name__
+
+    @cached_property
+    def view(self):
+        target = import_string(self.dotted_path)
+        if hasattr(target, 'as_view'):
+            return target.as_view(**self.initkwargs)
+        return target
+
+    def __call__(self, request, *args, **kwargs):
+        return self.view(request, *args, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.view, name)
+
+    def __repr__(self):
+        return f'<LazyView {self.dotted_path}>'
+
+
+class AsyncLazyView(LazyView):
+    """LazyView for ``async def`` views; Django must see a coroutine function to await it."""
+
+    def __init__(self, dotted_path, **initkwargs):
+        super().__init__(dotted_path, **initkwargs)
+        markcoroutinefunction(self)
+
+    async def __call__(self, request, *args, **kwargs):
+        return await self.view(request, *args, **kwargs)
+
+
+def lazy_view(dotted_path, asynchronous=False, **initkwargs):
+    if asynchronous:
+        return AsyncLazyView(dotted_path, **initkwargs)
+    return LazyView(dotted_path, **initkwargs)
+
+
+class LazyURLResolver(URLResolver):
+    """Resolver of ``lazy_include``. Its pattern only decides whether to look
+    inside; it consumes none of the path, so the included routes carry their
+    full path (``cars/``, not ``/``) and route walkers must not prepend it."""
+
+
+def lazy_include(urlconf_module, prefixes=None):
+    """``include()`` that only imports ``urlconf_module`` when a matching path is resolved.
+
+    With ``prefixes`` the resolver only claims paths starting with one of them,
+    plus the empty path and ``.format`` suffixes of DRF's API root, so other
+    routes never trigger the import even when this entry comes first in
+    ``urlpatterns``.
+    """
+    if prefixes:
+        regex = r'^(?=(?:%s)(?:[/.]|$)|\.|$)' % '|'.join(prefixes)
+    else:
+        regex = r'^'
+    return LazyURLResolver(RegexPattern(regex), urlconf_module)
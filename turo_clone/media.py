@@ -0,0 +1,196 @@
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Hex digests and uuid-style names never get new content under the same name
+_HASHED_NAME = re.compile(r'^[0-9a-f]{8,}(?:-[0-9a-f]+)*$')
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class ContentHashStorage(FileSystemStorage):
+    """Stores uploads under a digest of their content so their URLs can be cached forever."""
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        directory, filename = posixpath.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        name = posixpath.join(directory, digest.hexdigest()[:16] + extension)
+        return super().save(name, content, max_length=max_length)
+
+    def get_available_name(self, name, max_length=None):
+        # Same name means same content: keep it rather than adding a random suffix
+        if is_content_hashed(name):
+            return name
+        return super().get_available_name(name, max_length=max_length)
+
+    def _save(self, name, content):
+        if is_content_hashed(name) and self.exists(name):
+            # Identical upload; reuse the stored copy
+            return name
+        return super()._save(name, content)
+
+
+def is_content_hashed(path):
+    stem = os.path.splitext(os.path.basename(path))[0].lower()
+    return bool(_HASHED_NAME.match(stem))
+
+
+def _etag(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return since is not None and int(mtime) <= since
+
+
+def _parse_range(header, size):
+    """Return (start, end) inclusive, None to serve the whole file, or False if unsatisfiable."""
+    match = _RANGE.match(header.strip())
+    if not match:
+        # Multiple or malformed ranges: ignoring the header and sending 200 is allowed
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+class _FileSlice:
+    """Bytes ``start``..``end`` of a file, as a file object for FileResponse.
+
+    read() stops at the end of the slice. fileno() lets a sendfile-capable
+    wsgi.file_wrapper (gunicorn, which stops at Content-Length) send the
+    slice without copying it through Python.
+    """
+
+    def __init__(self, path, start, end):
+        self._file = open(path, 'rb')
+        self._file.seek(start)
+        self._remaining = end - start + 1
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b''
+        size = self._remaining if size is None or size < 0 else min(size, self._remaining)
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def close(self):
+        self._file.close()
+
+
+def _content_type(full_path):
+    content_type, encoding = mimetypes.guess_type(full_path)
+    return content_type or 'application/octet-stream', encoding
+
+
+def _offloaded_response(path, full_path):
+    mode = getattr(settings, 'MEDIA_SERVE_MODE', 'django')
+    if mode == 'x-accel':
+        # nginx serves the bytes (and Range requests) from an internal location
+        response = HttpResponse(content_type=_content_type(full_path)[0])
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + quote(path)
+    elif mode == 'x-sendfile':
+        response = HttpResponse(content_type=_content_type(full_path)[0])
+        response['X-Sendfile'] = full_path
+    else:
+        return None
+    return response
+
+
+def _file_response(request, full_path, stat, etag):
+    content_type, encoding = _content_type(full_path)
+    size = stat.st_size
+
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if range_header:
+        if_range = request.META.get('HTTP_IF_RANGE', '').strip()
+        if not if_range or if_range == etag or parse_http_date_safe(if_range) == int(stat.st_mtime):
+            byte_range = _parse_range(range_header, size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        # FileResponse hands the open file to the server's wsgi.file_wrapper (sendfile where available)
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        response['Content-Length'] = str(size)
+    else:
+        start, end = byte_range
+        response = FileResponse(_FileSlice(full_path, start, end), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Media file not found")
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404("Media file not found")
+    if not os.path.isfile(full_path):
+        raise Http404("Media file not found")
+
+    etag = _etag(stat)
+    if is_content_hashed(path):
+        cache_control = IMMUTABLE_CACHE_CONTROL
+    else:
+        cache_control = f"public, max-age={getattr(settings, 'MEDIA_CACHE_MAX_AGE', 3600)}"
+
+    if _not_modified(request, etag, stat.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        response = _offloaded_response(path, full_path) or _file_response(request, full_path, stat, etag)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = cache_control
+    return response
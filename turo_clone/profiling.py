@@ -0,0 +1,171 @@
+import cProfile
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+
+from turo_clone.instrumentation import view_name_for
+
+logger = logging.getLogger(__name__)
+
+SIGNING_SALT = 'turo_clone.profiling'
+_UNSAFE_FILENAME = re.compile(r'[^\w.-]')
+_write_lock = threading.Lock()
+
+
+def make_profile_token():
+    """Value for the profiling header; valid for PROFILING_TOKEN_MAX_AGE seconds."""
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign('profile')
+
+
+def has_valid_token(value, max_age):
+    try:
+        return signing.TimestampSigner(salt=SIGNING_SALT).unsign(value, max_age=max_age) == 'profile'
+    except signing.BadSignature:
+        return False
+
+
+def _frame_label(code):
+    # ';' separates frames in the collapsed format
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ':')
+
+
+class StackSampler:
+    """Samples one thread's Python stack every ``interval`` seconds from a background thread."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiling-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                self.stacks[';'.join(reversed(labels))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def _output_path(directory, view_name, suffix):
+    return os.path.join(directory, _UNSAFE_FILENAME.sub('_', view_name) + suffix)
+
+
+def write_collapsed(directory, view_name, stacks):
+    """Append stacks in Brendan Gregg's collapsed format (flamegraph.pl, speedscope, inferno)."""
+    os.makedirs(directory, exist_ok=True)
+    lines = ''.join(f'{stack} {count}\n' for stack, count in stacks.items())
+    with _write_lock:
+        with open(_output_path(directory, view_name, '.folded'), 'a') as fh:
+            fh.write(lines)
+
+
+def write_cprofile(directory, view_name, profiler):
+    """One pstats file per request; render with flameprof, snakeviz or gprof2dot."""
+    view_directory = os.path.join(directory, _UNSAFE_FILENAME.sub('_', view_name))
+    os.makedirs(view_directory, exist_ok=True)
+    profiler.dump_stats(os.path.join(view_directory, f'{time.time_ns()}-{threading.get_ident()}.prof'))
+
+
+class SamplingProfilerMiddleware:
+    """Profiles a random sample of requests, plus any request carrying a signed profiling header.
+
+    Disabled unless PROFILING_ENABLED is set, in which case Django drops the
+    middleware at startup and requests pay nothing.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.mode = getattr(settings, 'PROFILING_MODE', 'sampler')
+        if self.mode not in ['sampler', 'cprofile']:
+            raise ValueError(f"PROFILING_MODE must be 'sampler' or 'cprofile', not {self.mode!r}")
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+        self.interval = getattr(settings, 'PROFILING_INTERVAL', 0.005)
+        self.directory = str(getattr(settings, 'PROFILING_DIR', 'profiles'))
+        self.header = 'HTTP_' + getattr(settings, 'PROFILING_HEADER', 'X-Profile').upper().replace('-', '_')
+        self.token_max_age = getattr(settings, 'PROFILING_TOKEN_MAX_AGE', 3600)
+
+    def should_profile(self, request):
+        token = request.META.get(self.header)
+        if token:
+            return has_valid_token(token, self.token_max_age)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profiler = self.start(request)
+        try:
+            return self.get_response(request)
+        finally:
+            self.stop(request, profiler)
+
+    async def __acall__(self, request):
+        # Under ASGI the sampler watches the event loop thread and cProfile sees
+        # every task interleaved with this one; treat those profiles as approximate
+        profiler = self.start(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            self.stop(request, profiler)
+
+    def start(self, request):
+        if not self.should_profile(request):
+            return None
+        if self.mode == 'cprofile':
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler already owns this interpreter (3.12+ allows only one)
+                return None
+            return profiler
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        return sampler
+
+    def stop(self, request, profiler):
+        if profiler is None:
+            return
+        if isinstance(profiler, StackSampler):
+            profiler.stop()
+        else:
+            profiler.disable()
+        view_name = view_name_for(request)
+        if not view_name:
+            return
+        try:
+            if isinstance(profiler, StackSampler):
+                if profiler.stacks:
+                    write_collapsed(self.directory, view_name, profiler.stacks)
+            else:
+                write_cprofile(self.directory, view_name, profiler)
+        except OSError:
+            logger.exception("Could not write profile for %s", view_name)
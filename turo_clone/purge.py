@@ -0,0 +1,73 @@
+from collections import Counter
+
+from django.db import models, transaction
+
+
+def _file_names(model, queryset):
+    """{field: names} of the stored files referenced by the rows about to be deleted."""
+    files = {}
+    for field in model._meta.concrete_fields:
+        if isinstance(field, models.FileField):
+            names = set(queryset.exclude(**{field.attname: ''}).values_list(field.attname, flat=True))
+            names.discard(None)
+            if names:
+                files[field] = names
+    return files
+
+
+def _delete_files(model, files):
+    for field, names in files.items():
+        # Files can be shared between rows (seed data, copied listings); keep those still in use
+        in_use = set(
+            model._base_manager.filter(**{f'{field.attname}__in': names})
+            .values_list(field.attname, flat=True)
+        )
+        for name in names - in_use:
+            field.storage.delete(name)
+
+
+def purge(queryset, batch_size=500, on_batch=None):
+    """Delete ``queryset`` and everything that cascades from it, in bounded batches.
+
+    Children are deleted before their parents, a batch of ids per
+    transaction, so no step loads more than ``batch_size`` rows of one table
+    (unlike Model.delete(), which collects the whole tree in memory first).
+    Files of deleted FileFields are removed once their rows are gone.
+    ``on_batch(counts)`` is called after every batch with the running
+    {"app_label.model": deleted} totals. Returns those totals.
+    """
+    counts = Counter()
+    _purge(queryset, batch_size, counts, on_batch, seen={queryset.model})
+    return dict(counts)
+
+
+def _purge(queryset, batch_size, counts, on_batch, seen):
+    model = queryset.model
+    # include_hidden also finds relations declared with related_name='+'
+    relations = [
+        field for field in model._meta.get_fields(include_hidden=True)
+        if field.auto_created and not field.concrete and (field.one_to_many or field.one_to_one)
+    ]
+    for relation in relations:
+        if relation.on_delete is not models.CASCADE:
+            # Join rows and SET_NULL/PROTECT relations are left to the batch delete below
+            continue
+        child = relation.related_model
+        if child in seen:
+            continue
+        children = child._base_manager.filter(**{f'{relation.field.name}__in': queryset.values('pk')})
+        _purge(children, batch_size, counts, on_batch, seen | {child})
+
+    label = model._meta.label_lower
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            break
+        batch = model._base_manager.filter(pk__in=ids)
+        with transaction.atomic(using=batch.db):
+            files = _file_names(model, batch)
+            batch.delete()
+            transaction.on_commit(lambda files=files: _delete_files(model, files), using=batch.db)
+        counts[label] += len(ids)
+        if on_batch:
+            on_batch(dict(counts))
@@ -0,0 +1,54 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # Optional: without it these are DRF's own JSON classes
+    orjson = None
+
+if orjson is not None:
+    # Non-str keys: DRF's encoder turns int dict keys into strings too
+    OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+else:
+    OPTIONS = 0
+
+
+class FastJSONRenderer(JSONRenderer):
+    """DRF's JSONRenderer with the encoding done by orjson.
+
+    orjson writes datetimes, dates, times and UUIDs itself; anything else
+    (Decimal, lazy strings, querysets, numpy values) goes through DRF's
+    encoder as ``default``, so responses match JSONRenderer's.
+
+    One deliberate difference: NaN and infinities are written as ``null``
+    where the strict JSONRenderer raises. Finding them first would mean
+    walking every response in Python, and the only float columns (car
+    coordinates, similarity scores) are better shown empty than as a 500.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            # Indented output is for humans; leave it to the stock renderer
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=OPTIONS)
+        # Valid JSON but not valid JavaScript; JSONRenderer escapes them as well
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser decoding with orjson when the body is UTF-8."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
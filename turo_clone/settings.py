@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 
 from pathlib import Path
 import os  # Make sure this line is uncommented
+
+from django.core.exceptions import ImproperlyConfigured
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -22,10 +24,24 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = 'django-insecure-!2l-r(+ar36)fg5mf)&n8l+$oq*(%1!ay+ckewnth6l280b^4f'
 
+# Settings profile: 'development' (default) or 'production'. Production drops
+# the dev-only apps and renderers listed below and requires ALLOWED_HOSTS.
+DJANGO_ENV = os.environ.get('DJANGO_ENV', 'development')
+
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = DJANGO_ENV != 'production'
 
-ALLOWED_HOSTS = []
+# Comma-separated, e.g. "airdrive.example.com,api.airdrive.example.com"
+ALLOWED_HOSTS = [host.strip() for host in os.environ.get('ALLOWED_HOSTS', '').split(',') if host.strip()]
+if not ALLOWED_HOSTS:
+    if DJANGO_ENV == 'production':
+        # With DEBUG off, requests to hosts not listed here are answered with 400
+        raise ImproperlyConfigured("Set ALLOWED_HOSTS when DJANGO_ENV is 'production'.")
+    ALLOWED_HOSTS = [
+        'localhost',
+        '127.0.0.1',
+        'brainnn.pythonanywhere.com',
+    ]
 
 
 # Application definition
@@ -50,11 +66,15 @@ INSTALLED_APPS = [
     'bookings',
     'api',
     "support",
+    'jobs',
     'channels',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'turo_clone.profiling.SamplingProfilerMiddleware',
+    'turo_clone.instrumentation.QueryInstrumentationMiddleware',
+    'turo_clone.db_routers.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,6 +84,10 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+DEV_ONLY_APPS = ['django_extensions']
+if DJANGO_ENV == 'production':
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in DEV_ONLY_APPS]
+
 # Custom user model
 AUTH_USER_MODEL = 'users.User'
 
@@ -76,7 +100,39 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson-backed drop-ins for JSONRenderer/JSONParser (stock behaviour without orjson);
+    # compare with `manage.py benchmark_renderers`
+    'DEFAULT_RENDERER_CLASSES': [
+        'turo_clone.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'turo_clone.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
+if DJANGO_ENV == 'production':
+    # The browsable API pulls in templates and forms on every HTML request
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = ['turo_clone.renderers.FastJSONRenderer']
+
+# SQL instrumentation: Server-Timing header on staff responses (opt-in, it
+# tells clients how much database work a request took), and strict query
+# budgets (raise instead of log) for CI runs
+SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'false').lower() == 'true'
+QUERY_BUDGET_STRICT = os.environ.get('QUERY_BUDGET_STRICT', 'false').lower() == 'true'
+
+# Live-traffic profiling (off unless PROFILING_ENABLED=true). Profiles a random
+# PROFILING_SAMPLE_RATE of requests plus any request whose X-Profile header holds
+# a token from `manage.py profiling_token`. 'sampler' appends collapsed stacks
+# to PROFILING_DIR/<view>.folded; 'cprofile' writes PROFILING_DIR/<view>/*.prof.
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'
+PROFILING_MODE = os.environ.get('PROFILING_MODE', 'sampler')
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_INTERVAL = 0.005
+PROFILING_DIR = os.environ.get('PROFILING_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILING_HEADER = 'X-Profile'
+PROFILING_TOKEN_MAX_AGE = 3600
 
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True  # For development only
@@ -84,6 +140,42 @@ CORS_ALLOW_ALL_ORIGINS = True  # For development only
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# New uploads are named by content digest so they can be cached as immutable
+DEFAULT_FILE_STORAGE = 'turo_clone.media.ContentHashStorage'
+# 'django' streams files from the worker; 'x-accel' (nginx) and 'x-sendfile'
+# (Apache/lighttpd) only return headers and let the proxy send the bytes.
+MEDIA_SERVE_MODE = os.environ.get('MEDIA_SERVE_MODE', 'django')
+MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', '/protected-media/')
+MEDIA_CACHE_MAX_AGE = 3600
+
+# Cache for computed data such as car calendars. The default local-memory cache
+# is per process, so invalidations only reach the worker that made the change;
+# multi-worker deployments should point CACHE_BACKEND at a shared cache, e.g.
+# django.core.cache.backends.memcached.PyMemcacheCache with CACHE_LOCATION.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+# Safety-net expiry for cached car-month calendars (they are also invalidated on change)
+CAR_CALENDAR_CACHE_SECONDS = 3600
+# Facet counts are also expired whenever a car is saved or deleted
+CAR_FACETS_CACHE_SECONDS = 300
+# Each worker's in-memory make/model/location autocomplete index is updated by
+# its own car signals and fully rebuilt in the background at this age
+AUTOCOMPLETE_REBUILD_SECONDS = 300
+
+# Closed bookings and replies on closed tickets older than this are moved to
+# the archive tables by `manage.py archive_records` (run nightly)
+ARCHIVE_AFTER_DAYS = 365
+
+# Months of per-day prices precompiled for each car (cars.pricing) by
+# `manage.py compile_price_calendars` (run nightly) and after pricing rule
+# changes. Public quotes must fall inside the window and last at most
+# QUOTE_MAX_DAYS; cars without a current calendar are priced in memory.
+PRICE_CALENDAR_MONTHS = 12
+QUOTE_MAX_DAYS = 90
 
 # Email settings
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -114,7 +206,21 @@ TEMPLATES = [
     },
 ]
 
+# Background jobs (jobs app, `manage.py run_jobs`): concurrency per queue,
+# polling interval and retry backoff in seconds (doubles per attempt, capped).
+JOBS_QUEUES = {'default': 4, 'images': 2, 'email': 2}
+JOBS_POLL_INTERVAL = 1.0
+JOBS_RETRY_BACKOFF = 10
+JOBS_RETRY_BACKOFF_MAX = 3600
+# Running jobs locked longer than this are assumed orphaned and requeued
+JOBS_LOCK_TIMEOUT = 600
+
 WSGI_APPLICATION = 'turo_clone.wsgi.application'
+ASGI_APPLICATION = 'turo_clone.asgi.application'
+
+# Threads that run the ORM work of async views (cars.async_views); this bounds
+# how many DB connections a single ASGI worker opens for them.
+ASYNC_DB_POOL_SIZE = int(os.environ.get('ASYNC_DB_POOL_SIZE', '8'))
 
 
 # Database
@@ -126,6 +232,46 @@ DATABASES = {
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
+# e.g. DATABASE_ENGINE=django.db.backends.postgresql to run the query-plan tests against PostgreSQL
+if os.environ.get('DATABASE_ENGINE'):
+    DATABASES['default'] = {
+        'ENGINE': os.environ['DATABASE_ENGINE'],
+        'NAME': os.environ.get('DATABASE_NAME', 'turo_clone'),
+        'HOST': os.environ.get('DATABASE_HOST', ''),
+        'PORT': os.environ.get('DATABASE_PORT', ''),
+        'USER': os.environ.get('DATABASE_USER', ''),
+        'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+    }
+
+# SQLite deployment profile for small single-node regions: SQLITE_PROFILE=tuned
+# switches to WAL with the pragmas in turo_clone.sqlite, applied on connect.
+SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'default')
+SQLITE_PRAGMAS = {}
+SQLITE_LOCK_RETRIES = 5
+SQLITE_LOCK_BACKOFF = 0.05
+if SQLITE_PROFILE == 'tuned':
+    from turo_clone.sqlite import TUNED_PRAGMAS
+    SQLITE_PRAGMAS = TUNED_PRAGMAS
+    # Seconds the driver waits on a lock before raising "database is locked"
+    DATABASES['default']['OPTIONS'] = {'timeout': 20}
+
+# Optional read replica for heavy read endpoints (views marked with @replica_reads).
+# Locally this can be a second SQLite file: DATABASE_REPLICA_NAME=replica.sqlite3
+REPLICA_DATABASE_ALIAS = 'replica'
+REPLICA_PIN_SECONDS = 5
+if os.environ.get('DATABASE_REPLICA_NAME'):
+    DATABASES[REPLICA_DATABASE_ALIAS] = {
+        'ENGINE': os.environ.get('DATABASE_REPLICA_ENGINE', DATABASES['default']['ENGINE']),
+        'NAME': os.environ['DATABASE_REPLICA_NAME'],
+        'HOST': os.environ.get('DATABASE_REPLICA_HOST', ''),
+        'PORT': os.environ.get('DATABASE_REPLICA_PORT', ''),
+        'USER': os.environ.get('DATABASE_REPLICA_USER', ''),
+        'PASSWORD': os.environ.get('DATABASE_REPLICA_PASSWORD', ''),
+        # Test runs point the alias at the test database instead of creating an empty one
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['turo_clone.db_routers.ReplicaRouter']
 
 
 # Password validation
@@ -170,11 +316,6 @@ STATIC_URL = '/static/'
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
-ALLOWED_HOSTS = [
-    'localhost',
-    '127.0.0.1',
-    'brainnn.pythonanywhere.com',  # Add this line
-]
 
 CHANNEL_LAYERS = {
     "default": {
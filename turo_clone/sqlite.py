@@ -0,0 +1,67 @@
+import functools
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Single-node profile: readers never block on the writer in WAL mode, and
+# synchronous=NORMAL is durable across application crashes (only an OS crash
+# can lose the last commits).
+TUNED_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64000,  # negative means KiB, so 64 MB
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """``connection_created`` hook applying ``SQLITE_PRAGMAS`` to every new SQLite connection."""
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_locked_error(exc):
+    return 'database is locked' in str(exc) or 'database table is locked' in str(exc)
+
+
+def retry_atomic(func=None, *, using='default', retries=None, backoff=None):
+    """Run ``func`` in ``transaction.atomic()`` and retry it when SQLite reports ``database is locked``.
+
+    A locked error rolls the whole block back, so a retry never repeats work
+    that was already committed. Keep side effects that cannot be rolled back
+    (emails, cache writes) out of ``func`` or behind ``transaction.on_commit``.
+    Inside an outer transaction only the outermost block can be retried, so
+    ``func`` then runs once in a savepoint.
+    """
+    if func is None:
+        return functools.partial(retry_atomic, using=using, retries=retries, backoff=backoff)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if connections[using].in_atomic_block:
+            with transaction.atomic(using=using):
+                return func(*args, **kwargs)
+        attempts = retries if retries is not None else getattr(settings, 'SQLITE_LOCK_RETRIES', 5)
+        delay = backoff if backoff is not None else getattr(settings, 'SQLITE_LOCK_BACKOFF', 0.05)
+        for attempt in range(attempts + 1):
+            try:
+                with transaction.atomic(using=using):
+                    return func(*args, **kwargs)
+            except OperationalError as exc:
+                if not is_locked_error(exc) or attempt == attempts:
+                    raise
+                sleep = delay * (2 ** attempt) * (1 + random.random())
+                logger.warning("Database locked, retrying %s in %.3fs", func.__qualname__, sleep)
+                time.sleep(sleep)
+    return wrapper
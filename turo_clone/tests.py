@@ -0,0 +1,438 @@
+import asyncio
+import importlib
+import io
+import json
+import os
+import runpy
+import time
+import uuid
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.base import ContentFile
+from django.db import OperationalError, transaction
+from django.http import JsonResponse
+from django.test import AsyncClient
+from django.urls import path
+from django.utils.translation import gettext_lazy
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from cars import autocomplete
+from cars.deletion import soft_delete_car
+from cars.factories import CarFactory, CarImageFactory
+from cars.models import Car, CarImage
+from jobs.models import Job
+from jobs.queue import claim, execute
+from turo_clone import db_routers
+from turo_clone.db_routers import PIN_COOKIE, ReplicaRouter, replica_reads
+from turo_clone.instrumentation import collect_queries, view_stats
+from turo_clone.media import ContentHashStorage, is_content_hashed
+from turo_clone.profiling import SamplingProfilerMiddleware, make_profile_token
+from turo_clone.purge import purge
+from turo_clone.renderers import FastJSONParser, FastJSONRenderer
+from turo_clone.sqlite import retry_atomic
+from users.factories import UserFactory
+from users.models import User
+
+router = ReplicaRouter()
+
+
+def _read_alias(model=Car):
+    return {'read': router.db_for_read(model) or 'default'}
+
+
+@replica_reads
+def replica_view(request):
+    data = _read_alias()
+    if request.GET.get('write'):
+        router.db_for_write(Car)
+        data['after_write'] = _read_alias()['read']
+    data['token'] = _read_alias(Token)['read']
+    return JsonResponse(data)
+
+
+def primary_view(request):
+    return JsonResponse(_read_alias())
+
+
+def two_queries_view(request):
+    User.objects.count()
+    User.objects.exists()
+    return JsonResponse({})
+
+
+def slow_view(request):
+    # Long enough for the stack sampler to see it
+    time.sleep(0.05)
+    return JsonResponse({})
+
+
+urlpatterns = [
+    path('replica/', replica_view),
+    path('primary/', primary_view),
+    path('two-queries/', two_queries_view, name='two-queries'),
+    path('slow/', slow_view, name='slow'),
+]
+
+
+@pytest.fixture
+def replica(monkeypatch, settings):
+    settings.ROOT_URLCONF = __name__
+    monkeypatch.setattr(db_routers, 'replica_alias', lambda: 'replica')
+
+
+def test_marked_view_reads_from_replica(replica, client):
+    assert client.get('/replica/').json()['read'] == 'replica'
+
+
+def test_unmarked_view_reads_from_primary(replica, client):
+    assert client.get('/primary/').json()['read'] == 'default'
+
+
+def test_unsafe_methods_read_from_primary(replica, client):
+    assert client.post('/replica/').json()['read'] == 'default'
+
+
+def test_primary_only_apps_never_use_replica(replica, client):
+    assert client.get('/replica/').json()['token'] == 'default'
+
+
+def test_write_pins_rest_of_request_to_primary(replica, client):
+    data = client.get('/replica/?write=1').json()
+    assert data['read'] == 'replica'
+    assert data['after_write'] == 'default'
+
+
+def test_write_pins_client_with_cookie(replica, client):
+    response = client.post('/replica/?write=1')
+    assert response.cookies[PIN_COOKIE].value == '1'
+    # The pinned client keeps reading from the primary
+    assert client.get('/replica/').json()['read'] == 'default'
+    client.cookies.pop(PIN_COOKIE)
+    assert client.get('/replica/').json()['read'] == 'replica'
+
+
+def test_reads_outside_requests_use_default(replica):
+    assert router.db_for_read(Car) is None
+
+
+def test_no_replica_configured_falls_back_to_default(client, settings):
+    settings.ROOT_URLCONF = __name__
+    assert db_routers.replica_alias() is None
+    assert client.get('/replica/').json()['read'] == 'default'
+    response = client.post('/replica/?write=1')
+    assert response.status_code == 200
+
+
+def test_replica_alias_mirrors_default_in_tests(monkeypatch):
+    monkeypatch.setenv('DATABASE_REPLICA_NAME', 'replica.sqlite3')
+    module = runpy.run_path(os.path.join(os.path.dirname(__file__), 'settings.py'))
+    assert module['DATABASES']['replica']['TEST'] == {'MIRROR': 'default'}
+
+
+def _locked_once(calls, username):
+    @retry_atomic(backoff=0)
+    def work():
+        UserFactory(username=username)
+        calls.append(1)
+        if len(calls) == 1:
+            raise OperationalError('database is locked')
+    return work
+
+
+@pytest.mark.django_db(transaction=True)
+def test_retry_atomic_rolls_back_before_retrying():
+    calls = []
+    _locked_once(calls, 'retried')()
+    assert len(calls) == 2
+    # The first attempt's insert was rolled back, not committed twice
+    assert User.objects.filter(username='retried').count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_retry_atomic_does_not_retry_inside_outer_transaction():
+    calls = []
+    with pytest.raises(OperationalError):
+        with transaction.atomic():
+            _locked_once(calls, 'inner')()
+    assert len(calls) == 1
+    assert not User.objects.filter(username='inner').exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_retry_atomic_reraises_other_errors():
+    calls = []
+
+    @retry_atomic(backoff=0)
+    def work():
+        calls.append(1)
+        raise OperationalError('no such table: nope')
+
+    with pytest.raises(OperationalError):
+        work()
+    assert len(calls) == 1
+
+
+def test_identical_uploads_share_one_hashed_file(tmp_path):
+    storage = ContentHashStorage(location=str(tmp_path))
+    first = storage.save('car_images/front.JPG', ContentFile(b'same bytes'))
+    second = storage.save('car_images/back.jpg', ContentFile(b'same bytes'))
+    other = storage.save('car_images/side.jpg', ContentFile(b'other bytes'))
+    assert first == second
+    assert is_content_hashed(first)
+    assert other != first
+    stored = sorted(p.name for p in (tmp_path / 'car_images').iterdir())
+    assert stored == sorted([os.path.basename(first), os.path.basename(other)])
+
+
+@pytest.fixture
+def media_file(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.MEDIA_SERVE_MODE = 'django'
+    (tmp_path / '0123456789abcdef.txt').write_bytes(bytes(range(100)))
+    return '/media/0123456789abcdef.txt'
+
+
+def test_media_range_is_served_as_a_file_slice(client, media_file):
+    response = client.get(media_file, HTTP_RANGE='bytes=10-19')
+    assert response.status_code == 206
+    assert response['Content-Range'] == 'bytes 10-19/100'
+    assert response['Content-Length'] == '10'
+    assert b''.join(response.streaming_content) == bytes(range(10, 20))
+
+
+def test_media_suffix_range_and_full_file(client, media_file):
+    response = client.get(media_file, HTTP_RANGE='bytes=-5')
+    assert b''.join(response.streaming_content) == bytes(range(95, 100))
+    response = client.get(media_file)
+    assert response.status_code == 200
+    assert response['Cache-Control'] == 'public, max-age=31536000, immutable'
+    assert b''.join(response.streaming_content) == bytes(range(100))
+
+
+def test_media_unsatisfiable_range(client, media_file):
+    response = client.get(media_file, HTTP_RANGE='bytes=200-')
+    assert response.status_code == 416
+    assert response['Content-Range'] == 'bytes */100'
+
+
+@pytest.fixture
+def server_timing(settings):
+    settings.SERVER_TIMING_ENABLED = True
+
+
+def test_server_timing_is_off_by_default(db, client):
+    client.force_login(UserFactory(is_staff=True))
+    assert 'Server-Timing' not in client.get('/api/profile/')
+
+
+def test_server_timing_is_sent_to_staff_only(db, server_timing, client):
+    client.force_login(UserFactory())
+    assert 'Server-Timing' not in client.get('/api/profile/')
+    client.force_login(UserFactory(is_staff=True))
+    assert 'queries' in client.get('/api/profile/')['Server-Timing']
+
+
+def test_sync_view_queries_are_counted_under_asgi(db, settings):
+    settings.ROOT_URLCONF = __name__
+    view_stats.reset()
+    async def fetch():
+        # The sync view runs on another thread than the middleware's coroutine
+        return await AsyncClient().get('/two-queries/')
+    response = async_to_sync(fetch)()
+    assert response.status_code == 200
+    stats = {row['view']: row for row in view_stats.snapshot()}
+    assert stats['two-queries']['queries'] == 2
+
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    settings.ROOT_URLCONF = __name__
+    settings.PROFILING_DIR = str(tmp_path)
+    settings.PROFILING_SAMPLE_RATE = 0.0
+    return tmp_path
+
+
+def _profiles(directory):
+    return sorted(str(path.relative_to(directory)) for path in directory.rglob('*') if path.is_file())
+
+
+def test_profiling_is_off_by_default(db, client, profiling):
+    with pytest.raises(MiddlewareNotUsed):
+        SamplingProfilerMiddleware(lambda request: None)
+    # Not even a signed header turns it on
+    assert client.get('/two-queries/', HTTP_X_PROFILE=make_profile_token()).status_code == 200
+    assert _profiles(profiling) == []
+
+
+def test_profiling_needs_a_signed_header_when_not_sampling(db, client, profiling, settings):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_MODE = 'cprofile'
+    client.get('/two-queries/')
+    client.get('/two-queries/', HTTP_X_PROFILE='profile')
+    assert _profiles(profiling) == []
+
+    assert client.get('/two-queries/', HTTP_X_PROFILE=make_profile_token()).status_code == 200
+    [profile] = _profiles(profiling)
+    assert profile.startswith('two-queries/') and profile.endswith('.prof')
+
+
+def test_sampled_requests_write_collapsed_stacks(db, client, profiling, settings):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_SAMPLE_RATE = 1.0
+    settings.PROFILING_INTERVAL = 0.001
+    assert client.get('/slow/').status_code == 200
+    assert _profiles(profiling) == ['slow.folded']
+    lines = (profiling / 'slow.folded').read_text().splitlines()
+    assert any('slow_view' in line for line in lines)
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+
+
+
+@pytest.fixture
+def asgi_app(monkeypatch):
+    # Importing the module warms the autocomplete index and closes the connection
+    monkeypatch.setattr(autocomplete.index, 'warm', lambda: None)
+    return importlib.import_module('turo_clone.asgi').application
+
+
+def _asgi_get(application, path):
+    async def fetch():
+        communicator = ApplicationCommunicator(application, {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+            'headers': [(b'host', b'testserver')], 'client': ('127.0.0.1', 1234), 'server': ('testserver', 80),
+        })
+        await communicator.send_input({'type': 'http.request', 'body': b'', 'more_body': False})
+        start = await communicator.receive_output(5)
+        body = await communicator.receive_output(5)
+        await communicator.wait(5)
+        return start['status'], body['body']
+    return async_to_sync(fetch)()
+
+
+# The async views query from their own thread pool, which only sees committed rows
+@pytest.mark.django_db(transaction=True)
+def test_async_car_detail_over_the_asgi_app(asgi_app):
+    car = CarFactory(status='available')
+    CarImageFactory(car=car, is_primary=True)
+    status, body = _asgi_get(asgi_app, f'/api/async/cars/{car.id}/')
+    assert status == 200
+    data = json.loads(body)
+    assert (data['id'], data['make'], data['model']) == (car.id, car.make, car.model)
+    assert len(data['images']) == 1
+
+    car.status = 'maintenance'
+    car.save()
+    assert _asgi_get(asgi_app, f'/api/async/cars/{car.id}/')[0] == 404
+
+
+def _run_queries(n):
+    for _ in range(n):
+        User.objects.exists()
+
+
+async def _request(n):
+    with collect_queries() as collector:
+        for _ in range(n):
+            await sync_to_async(_run_queries)(1)
+            await asyncio.sleep(0)
+    return collector.count
+
+
+def test_interleaved_collectors_count_their_own_queries(db):
+    async def both():
+        return await asyncio.gather(_request(1), _request(3))
+    assert async_to_sync(both)() == [1, 3]
+
+
+@pytest.fixture
+def shared_image_cars(db, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    storage = ContentHashStorage(location=str(tmp_path))
+    shared = storage.save('car_images/front.jpg', ContentFile(b'same bytes'))
+    own = storage.save('car_images/side.jpg', ContentFile(b'only the first car'))
+    first, second = CarFactory.create_batch(2)
+    CarImageFactory(car=first, image=shared)
+    CarImageFactory(car=first, image=own)
+    CarImageFactory(car=second, image=shared)
+    return first, second, tmp_path / shared, tmp_path / own
+
+
+def test_purge_keeps_files_other_rows_still_use(shared_image_cars, django_capture_on_commit_callbacks):
+    first, second, shared, own = shared_image_cars
+    with django_capture_on_commit_callbacks(execute=True):
+        counts = purge(Car.all_objects.filter(id=first.id), batch_size=1)
+    assert counts['cars.carimage'] == 2
+    assert counts['cars.car'] == 1
+    assert not own.exists()
+    assert shared.exists()
+    assert list(CarImage.objects.values_list('car_id', flat=True)) == [second.id]
+
+
+def test_soft_deleted_car_is_purged_once(shared_image_cars, django_capture_on_commit_callbacks):
+    first, _, shared, own = shared_image_cars
+    assert soft_delete_car(first.id) is not None
+    # Already deleted: nothing changes and no second purge is queued
+    assert soft_delete_car(first.id) is None
+    assert Job.objects.count() == 1
+
+    ids, lock_token = claim('default', 'worker', 10)
+    with django_capture_on_commit_callbacks(execute=True):
+        assert execute(ids[0], 'worker', lock_token) is True
+    assert not Car.all_objects.filter(id=first.id).exists()
+    assert not own.exists()
+    assert shared.exists()
+
+
+@pytest.fixture
+def render_data():
+    return {
+        'price': Decimal('12.50'),
+        'at': datetime(2026, 10, 19, 8, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        'day': date(2026, 10, 19),
+        'label': gettext_lazy('Available'),
+        'counts': {5: 3, 7: 1},
+        'nested': [{'id': uuid.UUID(int=1)}, None, True, 1.5],
+    }
+
+
+def test_fast_renderer_matches_drf_renderer(render_data):
+    fast = FastJSONRenderer().render(render_data)
+    stock = JSONRenderer().render(render_data)
+    assert json.loads(fast) == json.loads(stock)
+    assert json.loads(fast) == {
+        'price': 12.5, 'at': '2026-10-19T08:30:15.123456Z', 'day': '2026-10-19',
+        'label': 'Available', 'counts': {'5': 3, '7': 1},
+        'nested': [{'id': '00000000-0000-0000-0000-000000000001'}, None, True, 1.5],
+    }
+
+
+def test_fast_parser_reads_what_the_renderer_wrote(render_data):
+    body = FastJSONRenderer().render(render_data)
+    parsed = FastJSONParser().parse(io.BytesIO(body), parser_context={'encoding': 'utf-8'})
+    assert parsed == JSONParser().parse(io.BytesIO(body), parser_context={'encoding': 'utf-8'})
+    assert parsed['counts'] == {'5': 3, '7': 1}
+    with pytest.raises(ParseError):
+        FastJSONParser().parse(io.BytesIO(b'{"price": '), parser_context={'encoding': 'utf-8'})
+
+
+def test_fast_renderer_writes_non_finite_floats_as_null():
+    # Documented difference: the strict stock renderer refuses these
+    with pytest.raises(ValueError):
+        JSONRenderer().render({'score': float('nan')})
+    assert json.loads(FastJSONRenderer().render({'score': float('nan'), 'far': float('inf')})) == {
+        'score': None, 'far': None,
+    }
+
+
+def test_fast_renderer_escapes_line_separators():
+    assert FastJSONRenderer().render({'text': 'a\u2028b\u2029c'}) == b'{"text":"a\\u2028b\\u2029c"}'
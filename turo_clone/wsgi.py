@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'turo_clone.settings')
 
 application = get_wsgi_application()
+
+# Build the in-memory autocomplete index before the first request needs it
+from cars.autocomplete import index  # noqa: E402
+index.warm()
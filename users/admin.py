@@ -1,12 +1,28 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User
+from .models import User, PointsLedgerEntry
 
 class CustomUserAdmin(UserAdmin):
     list_display = ('username', 'email', 'first_name', 'last_name', 'user_type', 'is_verified', 'is_suspended')
     list_filter = ('user_type', 'is_verified', 'is_suspended', 'is_staff')
     fieldsets = UserAdmin.fieldsets + (
         ('Additional Info', {'fields': ('user_type', 'phone_number', 'profile_picture', 'address', 'is_verified', 'is_suspended')}),
+        ('Points', {'fields': ('points',)}),
     )
+    # Balance changes go through users.points so the ledger stays complete
+    readonly_fields = ('points',)
 
 admin.site.register(User, CustomUserAdmin)
+
+
+@admin.register(PointsLedgerEntry)
+class PointsLedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'amount', 'reason', 'reference', 'created_at')
+    list_filter = ('reason',)
+    search_fields = ('user__username', 'reference')
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
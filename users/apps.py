@@ -1,6 +1,33 @@
 from django.apps import AppConfig
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db.models.signals import post_migrate
+
+
+def _install_search_index(using, **kwargs):
+    from django.db import connections
+    from users.search import install_search_index
+    install_search_index(connections[using])
+
+
+def _record_session(sender, request, user, **kwargs):
+    from users.models import UserSession
+    session_key = getattr(getattr(request, 'session', None), 'session_key', None)
+    if session_key:
+        UserSession.objects.get_or_create(session_key=session_key, defaults={'user': user})
+
+
+def _forget_session(sender, request, user, **kwargs):
+    from users.models import UserSession
+    session_key = getattr(getattr(request, 'session', None), 'session_key', None)
+    if session_key:
+        UserSession.objects.filter(session_key=session_key).delete()
 
 
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "users"
+
+    def ready(self):
+        post_migrate.connect(_install_search_index, sender=self)
+        user_logged_in.connect(_record_session, dispatch_uid='users.record_session')
+        user_logged_out.connect(_forget_session, dispatch_uid='users.forget_session')
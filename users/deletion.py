@@ -0,0 +1,34 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from cars import autocomplete
+from cars.facets import invalidate_catalog
+from cars.models import Car
+from .models import User
+from .tasks import purge_user
+
+
+def soft_delete_user(user_id):
+    """Lock the user out and hide them and their cars now; queue the purge.
+
+    Returns the purge Job, or None when the user was already deleted.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        if not User.all_objects.filter(id=user_id, deleted_at__isnull=True).update(deleted_at=now, is_active=False):
+            return None
+        Token.objects.filter(user_id=user_id).delete()
+        car_ids = list(Car.objects.filter(owner_id=user_id).values_list('id', flat=True))
+        Car.objects.filter(id__in=car_ids).update(deleted_at=now)
+        job = purge_user.enqueue(user_id=user_id)
+        if car_ids:
+            transaction.on_commit(lambda: _cars_hidden(car_ids))
+    return job
+
+
+def _cars_hidden(car_ids):
+    # update() sends no signals
+    invalidate_catalog()
+    for car_id in car_ids:
+        autocomplete.index.car_removed(car_id)
@@ -0,0 +1,40 @@
+from functools import lru_cache
+
+import factory
+from django.contrib.auth.hashers import make_password
+
+from users.models import User, Offer
+
+
+@lru_cache(maxsize=None)
+def default_password_hash():
+    # Hashing is deliberately slow, so every generated user shares one hash of "password"
+    return make_password('password')
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = User
+        django_get_or_create = ('username',)
+
+    username = factory.Sequence(lambda n: f'user{n}')
+    email = factory.LazyAttribute(lambda o: f'{o.username}@example.com')
+    first_name = factory.Faker('first_name')
+    last_name = factory.Faker('last_name')
+    password = factory.LazyFunction(default_password_hash)
+    user_type = 'regular'
+    phone_number = factory.Faker('numerify', text='+1##########')
+    is_verified = factory.Faker('boolean', chance_of_getting_true=70)
+
+
+class OwnerFactory(UserFactory):
+    user_type = 'owner'
+
+
+class OfferFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Offer
+
+    title = factory.Faker('sentence', nb_words=3)
+    description = factory.Faker('sentence')
+    points_required = factory.Faker('random_element', elements=[50, 100, 200, 500])
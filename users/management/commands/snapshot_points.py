@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from users.points import take_snapshots
+from users.tasks import snapshot_points
+
+
+class Command(BaseCommand):
+    help = "Checkpoint user points balances so history queries only sum recent ledger entries."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--enqueue', action='store_true', help="Queue the work for run_jobs instead")
+
+    def handle(self, *args, **options):
+        if options['enqueue']:
+            job = snapshot_points.enqueue(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Queued job {job.id}."))
+            return
+        created = take_snapshots(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Created {created} points snapshots."))
@@ -0,0 +1,65 @@
+# Generated by Django 3.2.20 on 2026-10-19 06:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def open_ledger(apps, schema_editor):
+    # Existing balances become the opening entry of each user's ledger
+    User = apps.get_model('users', 'User')
+    PointsLedgerEntry = apps.get_model('users', 'PointsLedgerEntry')
+    PointsLedgerEntry.objects.bulk_create(
+        PointsLedgerEntry(user_id=user_id, amount=points, reason='adjustment', reference='opening-balance')
+        for user_id, points in User.objects.filter(points__gt=0).values_list('id', 'points')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_alter_user_user_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Redemption',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('points_spent', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('offer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='redemptions', to='users.offer')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='redemptions', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PointsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.IntegerField()),
+                ('last_entry_id', models.BigIntegerField()),
+                ('taken_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='points_snapshots', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PointsLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField()),
+                ('reason', models.CharField(choices=[('booking_completed', 'Booking Completed'), ('offer_redeemed', 'Offer Redeemed'), ('adjustment', 'Adjustment')], max_length=30)),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='points_ledger', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='pointssnapshot',
+            index=models.Index(fields=['user', '-last_entry_id'], name='points_snapshot_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pointsledgerentry',
+            index=models.Index(fields=['user', 'id'], name='points_ledger_user_id_idx'),
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def forwards(apps, schema_editor):
+    from users.search import install_search_index
+    install_search_index(schema_editor.connection)
+
+
+def backwards(apps, schema_editor):
+    from users.search import uninstall_search_index
+    uninstall_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_points_ledger'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 3.2.20 on 2026-10-19 07:43
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from importlib import import_module
+
+
+def backfill_sessions(apps, schema_editor):
+    # One last scan of the session table; logins from now on are recorded as they happen
+    from django.contrib.auth import SESSION_KEY
+    from django.utils import timezone
+    store_class = import_module(settings.SESSION_ENGINE).SessionStore
+    if not hasattr(store_class, 'get_model_class'):
+        return
+    Session = apps.get_model('sessions', 'Session')
+    UserSession = apps.get_model('users', 'UserSession')
+    user_ids = set(apps.get_model('users', 'User').objects.values_list('id', flat=True))
+    store = store_class()
+    rows = []
+    live = Session.objects.filter(expire_date__gt=timezone.now()).values_list('session_key', 'session_data')
+    for session_key, session_data in live.iterator():
+        user_id = store.decode(session_data).get(SESSION_KEY)
+        if user_id is not None and int(user_id) in user_ids:
+            rows.append(UserSession(user_id=int(user_id), session_key=session_key))
+    UserSession.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_user_deleted_at'),
+        ('sessions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_key', models.CharField(max_length=40, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='login_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(backfill_sessions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.20 on 2026-10-19 08:27
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_user_sessions'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='user',
+            options={'default_manager_name': 'all_objects', 'verbose_name': 'user', 'verbose_name_plural': 'users'},
+        ),
+    ]
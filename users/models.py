@@ -1,5 +1,13 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
+
+
+class ActiveUserManager(UserManager):
+    """Hides soft-deleted users; ``User.all_objects`` still sees them."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
 
 class User(AbstractUser):
     USER_TYPE_CHOICES = (
@@ -16,10 +24,30 @@ class User(AbstractUser):
     is_verified = models.BooleanField(default=False)
     is_suspended = models.BooleanField(default=False)
     points = models.PositiveIntegerField(default=0)
+    # Set on delete; the row and everything it owns are purged by a background job
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ActiveUserManager()
+    all_objects = UserManager()
+
+    class Meta(AbstractUser.Meta):
+        # Unique checks (ModelForm, DRF) and auth backends must see soft-deleted users until
+        # they are purged; those are kept out of logins by is_active=False and revoked tokens
+        default_manager_name = 'all_objects'
     
     def __str__(self):
         return self.username
 
+class UserSession(models.Model):
+    """Session keys a user logged in with, so their sessions can be revoked without scanning the store."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='login_sessions')
+    session_key = models.CharField(max_length=40, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user}: {self.session_key}"
+
+
 class Offer(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField()
@@ -29,3 +57,60 @@ class Offer(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class Redemption(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='redemptions')
+    offer = models.ForeignKey(Offer, on_delete=models.CASCADE, related_name='redemptions')
+    points_spent = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user} redeemed {self.offer}"
+
+
+class PointsLedgerEntry(models.Model):
+    REASON_CHOICES = (
+        ('booking_completed', 'Booking Completed'),
+        ('offer_redeemed', 'Offer Redeemed'),
+        ('adjustment', 'Adjustment'),
+    )
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='points_ledger')
+    amount = models.IntegerField()  # positive for credits, negative for debits
+    reason = models.CharField(max_length=30, choices=REASON_CHOICES)
+    reference = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], name='points_ledger_user_id_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # The ledger is append-only, corrections are new entries
+        if not self._state.adding:
+            raise ValueError("Points ledger entries cannot be modified.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Points ledger entries cannot be deleted.")
+
+    def __str__(self):
+        return f"{self.user} {self.amount:+d} ({self.reason})"
+
+
+class PointsSnapshot(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='points_snapshots')
+    balance = models.IntegerField()
+    # Balance includes every ledger entry of the user up to and including this id
+    last_entry_id = models.BigIntegerField()
+    taken_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-last_entry_id'], name='points_snapshot_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user}: {self.balance} @ {self.taken_at}"
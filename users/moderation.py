@@ -0,0 +1,90 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Q
+from rest_framework.authtoken.models import Token
+
+from users.models import User, UserSession
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+CHUNK_SIZE = 500
+
+BOOLEAN_FILTERS = ['is_verified', 'is_suspended']
+
+
+def _chunks(values, size=CHUNK_SIZE):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def _as_bool(value):
+    if isinstance(value, bool):
+        return value
+    if str(value).lower() in ['true', 'false']:
+        return str(value).lower() == 'true'
+    return None
+
+
+def filter_users(queryset, params):
+    """Apply the admin user-list filters (user_type, is_verified, is_suspended, search)."""
+    user_type = params.get('user_type')
+    search = params.get('search')
+
+    if user_type:
+        queryset = queryset.filter(user_type=user_type)
+    for field in BOOLEAN_FILTERS:
+        value = _as_bool(params.get(field))
+        if value is not None:
+            queryset = queryset.filter(**{field: value})
+    if search:
+        queryset = queryset.filter(
+            Q(username__icontains=search) |
+            Q(email__icontains=search) |
+            Q(first_name__icontains=search) |
+            Q(last_name__icontains=search)
+        )
+    return queryset
+
+
+def revoke_tokens(user_ids):
+    revoked = 0
+    for chunk in _chunks(user_ids):
+        revoked += Token.objects.filter(user_id__in=chunk).delete()[0]
+    return revoked
+
+
+def revoke_sessions(user_ids):
+    """Delete the sessions ``user_ids`` logged in with, by key from UserSession; no store scan."""
+    engine = import_module(settings.SESSION_ENGINE)
+    store_class = engine.SessionStore
+    model = store_class.get_model_class() if hasattr(store_class, 'get_model_class') else None
+    cache_key_prefix = getattr(store_class, 'cache_key_prefix', None)
+
+    revoked = 0
+    for chunk in _chunks(list(user_ids)):
+        keys = list(UserSession.objects.filter(user_id__in=chunk).values_list('session_key', flat=True))
+        if not keys:
+            continue
+        if model is not None:
+            model.objects.filter(session_key__in=keys).delete()
+        if cache_key_prefix:
+            caches[settings.SESSION_CACHE_ALIAS].delete_many([cache_key_prefix + key for key in keys])
+        UserSession.objects.filter(session_key__in=keys).delete()
+        revoked += len(keys)
+    return revoked
+
+
+def bulk_moderate(queryset, changes, revoke=False):
+    with transaction.atomic():
+        user_ids = list(queryset.values_list('id', flat=True))
+        for chunk in _chunks(user_ids):
+            User.objects.filter(id__in=chunk).update(**changes)
+        tokens = revoke_tokens(user_ids) if revoke else 0
+        sessions = revoke_sessions(user_ids) if revoke else 0
+    return {
+        'updated': len(user_ids),
+        'tokens_revoked': tokens,
+        'sessions_revoked': sessions,
+    }
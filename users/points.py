@@ -0,0 +1,99 @@
+from django.db import transaction
+from django.db.models import F, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from users.models import User, PointsLedgerEntry, PointsSnapshot
+
+
+class InsufficientPoints(Exception):
+    pass
+
+
+def _current_balance(user_id):
+    return User.objects.filter(pk=user_id).values_list('points', flat=True).get()
+
+
+@transaction.atomic
+def credit_points(user, amount, reason, reference=''):
+    # Single UPDATE ... SET points = points + n, no read-modify-write in Python
+    User.objects.filter(pk=user.pk).update(points=F('points') + amount)
+    PointsLedgerEntry.objects.create(user=user, amount=amount, reason=reason, reference=reference)
+    user.points = _current_balance(user.pk)
+    return user.points
+
+
+@transaction.atomic
+def debit_points(user, amount, reason, reference=''):
+    # The balance check and the debit happen in the same statement
+    updated = User.objects.filter(pk=user.pk, points__gte=amount).update(points=F('points') - amount)
+    if not updated:
+        raise InsufficientPoints()
+    PointsLedgerEntry.objects.create(user=user, amount=-amount, reason=reason, reference=reference)
+    user.points = _current_balance(user.pk)
+    return user.points
+
+
+def balance_at(user, when):
+    """Points balance of ``user`` at ``when``, from the closest snapshot plus later ledger entries."""
+    snapshot = (
+        PointsSnapshot.objects.filter(user=user, taken_at__lte=when)
+        .order_by('-last_entry_id')
+        .first()
+    )
+    entries = PointsLedgerEntry.objects.filter(user=user, created_at__lte=when)
+    balance = 0
+    if snapshot:
+        entries = entries.filter(id__gt=snapshot.last_entry_id)
+        balance = snapshot.balance
+    return balance + (entries.aggregate(total=Sum('amount'))['total'] or 0)
+
+
+def take_snapshots(batch_size=500):
+    """Checkpoint the balance of every user with ledger activity since their last snapshot.
+
+    Users are handled ``batch_size`` at a time with one aggregate over the
+    ledger per batch, not a query per user.
+    """
+    last_snapshot = (
+        PointsSnapshot.objects.filter(user_id=OuterRef('user_id'))
+        .order_by('-last_entry_id')
+        .values('last_entry_id')[:1]
+    )
+    active_users = list(
+        PointsLedgerEntry.objects.values_list('user_id', flat=True).distinct().order_by('user_id')
+    )
+
+    created = 0
+    for start in range(0, len(active_users), batch_size):
+        batch = active_users[start:start + batch_size]
+        deltas = list(
+            PointsLedgerEntry.objects.filter(user_id__in=batch)
+            .annotate(after=Coalesce(Subquery(last_snapshot), 0))
+            .filter(id__gt=F('after'))
+            .values('user_id')
+            .annotate(total=Sum('amount'), last_id=Max('id'))
+            .order_by()
+        )
+        if not deltas:
+            continue
+        last_balances = dict(
+            PointsSnapshot.objects.filter(user_id__in=[d['user_id'] for d in deltas])
+            .annotate(latest=Subquery(last_snapshot))
+            .filter(last_entry_id=F('latest'))
+            .values_list('user_id', 'balance')
+        )
+        taken_at = dict(
+            PointsLedgerEntry.objects.filter(id__in=[d['last_id'] for d in deltas])
+            .values_list('id', 'created_at')
+        )
+        PointsSnapshot.objects.bulk_create([
+            PointsSnapshot(
+                user_id=d['user_id'],
+                balance=last_balances.get(d['user_id'], 0) + d['total'],
+                last_entry_id=d['last_id'],
+                taken_at=taken_at[d['last_id']],
+            )
+            for d in deltas
+        ])
+        created += len(deltas)
+    return created
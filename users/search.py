@@ -0,0 +1,164 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.functions import Greatest
+
+from users.models import User
+
+SEARCH_FIELDS = ['username', 'email', 'first_name', 'last_name']
+FTS_TABLE = 'users_user_fts'
+MAX_LIMIT = 50
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+POSTGRESQL_INSTALL = ['CREATE EXTENSION IF NOT EXISTS pg_trgm'] + [
+    f'CREATE INDEX IF NOT EXISTS users_user_{field}_trgm ON users_user USING gin (UPPER("{field}") gin_trgm_ops)'
+    for field in SEARCH_FIELDS
+]
+POSTGRESQL_UNINSTALL = [f'DROP INDEX IF EXISTS users_user_{field}_trgm' for field in SEARCH_FIELDS]
+
+# External-content FTS5 table kept in sync with users_user by triggers
+SQLITE_INSTALL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        username, email, first_name, last_name,
+        content='users_user', content_rowid='id', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS users_user_fts_ai AFTER INSERT ON users_user BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, username, email, first_name, last_name)
+        VALUES (new.id, new.username, new.email, new.first_name, new.last_name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS users_user_fts_ad AFTER DELETE ON users_user BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, username, email, first_name, last_name)
+        VALUES ('delete', old.id, old.username, old.email, old.first_name, old.last_name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS users_user_fts_au
+    AFTER UPDATE OF username, email, first_name, last_name ON users_user BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, username, email, first_name, last_name)
+        VALUES ('delete', old.id, old.username, old.email, old.first_name, old.last_name);
+        INSERT INTO {FTS_TABLE}(rowid, username, email, first_name, last_name)
+        VALUES (new.id, new.username, new.email, new.first_name, new.last_name);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_UNINSTALL = [
+    'DROP TRIGGER IF EXISTS users_user_fts_ai',
+    'DROP TRIGGER IF EXISTS users_user_fts_ad',
+    'DROP TRIGGER IF EXISTS users_user_fts_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+
+def _sqlite_has_fts5(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+# {alias: bool}, the SQLite index check cached per process; install/uninstall reset it
+_index_ready = {}
+
+
+def _sqlite_index_complete(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name IN (%s, %s, %s, %s)",
+            [FTS_TABLE, 'users_user_fts_ai', 'users_user_fts_ad', 'users_user_fts_au'],
+        )
+        return cursor.fetchone()[0] == 4
+
+
+def _sqlite_index_ready(conn):
+    if conn.alias not in _index_ready:
+        _index_ready[conn.alias] = _sqlite_index_complete(conn)
+    return _index_ready[conn.alias]
+
+
+def install_search_index(conn):
+    _index_ready.pop(conn.alias, None)
+    if conn.vendor == 'postgresql':
+        statements = POSTGRESQL_INSTALL
+    elif conn.vendor == 'sqlite' and _sqlite_has_fts5(conn):
+        # SQLite table rebuilds during later migrations drop the triggers, so this is re-run after migrate
+        if _sqlite_index_complete(conn):
+            return
+        statements = SQLITE_INSTALL
+    else:
+        return
+    with conn.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def uninstall_search_index(conn):
+    _index_ready.pop(conn.alias, None)
+    if conn.vendor == 'postgresql':
+        statements = POSTGRESQL_UNINSTALL
+    elif conn.vendor == 'sqlite':
+        statements = SQLITE_UNINSTALL
+    else:
+        return
+    with conn.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def _fts_query(term):
+    # Every token must match as a prefix, quoted so FTS5 operators in user input stay literal
+    return ' '.join(f'"{token}"*' for token in _TOKEN_RE.findall(term))
+
+
+def _search_sqlite(term, limit):
+    match = _fts_query(term)
+    if not match:
+        return []
+    with connection.cursor() as cursor:
+        # Soft-deleted users are dropped before the LIMIT so they do not take result slots
+        cursor.execute(
+            f"SELECT {FTS_TABLE}.rowid FROM {FTS_TABLE} JOIN users_user ON users_user.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND users_user.deleted_at IS NULL "
+            f"ORDER BY bm25({FTS_TABLE}) LIMIT %s",
+            [match, limit],
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+    users = User.objects.in_bulk(ids)
+    return [users[pk] for pk in ids if pk in users]
+
+
+def _search_postgresql(term, limit):
+    from django.contrib.postgres.search import TrigramSimilarity
+
+    # icontains is served by the UPPER(col) gin_trgm_ops indexes, similarity only ranks the matches
+    matches = Q()
+    for field in SEARCH_FIELDS:
+        matches |= Q(**{f'{field}__icontains': term})
+    rank = Greatest(*[TrigramSimilarity(field, term) for field in SEARCH_FIELDS])
+    return list(User.objects.filter(matches).annotate(rank=rank).order_by('-rank', 'username')[:limit])
+
+
+def _search_fallback(term, limit):
+    matches = Q()
+    for field in SEARCH_FIELDS:
+        matches |= Q(**{f'{field}__istartswith': term})
+    return list(User.objects.filter(matches).order_by('username')[:limit])
+
+
+def search_users(term, limit=10):
+    """Ranked, limited user matches for admin typeahead."""
+    term = (term or '').strip()
+    limit = max(1, min(limit, MAX_LIMIT))
+    if not term:
+        return []
+    if connection.vendor == 'postgresql':
+        return _search_postgresql(term, limit)
+    if connection.vendor == 'sqlite' and _sqlite_index_ready(connection):
+        return _search_sqlite(term, limit)
+    return _search_fallback(term, limit)
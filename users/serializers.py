@@ -42,6 +42,53 @@ class AdminUserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'user_type', 'is_verified', 'is_suspended']
         read_only_fields = ['id', 'username', 'email', 'first_name', 'last_name']  # Allow only status/type updates by default
+
+class UserFilterSerializer(serializers.Serializer):
+    """The admin user-list filters, parsed so a value that does not apply is an error rather than ignored."""
+    user_type = serializers.ChoiceField(choices=User.USER_TYPE_CHOICES, required=False)
+    is_verified = serializers.BooleanField(required=False)
+    is_suspended = serializers.BooleanField(required=False)
+    search = serializers.CharField(required=False, allow_blank=True)
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict):
+            unknown = set(data) - set(self.fields)
+            if unknown:
+                raise serializers.ValidationError(f"Unsupported filter keys: {', '.join(sorted(unknown))}")
+        return super().to_internal_value(data)
+
+    def validate(self, data):
+        # A bulk update must never fall through to every user
+        if not any(value not in [None, ''] for value in data.values()):
+            raise serializers.ValidationError("Filter must contain at least one criterion.")
+        return data
+
+
+class AdminBulkUserUpdateSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    filter = UserFilterSerializer(required=False)
+    is_verified = serializers.BooleanField(required=False)
+    is_suspended = serializers.BooleanField(required=False)
+    user_type = serializers.ChoiceField(choices=User.USER_TYPE_CHOICES, required=False)
+    revoke_sessions = serializers.BooleanField(required=False)
+
+    CHANGE_FIELDS = ['is_verified', 'is_suspended', 'user_type']
+
+    def validate(self, data):
+        if ('ids' in data) == ('filter' in data):
+            raise serializers.ValidationError("Provide either 'ids' or 'filter'.")
+        if not any(field in data for field in self.CHANGE_FIELDS):
+            raise serializers.ValidationError("Provide at least one of is_verified, is_suspended or user_type.")
+        return data
+
+    def get_changes(self):
+        return {field: self.validated_data[field] for field in self.CHANGE_FIELDS if field in self.validated_data}
+
+    def should_revoke(self):
+        # Suspensions and role changes log the affected users out unless told otherwise
+        default = self.validated_data.get('is_suspended') is True or 'user_type' in self.validated_data
+        return self.validated_data.get('revoke_sessions', default)
+
 class OfferSerializer(serializers.ModelSerializer):
     class Meta:
         model = Offer
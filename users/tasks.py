@@ -0,0 +1,16 @@
+from jobs.queue import report_progress, task
+from .points import take_snapshots
+
+
+@task(queue='default', max_attempts=3)
+def snapshot_points(batch_size=500):
+    take_snapshots(batch_size=batch_size)
+
+
+@task(queue='default', max_attempts=5)
+def purge_user(user_id):
+    """Hard-delete a soft-deleted user with their cars, bookings, tickets and ledger, in batches."""
+    from turo_clone.purge import purge
+    from .models import User
+    users = User.all_objects.filter(id=user_id, deleted_at__isnull=False)
+    purge(users, on_batch=lambda counts: report_progress(deleted=counts))
@@ -1,3 +1,209 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+import pytest
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from users.deletion import soft_delete_user
+from users.factories import UserFactory
+from users.models import PointsLedgerEntry, PointsSnapshot, User, UserSession
+from users.points import InsufficientPoints, balance_at, credit_points, debit_points, take_snapshots
+from users.search import search_users
+
+pytestmark = pytest.mark.django_db
+
+
+def _backdate(days):
+    """Move the latest ledger entry ``days`` into the past; update() is the only way around save()."""
+    entry = PointsLedgerEntry.objects.latest('id')
+    PointsLedgerEntry.objects.filter(id=entry.id).update(created_at=timezone.now() - timedelta(days=days))
+
+
+def test_credit_and_debit_update_balance_and_ledger():
+    user = UserFactory()
+    assert credit_points(user, 100, 'booking_completed', reference='booking:1') == 100
+    assert debit_points(user, 30, 'offer_redeemed', reference='offer:2') == 70
+    user.refresh_from_db()
+    assert user.points == 70
+    assert list(user.points_ledger.order_by('id').values_list('amount', 'reference')) == [
+        (100, 'booking:1'), (-30, 'offer:2'),
+    ]
+
+
+def test_debit_beyond_balance_changes_nothing():
+    user = UserFactory()
+    credit_points(user, 20, 'adjustment')
+    with pytest.raises(InsufficientPoints):
+        debit_points(user, 21, 'offer_redeemed')
+    user.refresh_from_db()
+    assert user.points == 20
+    assert user.points_ledger.count() == 1
+
+
+def test_ledger_entries_cannot_be_changed_or_deleted():
+    user = UserFactory()
+    credit_points(user, 10, 'adjustment')
+    entry = user.points_ledger.get()
+    entry.amount = 1000
+    with pytest.raises(ValueError):
+        entry.save()
+    with pytest.raises(ValueError):
+        entry.delete()
+    assert user.points_ledger.get().amount == 10
+
+
+def test_balance_at_sums_entries_up_to_the_date():
+    user = UserFactory()
+    credit_points(user, 100, 'booking_completed')
+    _backdate(10)
+    debit_points(user, 30, 'offer_redeemed')
+    _backdate(5)
+    credit_points(user, 50, 'booking_completed')
+
+    now = timezone.now()
+    assert balance_at(user, now - timedelta(days=20)) == 0
+    assert balance_at(user, now - timedelta(days=7)) == 100
+    assert balance_at(user, now - timedelta(days=1)) == 70
+    assert balance_at(user, now) == 120
+
+
+def test_balance_at_starts_from_the_snapshot():
+    user = UserFactory()
+    credit_points(user, 100, 'booking_completed')
+    _backdate(10)
+    assert take_snapshots() == 1
+    credit_points(user, 50, 'booking_completed')
+
+    # Entries up to the snapshot are not summed again
+    PointsSnapshot.objects.update(balance=1000)
+    now = timezone.now()
+    assert balance_at(user, now) == 1050
+    # Before the snapshot was taken it does not apply
+    assert balance_at(user, now - timedelta(days=20)) == 0
+
+
+def test_take_snapshots_builds_on_the_previous_one():
+    user, other = UserFactory(), UserFactory()
+    credit_points(user, 100, 'booking_completed')
+    credit_points(other, 5, 'adjustment')
+    assert take_snapshots(batch_size=1) == 2
+    # Nothing new since the last run
+    assert take_snapshots() == 0
+
+    debit_points(user, 40, 'offer_redeemed')
+    credit_points(user, 15, 'adjustment')
+    assert PointsSnapshot.objects.get(user=user).balance == 100
+    # Marked so the next snapshot shows it started from this one, not from the whole ledger
+    PointsSnapshot.objects.filter(user=user).update(balance=1000)
+    assert take_snapshots() == 1
+
+    latest = PointsSnapshot.objects.filter(user=user).latest('last_entry_id')
+    assert latest.balance == 1000 - 40 + 15
+    assert latest.last_entry_id == user.points_ledger.latest('id').id
+    assert PointsSnapshot.objects.filter(user=other).count() == 1
+
+
+def test_search_skips_soft_deleted_users_before_the_limit():
+    deleted = [UserFactory(username=f'zelda{n}') for n in range(5)]
+    active = [UserFactory(username=f'zelda{n}') for n in range(5, 7)]
+    User.all_objects.filter(id__in=[user.id for user in deleted]).update(deleted_at=timezone.now())
+    assert sorted(user.username for user in search_users('zel', limit=2)) == [user.username for user in active]
+
+
+def test_search_checks_the_sqlite_index_once():
+    UserFactory(username='yorick')
+    search_users('yor')
+    with CaptureQueriesContext(connection) as queries:
+        assert [user.username for user in search_users('yor')] == ['yorick']
+    assert not any('sqlite_master' in query['sql'] for query in queries.captured_queries)
+
+
+@pytest.fixture
+def staff(client):
+    admin = UserFactory(is_staff=True, user_type='regular')
+    client.force_login(admin)
+    return admin
+
+
+def _bulk(client, payload):
+    return client.post('/api/admin/users/bulk/', payload, content_type='application/json')
+
+
+def test_bulk_update_by_ids(client, staff):
+    first, second, untouched = UserFactory(is_verified=False), UserFactory(is_verified=False), UserFactory(is_verified=False)
+    response = _bulk(client, {'ids': [first.id, second.id], 'is_verified': True})
+    assert response.status_code == 200
+    assert response.json()['updated'] == 2
+    assert set(User.objects.filter(is_verified=True).values_list('id', flat=True)) >= {first.id, second.id}
+    untouched.refresh_from_db()
+    assert not untouched.is_verified
+
+
+def test_bulk_update_by_filter_skips_the_admin(client, staff):
+    owner = UserFactory(user_type='owner')
+    regular = UserFactory(user_type='regular')
+    response = _bulk(client, {'filter': {'user_type': 'regular'}, 'is_suspended': True})
+    assert response.status_code == 200
+    assert response.json()['updated'] == 1
+    assert list(User.objects.filter(is_suspended=True).values_list('id', flat=True)) == [regular.id]
+    staff.refresh_from_db()
+    owner.refresh_from_db()
+    assert not staff.is_suspended and not owner.is_suspended
+
+
+@pytest.mark.parametrize('payload', [
+    {'filter': {'is_verified': 'maybe'}, 'is_verified': True},
+    {'filter': {'user_type': 'pirate'}, 'is_suspended': True},
+    {'filter': {'search': '  '}, 'is_suspended': True},
+    {'filter': {}, 'is_suspended': True},
+    {'filter': {'last_login': '2020-01-01'}, 'is_suspended': True},
+    {'ids': [1], 'filter': {'user_type': 'owner'}, 'is_suspended': True},
+    {'ids': [1]},
+])
+def test_bulk_update_rejects_filters_that_do_not_apply(client, staff, payload):
+    UserFactory(is_verified=False)
+    response = _bulk(client, payload)
+    assert response.status_code == 400
+    assert not User.objects.filter(is_suspended=True).exists()
+
+
+def test_bulk_suspension_revokes_tokens_and_sessions(client, staff):
+    target, bystander = UserFactory(), UserFactory()
+    for user in (target, bystander):
+        Token.objects.create(user=user)
+        Client().login(username=user.username, password='password')
+    # The admin's own login is recorded too
+    assert UserSession.objects.count() == 3
+
+    response = _bulk(client, {'ids': [target.id], 'is_suspended': True})
+    assert response.json()['tokens_revoked'] == 1
+    assert response.json()['sessions_revoked'] == 1
+    assert not Token.objects.filter(user=target).exists()
+    assert set(UserSession.objects.values_list('user_id', flat=True)) == {bystander.id, staff.id}
+    remaining = {session.get_decoded()['_auth_user_id'] for session in Session.objects.all()}
+    assert remaining == {str(bystander.id), str(staff.id)}
+
+
+def test_verifying_keeps_sessions_unless_asked(client, staff):
+    target = UserFactory(is_verified=False)
+    Token.objects.create(user=target)
+    assert _bulk(client, {'ids': [target.id], 'is_verified': True}).json()['tokens_revoked'] == 0
+    assert _bulk(client, {'ids': [target.id], 'is_verified': True, 'revoke_sessions': True}).json()['tokens_revoked'] == 1
+
+
+def test_soft_deleted_username_is_taken_until_purged(client):
+    user = UserFactory(username='ghost')
+    soft_delete_user(user.id)
+    response = client.post('/api/register/', {
+        'username': 'ghost', 'email': 'new@example.com', 'password': 'A-long-passphrase-1',
+        'password2': 'A-long-passphrase-1', 'first_name': 'New', 'last_name': 'User',
+    }, content_type='application/json')
+    assert response.status_code == 400
+    assert 'username' in response.json()
+    # Still hidden from the default queryset, and locked out
+    assert not User.objects.filter(username='ghost').exists()
+    assert not client.login(username='ghost', password='password')
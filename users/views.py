@@ -7,9 +7,15 @@ from .forms import UserRegistrationForm, UserProfileForm
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Q
-from users.models import User,Offer
-from .serializers import AdminUserSerializer,OfferSerializer,CreateSupportUserSerializer
+from users.models import User,Offer,Redemption,PointsLedgerEntry
+from users.points import debit_points, balance_at, InsufficientPoints
+from users.search import search_users
+from users.moderation import filter_users, bulk_moderate
+from turo_clone.instrumentation import query_budget
+from turo_clone.db_routers import replica_reads
+from users.deletion import soft_delete_user
+from jobs.views import job_accepted
+from .serializers import AdminUserSerializer,OfferSerializer,CreateSupportUserSerializer,AdminBulkUserUpdateSerializer
 from rest_framework.permissions import IsAdminUser
 from bookings.models import Booking
 from rest_framework.decorators import api_view, permission_classes
@@ -38,8 +44,11 @@ class CreateSupportUserView(APIView):
 
 
 
+from django.db import transaction
 from django.db.models import Sum
+from django.utils import timezone
 from django.utils.dateparse import parse_date
+from datetime import datetime, time
 from rest_framework.views import APIView
 from rest_framework import generics
 
@@ -53,25 +62,63 @@ def redeem_offer(request, offer_id):
     except Offer.DoesNotExist:
         return Response({"error": "Offer not found or inactive."}, status=404)
 
-    if user.points < offer.points_required:
+    try:
+        with transaction.atomic():
+            remaining = debit_points(user, offer.points_required, 'offer_redeemed', reference=f"offer:{offer.id}")
+            Redemption.objects.create(user=user, offer=offer, points_spent=offer.points_required)
+    except InsufficientPoints:
         return Response({"error": "Not enough points to redeem this offer."}, status=400)
 
-    user.points -= offer.points_required
-    user.save()
-
-    Redemption.objects.create(user=user, offer=offer)
-
     return Response({
         "message": f"Successfully redeemed {offer.title}.",
-        "remaining_points": user.points
+        "remaining_points": remaining
     })
 
 
+@query_budget(4)
+class PointsHistoryAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        entries = PointsLedgerEntry.objects.filter(user=request.user).order_by('-id')
+        before = request.query_params.get('before')
+        if before:
+            if not before.isdigit():
+                return Response({"error": "Invalid 'before' id."}, status=status.HTTP_400_BAD_REQUEST)
+            entries = entries.filter(id__lt=int(before))
+
+        data = {
+            "points": request.user.points,
+            "entries": [
+                {
+                    "id": entry.id,
+                    "amount": entry.amount,
+                    "reason": entry.reason,
+                    "reference": entry.reference,
+                    "created_at": entry.created_at,
+                }
+                for entry in entries[:50]
+            ],
+        }
+
+        at = request.query_params.get('at')
+        if at:
+            at_date = parse_date(at)
+            if not at_date:
+                return Response({"error": "Invalid 'at' date."}, status=status.HTTP_400_BAD_REQUEST)
+            end_of_day = timezone.make_aware(datetime.combine(at_date, time.max))
+            data["balance_at"] = balance_at(request.user, end_of_day)
+
+        return Response(data)
+
+
+@query_budget(3)
 class AdminOfferListCreateAPIView(generics.ListCreateAPIView):
     permission_classes = [IsAdminUser]
     queryset = Offer.objects.all()
     serializer_class = OfferSerializer
 
+@query_budget(3)
 class AdminOfferUpdateDeleteAPIView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAdminUser]
     queryset = Offer.objects.all()
@@ -79,6 +126,8 @@ class AdminOfferUpdateDeleteAPIView(generics.RetrieveUpdateDestroyAPIView):
     lookup_field = 'id'
 
 
+@replica_reads
+@query_budget(4)
 class AdminRevenueReportAPIView(APIView):
     permission_classes = [IsAdminUser]
 
@@ -105,36 +154,61 @@ class AdminRevenueReportAPIView(APIView):
         })
 
 
+@replica_reads
+@query_budget(3)
 class AdminUserListAPIView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        queryset = User.objects.all()
-        
-        # Filters
-        user_type = request.query_params.get('user_type')
-        is_verified = request.query_params.get('is_verified')
-        is_suspended = request.query_params.get('is_suspended')
-        search = request.query_params.get('search')
-        
-        if user_type:
-            queryset = queryset.filter(user_type=user_type)
-        if is_verified in ['true', 'false']:
-            queryset = queryset.filter(is_verified=(is_verified.lower() == 'true'))
-        if is_suspended in ['true', 'false']:
-            queryset = queryset.filter(is_suspended=(is_suspended.lower() == 'true'))
-        if search:
-            queryset = queryset.filter(
-                Q(username__icontains=search) | 
-                Q(email__icontains=search) | 
-                Q(first_name__icontains=search) | 
-                Q(last_name__icontains=search)
-            )
-        
+        queryset = filter_users(User.objects.all(), request.query_params)
         serializer = AdminUserSerializer(queryset, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@replica_reads
+@query_budget(5)
+class AdminUserSearchAPIView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        users = search_users(request.query_params.get('q', ''), limit=limit)
+        data = [
+            {
+                'id': user.id,
+                'username': user.username,
+                'email': user.email,
+                'full_name': user.get_full_name(),
+                'user_type': user.user_type,
+            }
+            for user in users
+        ]
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class AdminUserBulkUpdateAPIView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        serializer = AdminBulkUserUpdateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        if 'ids' in serializer.validated_data:
+            queryset = User.objects.filter(id__in=serializer.validated_data['ids'])
+        else:
+            queryset = filter_users(User.objects.all(), serializer.validated_data['filter'])
+        # Admins cannot moderate themselves in bulk
+        queryset = queryset.exclude(pk=request.user.pk)
+
+        result = bulk_moderate(queryset, serializer.get_changes(), revoke=serializer.should_revoke())
+        return Response({'message': 'Users updated successfully', **result}, status=status.HTTP_200_OK)
+
+
 class AdminUserDetailAPIView(APIView):
     permission_classes = [IsAdminUser]
 
@@ -156,8 +230,11 @@ class AdminUserDetailAPIView(APIView):
         except User.DoesNotExist:
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        user.delete()
-        return Response({'message': 'User deleted successfully'}, status=status.HTTP_204_NO_CONTENT)
+        # Locked out and hidden now; cars, bookings and the rest are purged by a background job
+        job = soft_delete_user(user.id)
+        if job is None:
+            return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+        return job_accepted(request, job, 'User scheduled for deletion.')
 
 
 